@@ -2,40 +2,43 @@ import requests
 import pandas as pd
 import urllib
 import collections
-import json
+import math
 import lxml.html as lh
 import warnings 
+import itertools
+import threading
+import time
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from requests.exceptions import ConnectionError
 from aisexplorer.Exceptions import (
-    NotSupportedParameterTypeError,
     ProxiesNoLongerSupportedError,
     NotSupportedParameterError,
     CloudflareError,
     UserNotLoggedInError,
-    NoResultsError,
+    ResponseStatusError,
+    FleetNotFoundError,
+    SinkWriteError,
 )
-from aisexplorer.Proxy import FreeProxy
-from aisexplorer.Filters import Filters, FleetFilter
-from tenacity import retry, stop_after_attempt, wait_fixed
-
-
-def raise_no_results_error(retry_state):
-    """Raise a NoResultsError after a certain number of attempts.
-
-    Args:
-        retry_state (tenacity.RetryCallState): The current state of the retry logic.
-
-    Raises:
-        NoResultsError: If no results are obtained after the specified attempts.
-    """
-    attempt_num = retry_state.attempt_number
-    error_message = (
-        f"After {attempt_num} attempts still no results are given. "
-        f"If you think this is an error in the module raise an issue at "
-        f"https://github.com/reyemb/AISExplorer "
-    )
-    raise NoResultsError(error_message)
+from aisexplorer.Proxy import FreeProxy, ProxyPool
+from aisexplorer.Filters import Filters, FleetFilter, ListFilter
+from aisexplorer.Fleets import FleetRegistry, merge_fleet_rows
+from aisexplorer.Cache import canonical_query, copy_payload, query_kind
+from aisexplorer.Hooks import Hooks
+from aisexplorer.Query import CompiledQuery, page_url
+from aisexplorer.Reference import (
+    KEY_COLUMNS,
+    added_key_fields,
+    join_reference,
+    reference_key,
+    split_columns,
+    to_reference,
+)
+from aisexplorer.Retry import RetryPolicy, with_retry
+from aisexplorer.Utils.Decoding import is_json_body, json_loads
+from aisexplorer.Utils.Utility import build_typed_df
 
 
 class AIS:
@@ -52,13 +55,43 @@ class AIS:
         session (requests.Session): The session for HTTP requests.
         proxy (bool): If True, use a proxy.
         burned_proxies (list): List of proxies that have been used and are no longer viable.
+        paginate (bool): If True, fetch every page of a result instead of only the first one.
+        max_workers (int): Number of pages fetched concurrently when paginating.
+        base_url (str): Scheme and host all requests are sent to.
+        cache (BaseCache): Cache for decoded responses, or None to disable caching.
+        cache_ttl (float or dict): Seconds a cached response stays valid, or None for the
+            cache default. A dict sets them per kind of query, see `Cache.query_kind`, e.g.
+            `{"location": 10, "area": 60}`; kinds it does not name use the cache default.
+        compact (bool): If True, DataFrames use the memory-lean dtypes of `COMPACT_TYPES`.
+        sink (SnapshotSink): Sink every fetched result is written to, or None.
+        rate_limiter (TokenBucket): Limiter pacing every data request, or None.
+        retry_policy (RetryPolicy): The retry logic of this instance. Defaults to a policy
+            built from `num_retries` and `seconds_wait`.
+        pool_connections (int): Number of hosts the session keeps connection pools for.
+        pool_maxsize (int): Connections kept alive per host. Defaults to `max_workers`,
+            at least 10. Size it to the number of threads sharing the instance.
+        timeout (float or tuple): Seconds to wait for the server per request, either one
+            value or a (connect, read) tuple. None waits forever.
+        cassette (Cassette): Cassette every exchange is recorded to or replayed from, or None.
+        fleet_ttl (float): Seconds the fleet list of `get_fleets` is cached.
+        reference_cache (BaseCache): Cache of the static attributes of every vessel, or None.
+            If set, area and data queries request only the dynamic columns and the static
+            ones (see `Reference.STATIC_COLUMNS`) are joined from the cache.
+        reference_ttl (float): Seconds the static attributes of a vessel stay cached.
+        reference_miss_ttl (float): Seconds a vessel whose static attributes were not
+            found is not looked up again.
+        result_cache (ResultCache): Store of complete area and data results, or None. If
+            set, a query whose result is contained in a stored one, e.g. an area with an
+            additional speed filter, is answered locally without a request.
+        hooks (list): `Hooks` notified of requests, retries, Cloudflare challenges, proxy
+            renewals and decoded responses, e.g. a `MetricsCollector`.
+
+    An instance can be shared by threads: the URLs of a call are built from the
+    filters and columns at the time of the call, and the session reuses the
+    connections of its pool instead of opening one per request.
     """
 
-    retry_options = {
-        "stop": stop_after_attempt(10),
-        "wait": wait_fixed(15),
-        "retry_error_callback": raise_no_results_error,
-    }
+    base_url = "https://www.marinetraffic.com"
 
     def __init__(
         self,
@@ -72,10 +105,34 @@ class AIS:
         filter_config={},
         return_df=False,
         return_total_count=False,
+        paginate=False,
+        max_workers=1,
+        base_url=None,
+        cache=None,
+        cache_ttl=None,
+        compact=False,
+        sink=None,
+        rate_limiter=None,
+        retry_policy=None,
+        pool_connections=10,
+        pool_maxsize=None,
+        timeout=(10, 60),
+        cassette=None,
+        hooks=None,
+        fleet_ttl=300,
+        reference_cache=None,
+        reference_ttl=7 * 24 * 3600,
+        reference_miss_ttl=3600,
+        result_cache=None,
         **proxy_config,
     ):
         """Initializes the AIS class with provided configurations."""
-        self.update_retry_options(num_retries, seconds_wait)
+        if base_url is not None:
+            self.base_url = base_url.rstrip("/")
+        if retry_policy is None:
+            self.update_retry_options(num_retries, seconds_wait)
+        else:
+            self.retry_policy = retry_policy
         self.initialize_attributes(
             return_df,
             return_total_count,
@@ -83,21 +140,42 @@ class AIS:
             columns,
             columns_excluded,
             print_query,
+            paginate,
+            max_workers,
+            cache,
+            cache_ttl,
+            compact,
+            sink,
+            rate_limiter,
+            pool_connections,
+            pool_maxsize,
+            timeout,
+            hooks,
+            fleet_ttl,
+            reference_cache,
+            reference_ttl,
+            reference_miss_ttl,
         )
         self.configure_session(proxy, verbose, proxy_config)
+        self.cassette = cassette
+        self.result_cache = result_cache
+        if cassette is not None:
+            self.session = cassette.wrap(self.session)
         self.set_column_url()
         self.set_filters(filter_config=filter_config)
 
     def update_retry_options(self, num_retries, seconds_wait):
-        """Update the retry options if they differ from the defaults."""
-        if num_retries != 10:
-            self.retry_options["stop"] = stop_after_attempt(num_retries)
-        if seconds_wait != 15:
-            self.retry_options["wait"] = wait_fixed(seconds_wait)
+        """Set the retry policy of this instance from the attempts and the maximal wait."""
+        self.retry_policy = RetryPolicy(max_attempts=num_retries, max_wait=seconds_wait)
 
     def configure_session(self, proxy, verbose, proxy_config):
         """Configure the session with proxy settings and headers."""
         self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.session.headers.update(
             {
                 "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36",
@@ -118,7 +196,10 @@ class AIS:
             if proxy_config
             else FreeProxy(verbose=verbose)
         )
-        self.session.proxies = self.freeproxy.get()
+        self.proxy_pool = ProxyPool(self.freeproxy)
+        self.proxy_pool.refresh()
+        self.session.proxies = self.proxy_pool.best() or self.search_proxy() or {}
+        self.proxy_pool.start()
         self.verbose_print("Proxy found...")
         self.proxy = True
         self.burned_proxies = []
@@ -131,14 +212,54 @@ class AIS:
         columns,
         columns_excluded,
         print_query,
+        paginate,
+        max_workers,
+        cache,
+        cache_ttl,
+        compact,
+        sink,
+        rate_limiter,
+        pool_connections=10,
+        pool_maxsize=None,
+        timeout=None,
+        hooks=None,
+        fleet_ttl=300,
+        reference_cache=None,
+        reference_ttl=7 * 24 * 3600,
+        reference_miss_ttl=3600,
     ):
         """Initialize instance attributes."""
+        if not isinstance(max_workers, int) or max_workers < 1:
+            raise ValueError("max_workers must be a positive integer.")
+        if pool_maxsize is None:
+            pool_maxsize = max(10, max_workers)
+        if pool_connections < 1 or pool_maxsize < 1:
+            raise ValueError("pool_connections and pool_maxsize must be positive.")
         self.return_df = return_df
         self.return_total_count = return_total_count
         self.verbose = verbose
         self.columns = columns
         self.columns_excluded = columns_excluded
         self.print_query = print_query
+        self.paginate = paginate
+        self.max_workers = max_workers
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self.compact = compact
+        self.sink = sink
+        self.rate_limiter = rate_limiter
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.timeout = timeout
+        if isinstance(hooks, Hooks):
+            hooks = [hooks]
+        self.hooks = list(hooks or ())
+        self.fleet_registry = FleetRegistry(ttl=fleet_ttl)
+        self.reference_cache = reference_cache
+        self.reference_ttl = reference_ttl
+        self.reference_miss_ttl = reference_miss_ttl
+        self.proxy_lock = threading.Lock()
+        self.proxy_searched_at = None
         self.logged_in = False
 
     def login(self, email, password, use_proxy=False):
@@ -173,10 +294,11 @@ class AIS:
         }
 
         response = self.session.post(
-            "https://www.marinetraffic.com/en/users/ajax_login",
+            f"{self.base_url}/en/users/ajax_login",
             data=login_payload,
             headers=login_headers,
             proxies=self.session.proxies if use_proxy else None,
+            timeout=self.timeout,
         )
 
         if response.status_code == 200:
@@ -197,60 +319,147 @@ class AIS:
             UserNotLoggedInError: If the user is not logged in.
         """
         if not self.logged_in:
-            raise UserNotLoggedInError("User must be logged in to perform this action.")
+            raise UserNotLoggedInError()
 
-    def get_fleets(self):
+    def get_fleets(self, refresh=False):
         """Fetches fleets data from the AIS service.
 
+        The fleets are kept in `fleet_registry` for `fleet_ttl` seconds and are only
+        fetched again once they expired or if `refresh` is set.
+
+        Args:
+            refresh (bool, optional): If True, ignore the cached fleets. Defaults to False.
+
         Raises:
             UserNotLoggedInError: If the user is not logged in.
             Exception: If the request fails with a non-200 status code.
 
         Returns:
-            dict: The JSON response containing fleets data if the request is successful.
+            list: The fleets of the user as [id, name] pairs.
         """
         self._ensure_logged_in()
+        if not refresh:
+            fleets = self.fleet_registry.fleets()
+            if fleets is not None:
+                return fleets
         response = self.session.get(
-            "https://www.marinetraffic.com/en/search/fleetList",
+            f"{self.base_url}/en/search/fleetList",
             headers={
                 "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36",
                 "vessel-image": "00b3ac45291acfd4e2e0dc4e46b24ec56c05",
                 "x-requested-with": "XMLHttpRequest",
             },
+            timeout=self.timeout,
         )
         if response.status_code == 200:
             self.verbose_print("Fetching fleets successful")
-            return response.json()
+            fleets = response.json()
+            self.fleet_registry.update(fleets)
+            return fleets
         else:
             raise Exception(
                 f"Something went wrong! {response.status_code}-{response.text}"
             )
 
-    # @retry(**retry_options)
+    def find_fleet(self, fleet_id=None, fleet_name=None):
+        """Looks up a fleet by id or by name in the fleet registry.
+
+        If the fleet is unknown, the fleets are fetched again once, since it may have
+        been created after they were cached.
+
+        Raises:
+            FleetNotFoundError: If the user has no such fleet.
+
+        Returns:
+            list: The fleet as [id, name] pair.
+        """
+        if fleet_id is not None:
+            lookup, key = self.fleet_registry.by_id, fleet_id
+        else:
+            lookup, key = self.fleet_registry.by_name, fleet_name
+        self.get_fleets()
+        fleet = lookup(key)
+        if fleet is None:
+            self.get_fleets(refresh=True)
+            fleet = lookup(key)
+        if fleet is None:
+            raise FleetNotFoundError(key)
+        return fleet
+
     def get_vessels_by_fleet_id(self, fleet_id: str):
-        self._ensure_logged_in()
-        fleets = self.get_fleets()
-        for fleet in fleets:
-            if fleet[0] == fleet_id:
-                return self.get_data(fleets_filter=FleetFilter([[fleet[0], fleet[1]]]))
-        raise Exception("Fleet not found")
+        fleet = self.find_fleet(fleet_id=fleet_id)
+        return self.get_data(fleets_filter=FleetFilter([[fleet[0], fleet[1]]]))
 
-    # @retry(**retry_options)
     def get_vessels_by_fleet_name(self, fleet_name: str):
+        fleet = self.find_fleet(fleet_name=fleet_name)
+        return self.get_data(fleets_filter=FleetFilter([[fleet[0], fleet[1]]]))
+
+    def get_vessels_in_all_fleets(self, chunk_size=20, max_workers=None):
+        """
+        Retrieves the vessels of every fleet of the user.
+
+        The fleets are split into chunks of up to `chunk_size` fleets which are fetched
+        concurrently. Every page of a chunk is fetched, so large fleet sets are not
+        truncated to the row limit of a single request.
+
+        Args:
+            chunk_size (int, optional): Maximum number of fleets per query. Defaults to 20.
+            max_workers (int, optional): Number of chunks fetched concurrently. Defaults to `max_workers`.
+
+        Returns:
+            list or pd.DataFrame or tuple: The vessels, deduplicated on `SHIP_ID`.
+        """
         self._ensure_logged_in()
-        fleets = self.get_fleets()
-        for fleet in fleets:
-            if fleet[1] == fleet_name:
-                return self.get_data(fleets_filter=FleetFilter([[fleet[0], fleet[1]]]))
-        raise Exception("Fleet not found")
-
-    # @retry(**retry_options)
-    def get_vessels_in_all_fleets(self):
-        self._ensure_logged_in()
-        if not self.logged_in:
-            raise UserNotLoggedInError()
-        fleets = self.get_fleets()
-        return self.get_data(fleets_filter=FleetFilter(fleets))
+        return self.get_fleets_data(self.get_fleets(), chunk_size, max_workers)
+
+    def fleet_chunks(self, fleets, chunk_size):
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer.")
+        fleets = [[fleet[0], fleet[1]] for fleet in fleets]
+        return [
+            fleets[start : start + chunk_size]
+            for start in range(0, len(fleets), chunk_size)
+        ]
+
+    def fetch_fleet_chunk(self, chunk):
+        """
+        Fetches every page of the vessels of a chunk of fleets.
+
+        Every page is retried on its own according to the retry policy.
+
+        Returns:
+            list: The rows of all pages.
+        """
+        request_url, referer_url = self.build_data_urls(fleets_filter=FleetFilter(chunk))
+        self.query_print("request_url: " + request_url)
+        fetch_page = self.retry_policy.wrap(self.fetch_page, on_retry=self.on_retry)
+        payload = fetch_page(request_url, referer_url)
+        rows, total_count = list(payload["data"]), payload["totalCount"]
+        page_size = len(rows)
+        if 0 < page_size < total_count:
+            for page in range(2, math.ceil(total_count / page_size) + 1):
+                rows.extend(fetch_page(page_url(request_url, page), referer_url)["data"])
+        return rows
+
+    def get_fleets_data(self, fleets, chunk_size=20, max_workers=None):
+        """
+        Retrieves the vessels of the given fleets with concurrent, chunked queries.
+
+        Args:
+            fleets (list): The fleets as [id, name] pairs, e.g. from `get_fleets`.
+            chunk_size (int, optional): Maximum number of fleets per query. Defaults to 20.
+            max_workers (int, optional): Number of chunks fetched concurrently. Defaults to `max_workers`.
+
+        Returns:
+            list or pd.DataFrame or tuple: The vessels, deduplicated on `SHIP_ID`.
+        """
+        chunks = self.fleet_chunks(fleets, chunk_size)
+        self.verbose_print(f"Fetching {len(fleets)} fleets in {len(chunks)} chunks...")
+        with ThreadPoolExecutor(max_workers or self.max_workers) as executor:
+            results = list(executor.map(self.fetch_fleet_chunk, chunks))
+        rows = self.join_references(merge_fleet_rows(results))
+        self.export(rows)
+        return self.format_result(rows, len(rows))
 
     def set_filters(self, filter_config):
         """Set the filters for the query based on the provided configuration.
@@ -302,6 +511,103 @@ class AIS:
 
         # Join the columns into a string for the URL
         self.columns_url = ",".join(columns_to_include)
+        self.static_columns, dynamic_columns = split_columns(columns_to_include)
+        self.dynamic_columns_url = ",".join(dynamic_columns)
+        self.added_key_fields = added_key_fields(columns_to_include)
+        self.reference_columns_url = ",".join(self.static_columns + list(KEY_COLUMNS))
+
+    def poll_columns_url(self):
+        """Return the columns of area and data queries.
+
+        With a reference cache, the static columns are left out and joined locally by
+        `join_references` instead.
+        """
+        if self.reference_cache is not None and self.static_columns:
+            return self.dynamic_columns_url
+        return self.columns_url
+
+    def join_references(self, rows):
+        """
+        Adds the static attributes of the reference cache to rows of a split query.
+
+        The attributes of vessels missing from the cache are fetched by MMSI, in
+        chunks of up to 100 vessels, and cached for `reference_ttl` seconds. Vessels
+        without a result are cached for `reference_miss_ttl` seconds, so they are not
+        looked up on every poll. Key columns the split query only requested for the
+        lookup are removed from the rows.
+
+        Args:
+            rows (list): The rows of an area or data query.
+
+        Returns:
+            list: The rows with their static attributes.
+        """
+        if self.reference_cache is None or not self.static_columns or not rows:
+            return rows
+        references, missing = {}, {}
+        for row in rows:
+            ship_id = row.get("SHIP_ID")
+            if ship_id is None:
+                continue
+            ship_id = str(ship_id)
+            if ship_id in references or ship_id in missing:
+                continue
+            reference = self.reference_cache.get(reference_key(ship_id))
+            if reference is None:
+                missing[ship_id] = row.get("MMSI")
+            else:
+                references[ship_id] = reference
+        if missing:
+            references.update(self.fetch_references(missing))
+        return [
+            join_reference(
+                row, references.get(str(row.get("SHIP_ID"))), drop=self.added_key_fields
+            )
+            for row in rows
+        ]
+
+    def fetch_references(self, missing, chunk_size=100):
+        """
+        Fetches and caches the static attributes of vessels.
+
+        Args:
+            missing (dict): The MMSI of every vessel to fetch, by `SHIP_ID`.
+            chunk_size (int, optional): Maximum number of MMSIs per request. Defaults to 100.
+
+        Returns:
+            dict: The static attributes of every vessel, by `SHIP_ID`.
+        """
+        mmsis = sorted(
+            {int(mmsi) for mmsi in missing.values() if str(mmsi or "").isdigit()}
+        )
+        chunks = [
+            mmsis[start : start + chunk_size]
+            for start in range(0, len(mmsis), chunk_size)
+        ]
+        self.verbose_print(f"Fetching the static attributes of {len(mmsis)} vessels...")
+
+        def fetch_chunk(chunk):
+            query = CompiledQuery.build(
+                self.base_url,
+                self.reference_columns_url,
+                ListFilter("mmsis", chunk).to_query(),
+            )
+            return [row for rows in self.iter_pages(*query.urls) for row in rows]
+
+        with ThreadPoolExecutor(self.max_workers) as executor:
+            results = list(executor.map(fetch_chunk, chunks))
+        found = {
+            str(row["SHIP_ID"]): to_reference(row)
+            for rows in results
+            for row in rows
+            if row.get("SHIP_ID") is not None
+        }
+        references = {}
+        for ship_id in missing:
+            references[ship_id] = found.get(ship_id, {})
+            ttl = self.reference_ttl if references[ship_id] else self.reference_miss_ttl
+            self.reference_cache.set(reference_key(ship_id), references[ship_id], ttl=ttl)
+        return references
 
     def _determine_columns_to_include(self, possible_columns):
         """Determine which columns to include in the data request.
@@ -350,25 +656,85 @@ class AIS:
         if self.print_query:
             print(message)
 
+    def emit(self, event, *args):
+        """Call the method `event` of every hook with `args`.
+
+        An exception raised by a hook is printed in verbose mode and otherwise ignored,
+        so a broken hook cannot break a request.
+        """
+        for hook in self.hooks:
+            try:
+                getattr(hook, event)(*args)
+            except Exception as e:
+                self.verbose_print(f"Hook {hook!r} failed on {event}: {e}")
+
+    def on_retry(self, attempt, wait, error):
+        """Notify the hooks that a failed attempt is retried after `wait` seconds."""
+        self.verbose_print(f"Attempt {attempt} failed ({error!r}), retrying in {wait:.1f}s")
+        self.emit("on_retry", attempt, wait, error)
+
+    def decode(self, request_url, content):
+        """Decode a response body and notify the hooks of the decode time and row count."""
+        start = time.perf_counter()
+        payload = json_loads(content)
+        if self.hooks:
+            rows = len(payload.get("data") or ()) if isinstance(payload, dict) else 0
+            self.emit("on_decode", request_url, time.perf_counter() - start, rows)
+        return payload
+
     def check_proxy(self):
-        """Check if the current proxy is working and renew it if not."""
-        if self.proxy and not self.freeproxy.check_if_proxy_is_working(
-            self.session.proxies
-        ):
-            self.verbose_print("Proxy has to be renewed.")
-            self.renew_proxy()
+        """Renew the current proxy if the proxy pool no longer considers it alive.
+
+        Threads finding the same dead proxy renew it only once.
+        """
+        if self.proxy and not self.proxy_pool.is_alive(self.session.proxies):
+            with self.proxy_lock:
+                if not self.proxy_pool.is_alive(self.session.proxies):
+                    self.verbose_print("Proxy has to be renewed.")
+                    self.renew_proxy()
 
     def renew_proxy(self):
-        """Renew the proxy configuration."""
+        """Replace the current proxy by the best live proxy of the proxy pool.
+
+        Only if the pool knows no other live proxy, a working one is searched for.
+        If none is found either, the current proxy is kept.
+        """
         self.verbose_print("Looking for a new proxy...")
         try:
-            self.verbose_print("Old proxy: " + self.session.proxies["https"])
-            self.session.proxies = self.freeproxy.get()
-            self.verbose_print("New proxy: " + self.session.proxies["https"])
+            old_proxy = self.session.proxies
+            self.verbose_print(f"Old proxy: {old_proxy}")
+            new_proxy = self.proxy_pool.best(exclude=old_proxy) or self.search_proxy()
+            if not new_proxy:
+                self.verbose_print("No other working proxy found, keeping the old one.")
+                return
+            self.session.proxies = new_proxy
+            self.verbose_print(f"New proxy: {self.session.proxies}")
+            self.emit("on_proxy_renewed", old_proxy, self.session.proxies)
         except Exception as e:
             self.verbose_print(f"An error occurred while renewing proxy: {e}")
 
-    @retry(**retry_options)
+    def search_proxy(self):
+        """Search a working proxy with `FreeProxy` and record it in the proxy pool.
+
+        The search blocks until the candidates are checked, so it runs at most once
+        per `recheck_interval` of the pool; in between only the pool is consulted.
+
+        Returns:
+            dict: The proxy, or None if none was found or the last search was too recent.
+        """
+        now = time.monotonic()
+        if (
+            self.proxy_searched_at is not None
+            and now - self.proxy_searched_at < self.proxy_pool.recheck_interval
+        ):
+            return None
+        self.proxy_searched_at = now
+        proxy = self.freeproxy.get()
+        if proxy:
+            self.proxy_pool.report_success(proxy)
+        return proxy
+
+    @with_retry
     def get_area_data(self, area):
         """
         Retrieves data for a specified geographic area from MarineTraffic.
@@ -390,6 +756,48 @@ class AIS:
             To retrieve data for multiple areas, use an iterable:
             >>> data = get_area_data(["ADRIA", "BALTIC"])
         """
+        # Read the filters once, so a concurrent `set_filters` cannot change them
+        # between building the request and storing its result
+        filters = self.filters
+        request_url, referer_url = self.area_query(area, filters=filters).urls
+        scope = None
+        if self.result_cache is not None:
+            scope = (self.area_query(area, filters=Filters()).canonical, "global_area")
+            local = self.answer_locally(scope[0], filters)
+            if local is not None:
+                return local
+        self.query_print("referer_url: " + referer_url)
+        self.query_print("request_url: " + request_url)
+        return self.return_response(
+            request_url, referer_url, scope=scope, filters=filters, split=True
+        )
+
+    def build_area_urls(self, area):
+        """
+        Builds the request and referer URLs used by `get_area_data`.
+
+        Args:
+            area (str or iterable): A valid area code or an iterable of area codes.
+
+        Returns:
+            tuple: The request URL and the referer URL.
+        """
+        return self.area_query(area).urls
+
+    def area_query(self, area, filters=None):
+        """
+        Compiles the query used by `get_area_data`.
+
+        Args:
+            area (str or iterable): A valid area code or an iterable of area codes.
+            filters (Filters, optional): Filters to apply instead of the configured ones. Defaults to None.
+
+        Returns:
+            CompiledQuery: The compiled query.
+
+        Raises:
+            NotSupportedParameterError: If the provided area code(s) are not valid.
+        """
         _possible_areas = {
             "ADRIA": "Adriatic Sea",
             "AG": "Arabian Sea",
@@ -444,7 +852,7 @@ class AIS:
         }
         if isinstance(area, str):
             if area not in _possible_areas.keys():
-                raise NotSupportedParameterError("area", _possible_areas.keys, area)
+                raise NotSupportedParameterError("area", list(_possible_areas), area)
             areas_long = urllib.parse.quote_plus(area)
             area_short = area
         if isinstance(area, collections.abc.Iterable) and not isinstance(
@@ -460,19 +868,15 @@ class AIS:
             )
             area_short = ",".join(area)
 
-        request_url = (
-            f"https://www.marinetraffic.com/en/reports?asset_type=vessels&columns={self.columns_url}"
-            f"&area_in|in|{areas_long}|area_in={area_short}{self.filters.to_query(ignore_filter='global_area')}"
+        return CompiledQuery.build(
+            self.base_url,
+            self.poll_columns_url(),
+            f"&area_in|in|{areas_long}|area_in={area_short}",
+            filters=self.filters if filters is None else filters,
+            ignore_filter="global_area",
         )
-        referer_url = (
-            f"https://www.marinetraffic.com/en/data/?asset_type=vessels&columns={self.columns_url}"
-            f"&area_in|in|{areas_long}|area_in={area_short}{self.filters.to_query(ignore_filter='global_area')}"
-        )
-        self.query_print("referer_url: " + referer_url)
-        self.query_print("request_url: " + request_url)
-        return self.return_response(request_url, referer_url)
 
-    @retry(**retry_options)
+    @with_retry
     def get_location(self, mmsi):
         """
         Retrieves location data for a vessel by its MMSI (Maritime Mobile Service Identity) from MarineTraffic.
@@ -487,21 +891,160 @@ class AIS:
             To retrieve location data for a vessel with MMSI 211281610, use:
             >>> location_data = get_location(211281610)
         """
-        if isinstance(mmsi, int):
-            mmsi = str(mmsi)
-        request_url = (
-            f"https://www.marinetraffic.com/en/reports?asset_type=vessels&columns={self.columns_url}"
-            f"&mmsi|eq|mmsi={mmsi}{self.filters.to_query(ignore_filter='mmsi')}"
-        )
-
-        referer_url = (
-            f"https://www.marinetraffic.com/en/data/?asset_type=vessels&columns={self.columns_url}"
-            f"&mmsi|eq|mmsi={mmsi}{self.filters.to_query(ignore_filter='mmsi')}"
-        )
+        request_url, referer_url = self.build_location_urls(mmsi)
         self.query_print("referer_url: " + referer_url)
         self.query_print("request_url: " + request_url)
         return self.return_response(request_url, referer_url)
 
+    def build_location_urls(self, mmsi):
+        """
+        Builds the request and referer URLs used by `get_location`.
+
+        Args:
+            mmsi (int or str): The MMSI of the vessel.
+
+        Returns:
+            tuple: The request URL and the referer URL.
+        """
+        return self.location_query(mmsi).urls
+
+    def location_query(self, mmsi):
+        """
+        Compiles the query used by `get_location`.
+
+        Args:
+            mmsi (int or str): The MMSI of the vessel.
+
+        Returns:
+            CompiledQuery: The compiled query.
+        """
+        return CompiledQuery.build(
+            self.base_url,
+            self.columns_url,
+            f"&mmsi|eq|mmsi={mmsi}",
+            filters=self.filters,
+            ignore_filter="mmsi",
+        )
+
+    def get_locations(self, mmsis, chunk_size=100, max_workers=None):
+        """
+        Retrieves location data for many vessels with as few requests as possible.
+
+        The MMSIs are packed into `mmsi|in|...` list filters of up to `chunk_size`
+        entries and the chunks are fetched concurrently.
+
+        Args:
+            mmsis (iterable): The MMSIs of the vessels, as int or str.
+            chunk_size (int, optional): Maximum number of MMSIs per request. Defaults to 100.
+            max_workers (int, optional): Number of chunks fetched concurrently. Defaults to `max_workers`.
+
+        Returns:
+            pd.DataFrame: One row per requested MMSI, indexed by MMSI. The column `FOUND`
+            is False for MMSIs without a result, whose other columns are missing.
+
+        Example:
+            To retrieve the location of two vessels:
+            >>> locations = get_locations([211281610, 636016431])
+        """
+        requested, chunks = self.location_chunks(mmsis, chunk_size)
+
+        def fetch_chunk(chunk):
+            request_url, referer_url = self.build_locations_urls(chunk)
+            self.query_print("request_url: " + request_url)
+            return [
+                row
+                for rows in self.iter_pages(request_url, referer_url)
+                for row in rows
+            ]
+
+        with ThreadPoolExecutor(max_workers or self.max_workers) as executor:
+            rows = [
+                row for chunk_rows in executor.map(fetch_chunk, chunks) for row in chunk_rows
+            ]
+        return self.locations_frame(requested, rows)
+
+    def location_chunks(self, mmsis, chunk_size):
+        """
+        Splits the MMSIs of `get_locations` into the chunks of its list queries.
+
+        Args:
+            mmsis (iterable): The MMSIs of the vessels, as int or str.
+            chunk_size (int): Maximum number of MMSIs per request.
+
+        Returns:
+            tuple: The unique MMSIs in the order requested and the sorted chunks.
+
+        Raises:
+            ValueError: If the mmsi column is not requested or `chunk_size` is not positive.
+        """
+        if "mmsi" not in self.columns_url.split(","):
+            raise ValueError("get_locations requires the mmsi column.")
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer.")
+        requested = list(dict.fromkeys(int(mmsi) for mmsi in mmsis))
+        ordered = sorted(requested)
+        chunks = [
+            ordered[start : start + chunk_size]
+            for start in range(0, len(ordered), chunk_size)
+        ]
+        self.verbose_print(
+            f"Fetching {len(requested)} MMSIs in {len(chunks)} requests..."
+        )
+        return requested, chunks
+
+    def locations_frame(self, requested, rows):
+        """
+        Builds the result of `get_locations`.
+
+        Args:
+            requested (list): The requested MMSIs.
+            rows (list): The fetched rows.
+
+        Returns:
+            pd.DataFrame: One row per requested MMSI, indexed by MMSI, with the column `FOUND`.
+        """
+        df = build_typed_df(rows, compact=self.compact)
+        if df.empty:
+            df = pd.DataFrame({"MMSI": pd.Series([], dtype="Int64")})
+        df = df.dropna(subset=["MMSI"]).drop_duplicates(subset="MMSI")
+        df = df.set_index(df["MMSI"].astype("int64")).drop(columns="MMSI")
+        df = df.reindex(pd.Index(requested, name="MMSI"))
+        df["FOUND"] = df.index.isin(
+            [int(row["MMSI"]) for row in rows if row.get("MMSI") is not None]
+        )
+        return df
+
+    def build_locations_urls(self, mmsis):
+        """
+        Builds the request and referer URLs used by `get_locations` for one chunk.
+
+        Args:
+            mmsis (list): The MMSIs of the chunk.
+
+        Returns:
+            tuple: The request URL and the referer URL.
+        """
+        return self.locations_query(mmsis).urls
+
+    def locations_query(self, mmsis):
+        """
+        Compiles the query used by `get_locations` for one chunk.
+
+        Args:
+            mmsis (list): The MMSIs of the chunk.
+
+        Returns:
+            CompiledQuery: The compiled query.
+        """
+        return CompiledQuery.build(
+            self.base_url,
+            self.columns_url,
+            ListFilter("mmsis", list(mmsis)).to_query(),
+            filters=self.filters,
+            ignore_filter={"mmsi", "mmsis"},
+        )
+
+    @with_retry
     def get_data(self, use_Filters=False, fleets_filter=None):
         """
         Retrieves data from MarineTraffic based on specified filters and fleet options.
@@ -511,7 +1054,10 @@ class AIS:
             fleets_filter (FleetsFilter, optional): Fleet-specific filter to apply. Defaults to None.
 
         Returns:
-            dict or str: If successful, returns the retrieved data as a dictionary. If there is an issue, returns an error message as a string.
+            list or pd.DataFrame: The retrieved data.
+
+        Raises:
+            ResponseStatusError: If the server does not answer with status code 200.
 
         Example:
             To retrieve data using filters:
@@ -521,44 +1067,159 @@ class AIS:
             >>> fleets_filter = FleetsFilter(...)
             >>> data = get_data(use_Filters=True, fleets_filter=fleets_filter)
         """
-        if use_Filters:
-            if fleets_filter is None:
-                request_url = (
-                    f"https://www.marinetraffic.com/en/reports?asset_type=vessels&columns={self.columns_url}"
-                    f"{self.filters.to_query()}"
-                )
-                referer_url = (
-                    f"https://www.marinetraffic.com/en/data/?asset_type=vessels&columns={self.columns_url}"
-                    f"{self.filters.to_query()}"
-                )
-            else:
-                request_url = (
-                    f"https://www.marinetraffic.com/en/reports?asset_type=vessels&columns={self.columns_url},notes"
-                    f"{self.filters.to_query()}{fleets_filter.to_request_query()}"
-                )
-                referer_url = (
-                    f"https://www.marinetraffic.com/en/data/?asset_type=vessels&columns={self.columns_url},notes"
-                    f"{self.filters.to_query()}{fleets_filter.to_referer_query()}"
-                )
-        else:
-            if fleets_filter is None:
-                request_url = f"https://www.marinetraffic.com/en/reports?asset_type=vessels&columns={self.columns_url}"
-                referer_url = f"https://www.marinetraffic.com/en/data/?asset_type=vessels&columns={self.columns_url}"
-            else:
-                request_url = (
-                    f"https://www.marinetraffic.com/en/reports?asset_type=vessels&columns={self.columns_url},notes"
-                    f"{fleets_filter.to_request_query()}"
-                )
-                referer_url = (
-                    f"https://www.marinetraffic.com/en/data/?asset_type=vessels&columns={self.columns_url},notes"
-                    f"{fleets_filter.to_referer_query()}"
-                )
+        filters = self.filters if use_Filters else Filters()
+        request_url, referer_url = self.build_data_urls(
+            use_Filters=use_Filters, fleets_filter=fleets_filter, filters=filters
+        )
+        scope = None
+        if self.result_cache is not None:
+            scope = (self.data_query(False, fleets_filter).canonical, None)
+            local = self.answer_locally(scope[0], filters)
+            if local is not None:
+                return local
         self.query_print("referer_url: " + referer_url)
         self.query_print("request_url: " + request_url)
         self.verbose_print("Getting data...")
-        return self.return_response(request_url=request_url, referer_url=referer_url)
+        return self.return_response(
+            request_url=request_url,
+            referer_url=referer_url,
+            scope=scope,
+            filters=filters,
+            split=True,
+        )
 
-    @retry(**retry_options)
+    def build_data_urls(self, use_Filters=False, fleets_filter=None, filters=None):
+        """
+        Builds the request and referer URLs used by `get_data`.
+
+        Args:
+            use_Filters (bool, optional): Whether to apply filters. Defaults to False.
+            fleets_filter (FleetsFilter, optional): Fleet-specific filter to apply. Defaults to None.
+            filters (Filters, optional): Filters to apply instead of the configured ones. Defaults to None.
+
+        Returns:
+            tuple: The request URL and the referer URL.
+        """
+        return self.data_query(use_Filters, fleets_filter, filters).urls
+
+    def data_query(self, use_Filters=False, fleets_filter=None, filters=None):
+        """
+        Compiles the query used by `get_data`.
+
+        Args:
+            use_Filters (bool, optional): Whether to apply filters. Defaults to False.
+            fleets_filter (FleetsFilter, optional): Fleet-specific filter to apply. Defaults to None.
+            filters (Filters, optional): Filters to apply instead of the configured ones. Defaults to None.
+
+        Returns:
+            CompiledQuery: The compiled query.
+        """
+        filters = self.filters if filters is None else filters
+        return CompiledQuery.build(
+            self.base_url,
+            self.poll_columns_url(),
+            filters=filters if use_Filters else None,
+            fleets_filter=fleets_filter,
+        )
+
+    def iter_area_data(self, area, chunks=False):
+        """
+        Iterates over the data of a geographic area page by page.
+
+        Unlike `get_area_data`, every page of the result is fetched and each page is
+        handed out as soon as it arrives, so memory is bounded by the page size.
+
+        Args:
+            area (str or iterable): A valid area code or an iterable of area codes.
+            chunks (bool, optional): If True, yield whole pages instead of single rows. Defaults to False.
+
+        Yields:
+            dict or list or pd.DataFrame: A row, or a page as list or as DataFrame if `return_df` is set.
+
+        Example:
+            To process the vessels of the East Mediterranean page by page:
+            >>> for page in AIS(return_df=True).iter_area_data("EMED", chunks=True):
+            ...     process(page)
+        """
+        request_url, referer_url = self.build_area_urls(area)
+        self.query_print("request_url: " + request_url)
+        yield from self.iter_response(request_url, referer_url, chunks)
+
+    def iter_data(self, use_Filters=False, fleets_filter=None, chunks=False):
+        """
+        Iterates over the data of a filtered query page by page.
+
+        Args:
+            use_Filters (bool, optional): Whether to use the configured filters. Defaults to False.
+            fleets_filter (FleetsFilter, optional): Fleet-specific filter to apply. Defaults to None.
+            chunks (bool, optional): If True, yield whole pages instead of single rows. Defaults to False.
+
+        Yields:
+            dict or list or pd.DataFrame: A row, or a page as list or as DataFrame if `return_df` is set.
+        """
+        request_url, referer_url = self.build_data_urls(
+            use_Filters=use_Filters, fleets_filter=fleets_filter
+        )
+        self.query_print("request_url: " + request_url)
+        yield from self.iter_response(request_url, referer_url, chunks)
+
+    def iter_response(self, request_url, referer_url, chunks=False):
+        """
+        Yields the rows or pages of every page of a result.
+
+        Args:
+            request_url (str): The URL of the first page.
+            referer_url (str): The URL of the referring page.
+            chunks (bool, optional): If True, yield whole pages instead of single rows. Defaults to False.
+        """
+        for data in self.iter_pages(request_url, referer_url):
+            data = self.join_references(data)
+            self.export(data)
+            if not chunks:
+                yield from data
+            elif self.return_df:
+                yield build_typed_df(data, compact=self.compact)
+            else:
+                yield data
+
+    def iter_pages(self, request_url, referer_url):
+        """
+        Yields the rows of every page of a result in page order.
+
+        At most `max_workers` pages are in flight at the same time. Every page is
+        retried on its own according to the retry policy.
+
+        Args:
+            request_url (str): The URL of the first page.
+            referer_url (str): The URL of the referring page.
+
+        Yields:
+            list: The rows of a page.
+        """
+        fetch_page = self.retry_policy.wrap(self.fetch_page, on_retry=self.on_retry)
+        payload = fetch_page(request_url, referer_url)
+        total_count, page_size = payload["totalCount"], len(payload["data"])
+        yield payload["data"]
+        if page_size == 0 or page_size >= total_count:
+            return
+        pages = iter(range(2, math.ceil(total_count / page_size) + 1))
+
+        def submit(executor, page):
+            return executor.submit(fetch_page, page_url(request_url, page), referer_url)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            in_flight = deque(
+                submit(executor, page)
+                for page in itertools.islice(pages, self.max_workers)
+            )
+            while in_flight:
+                payload = in_flight.popleft().result()
+                page = next(pages, None)
+                if page is not None:
+                    in_flight.append(submit(executor, page))
+                yield payload["data"]
+
+    @with_retry
     def get_data_by_url(self, url):
         """
         Retrieves data from MarineTraffic using a provided URL.
@@ -567,7 +1228,10 @@ class AIS:
             url (str): The URL to retrieve data from.
 
         Returns:
-            dict or str: If successful, returns the retrieved data as a dictionary. If there is an issue, returns an error message as a string.
+            list or pd.DataFrame: The retrieved data.
+
+        Raises:
+            ResponseStatusError: If the server does not answer with status code 200.
 
         Example:
             To retrieve data from a specific URL:
@@ -578,62 +1242,298 @@ class AIS:
         request_url = url.replace("data", "reports")
         return self.return_response(request_url, referer_url)
 
-    def return_response(self, request_url, referer_url):
+    def build_request_headers(self, referer_url):
         """
-        Sends an HTTP request to the specified URL and returns the response data.
+        Builds the headers sent with every data request.
 
         Args:
-            request_url (str): The URL to send the HTTP request to.
             referer_url (str): The URL of the referring page.
 
         Returns:
-            dict or str: If the request is successful, returns the response data as a dictionary. If there is an issue, returns an error message as a string.
+            dict: The request headers.
+        """
+        return {
+            "Referer": referer_url,
+            "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+            "vessel-image": "0026501dd5e7cae9b8afd72aa41a3f831929",
+            "x-requested-with": "XMLHttpRequest",
+        }
 
-        Example:
-            To send an HTTP request and retrieve response data:
-            >>> request_url = "https://www.marinetraffic.com/en/reports?..."
-            >>> referer_url = "https://www.marinetraffic.com/en/data/?..."
-            >>> data = return_response(request_url, referer_url)
+    def send_request(self, request_url, referer_url):
+        """
+        Sends an HTTP request to the specified URL and checks non-JSON responses for Cloudflare protection.
+
+        Args:
+            request_url (str): The URL to send the HTTP request to.
+            referer_url (str): The URL of the referring page.
+
+        Returns:
+            requests.Response: The HTTP response.
         """
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        self.check_proxy()
+        proxies = self.session.proxies
+        self.emit("on_request_start", request_url)
+        start = time.perf_counter()
         try:
-            self.check_proxy()
             response = self.session.get(
                 request_url,
-                headers={
-                    "Referer": referer_url,
-                    "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                    "vessel-image": "0026501dd5e7cae9b8afd72aa41a3f831929",
-                    "x-requested-with": "XMLHttpRequest",
-                },
+                headers=self.build_request_headers(referer_url),
+                timeout=self.timeout,
             )
         except ConnectionError as ce:
             self.verbose_print("Proxy has died. Looking for new proxy...")
+            if self.proxy:
+                self.proxy_pool.report_failure(proxies)
+            self.emit("on_request_end", request_url, None, time.perf_counter() - start, 0, ce)
             raise ce
         except Exception as e:
             self.verbose_print(f"An error occurred while sending the request: {e}")
+            self.emit("on_request_end", request_url, None, time.perf_counter() - start, 0, e)
             raise e
-        self.check_response_cloudflare(response)
+        seconds = time.perf_counter() - start
+        error = None
+        try:
+            # Only bodies that are not JSON can be a Cloudflare challenge page
+            if not is_json_body(response.content, response.headers.get("Content-Type")):
+                self.check_response_cloudflare(response)
+        except CloudflareError as e:
+            self.emit("on_cloudflare", request_url)
+            error = e
+            raise
+        finally:
+            self.emit(
+                "on_request_end",
+                request_url,
+                response.status_code,
+                seconds,
+                len(response.content),
+                error,
+            )
 
-        self.verbose_print(f"Used proxy: {self.session.proxies}")
-        if response.status_code == 200:
-            if self.return_df:
-                if self.return_total_count:
-                    return (
-                        pd.DataFrame(json.loads(response.text)["data"]),
-                        json.loads(response.text)["totalCount"],
-                    )
-                else:
-                    return pd.DataFrame(json.loads(response.text)["data"])
-            else:
-                if self.return_total_count:
-                    return (
-                        json.loads(response.text)["data"],
-                        json.loads(response.text)["totalCount"],
-                    )
-                else:
-                    return json.loads(response.text)["data"]
+        if self.proxy and response.status_code == 200:
+            self.proxy_pool.report_success(proxies, seconds)
+        self.verbose_print(f"Used proxy: {proxies}")
+        return response
+
+    def return_response(
+        self, request_url, referer_url, scope=None, filters=None, split=False
+    ):
+        """
+        Sends an HTTP request to the specified URL and returns the response data.
+
+        If pagination is enabled, the remaining pages are fetched as well and merged
+        into a single result.
+
+        Args:
+            request_url (str): The URL to send the HTTP request to.
+            referer_url (str): The URL of the referring page.
+            scope (tuple, optional): The canonical query without filters and the keys
+                of the filters it ignores. If given, a complete result is stored in
+                the `result_cache` under `filters`.
+            filters (Filters, optional): The filters the request was built with. Required
+                if `scope` is given.
+            split (bool, optional): If True, the query requests the columns of
+                `poll_columns_url` and the static attributes are joined from the
+                reference cache. Defaults to False.
+
+        Returns:
+            list or pd.DataFrame or tuple: The response data, formatted by `format_result`.
+
+        Raises:
+            ResponseStatusError: If the server does not answer with status code 200. Status
+                codes 429 and 5xx are retried by the methods calling this one.
+
+        Example:
+            To send an HTTP request and retrieve response data:
+            >>> request_url = "https://www.marinetraffic.com/en/reports?..."
+            >>> referer_url = "https://www.marinetraffic.com/en/data/?..."
+            >>> data = return_response(request_url, referer_url)
+        """
+        payload = self.fetch_page(request_url, referer_url)
+        data, total_count = payload["data"], payload["totalCount"]
+        if self.paginate:
+            data = data + self.fetch_remaining_pages(
+                request_url, referer_url, total_count, len(data)
+            )
+        if split:
+            data = self.join_references(data)
+        if scope is not None:
+            self.store_result(scope, filters, data, total_count)
+        self.export(data)
+        return self.format_result(data, total_count)
+
+    def answer_locally(self, scope, filters):
+        """
+        Answers a query from a stored result subsuming it, if there is a result cache.
+
+        Args:
+            scope (str): The canonical query without filters.
+            filters (Filters): The filters of the query.
+
+        Returns:
+            list or pd.DataFrame or tuple: The formatted result, or None if the query
+                has to be sent.
+        """
+        if self.result_cache is None:
+            return None
+        rows = self.result_cache.lookup(scope, filters)
+        if rows is None:
+            return None
+        self.verbose_print("Answered from a cached result.")
+        return self.format_result(rows, len(rows))
+
+    def store_result(self, scope, filters, data, total_count):
+        """
+        Stores a result in the result cache if there is one and the result is complete.
+
+        Args:
+            scope (tuple): The canonical query without filters and the keys of the
+                filters it ignores.
+            filters (Filters): The filters the request was built with.
+            data (list): The fetched rows.
+            total_count (int): The total number of rows reported by the server.
+        """
+        if self.result_cache is None or len(data) < total_count:
+            return
+        self.result_cache.store(scope[0], filters, data, ignore_filter=scope[1])
+
+    def fetch_page(self, request_url, referer_url):
+        """
+        Fetches a single page and returns the decoded response body.
+
+        Args:
+            request_url (str): The URL to send the HTTP request to.
+            referer_url (str): The URL of the referring page.
+
+        Returns:
+            dict: The decoded body containing `data` and `totalCount`.
+
+        Raises:
+            ResponseStatusError: If the server does not answer with status code 200.
+        """
+        payload = self.cached_payload(request_url)
+        if payload is not None:
+            return payload
+        response = self.send_request(request_url, referer_url)
+        if response.status_code != 200:
+            raise ResponseStatusError(response.status_code, request_url)
+        return self.store_payload(request_url, self.decode(request_url, response.content))
+
+    def cached_payload(self, request_url):
+        """
+        Looks up the decoded response of a request URL in the cache.
+
+        Args:
+            request_url (str): The URL of the request.
+
+        Returns:
+            dict: A copy of the cached response body, or None if caching is disabled or
+                there is no valid entry.
+        """
+        if self.cache is None:
+            return None
+        payload = self.cache.get(canonical_query(request_url))
+        if payload is None:
+            return None
+        self.verbose_print("Using cached response.")
+        return copy_payload(payload)
+
+    def store_payload(self, request_url, payload):
+        """
+        Stores the decoded response of a request URL in the cache, if caching is enabled.
+
+        Args:
+            request_url (str): The URL of the request.
+            payload (dict): The decoded response body.
+
+        Returns:
+            dict: The response body, a copy of the cached one if caching is enabled, so
+                callers changing their rows do not change the cache.
+        """
+        if self.cache is None:
+            return payload
+        self.cache.set(canonical_query(request_url), payload, ttl=self.ttl_of(request_url))
+        return copy_payload(payload)
+
+    def ttl_of(self, request_url):
+        """Return the seconds the response of a request URL is cached, None for the default."""
+        if isinstance(self.cache_ttl, dict):
+            return self.cache_ttl.get(query_kind(request_url))
+        return self.cache_ttl
+
+    def fetch_remaining_pages(self, request_url, referer_url, total_count, page_size):
+        """
+        Fetches every page after the first one of a paginated result.
+
+        The number of pages is derived from the total count and the size of the
+        first page. Pages are fetched concurrently using up to `max_workers` threads,
+        and every page is retried on its own according to the retry policy.
+
+        Args:
+            request_url (str): The URL of the first page.
+            referer_url (str): The URL of the referring page.
+            total_count (int): The total number of rows reported by the first page.
+            page_size (int): The number of rows returned on the first page.
+
+        Returns:
+            list: The rows of all remaining pages in page order.
+
+        Raises:
+            ResponseStatusError: If a page is not answered with status code 200 after
+                its retries.
+        """
+        if page_size == 0 or page_size >= total_count:
+            return []
+        pages = range(2, math.ceil(total_count / page_size) + 1)
+        self.verbose_print(f"Fetching {len(pages)} more pages...")
+        fetch = self.retry_policy.wrap(self.fetch_page, on_retry=self.on_retry)
+
+        def fetch_page(page):
+            return fetch(page_url(request_url, page), referer_url)["data"]
+
+        if self.max_workers == 1:
+            results = [fetch_page(page) for page in pages]
         else:
-            return f"Response code: {str(response.status_code)} - headers: {self.session.headers} {response.text} - referer_url: {referer_url} - request_url: {request_url}"
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                results = list(executor.map(fetch_page, pages))
+        return [row for rows in results for row in rows]
+
+    def export(self, data):
+        """
+        Writes fetched rows to the sink, if one is configured.
+
+        Args:
+            data (list): The fetched rows.
+
+        Raises:
+            SinkWriteError: If the rows cannot be written. The retry policy does not
+                retry it, so the query is not sent again and no partition is written twice.
+        """
+        if self.sink is not None and data:
+            try:
+                self.sink.write(data)
+            except Exception as e:
+                raise SinkWriteError(e) from e
+
+    def format_result(self, data, total_count):
+        """
+        Formats the fetched rows according to `return_df` and `return_total_count`.
+
+        DataFrames are typed according to `COLUMN_TYPES`, and `COMPACT_TYPES` in compact mode.
+
+        Args:
+            data (list): The fetched rows.
+            total_count (int): The total number of rows reported by the server.
+
+        Returns:
+            list or pd.DataFrame or tuple: The rows, optionally paired with the total count.
+        """
+        result = build_typed_df(data, compact=self.compact) if self.return_df else data
+        if self.return_total_count:
+            return result, total_count
+        return result
 
     def check_response_cloudflare(self, response):
         """
@@ -653,7 +1553,19 @@ class AIS:
             ...     "x-requested-with": "XMLHttpRequest"})
             >>> check_response_cloudflare(response)
         """
-        doc = lh.fromstring(response.content)
+        self.check_content_cloudflare(response.content)
+
+    def check_content_cloudflare(self, content):
+        """
+        Checks a response body for a Cloudflare challenge page.
+
+        Args:
+            content (bytes): The body of the HTTP response.
+
+        Raises:
+            CloudflareError: If Cloudflare protection is detected in the body.
+        """
+        doc = lh.fromstring(content)
         titles = doc.xpath("//title")
         if titles:
             title = titles[0].text_content()
@@ -662,3 +1574,4 @@ class AIS:
                     f"Cloudflare has detected unusual behavior. Changing Proxy..."
                 )
                 raise CloudflareError()
+
@@ -0,0 +1,501 @@
+import asyncio
+import itertools
+import json
+import math
+import time
+
+from collections import deque
+from aisexplorer.AIS import AIS
+from aisexplorer.Exceptions import (
+    CloudflareError,
+    FleetNotFoundError,
+    ProxiesNoLongerSupportedError,
+    ResponseStatusError,
+)
+from aisexplorer.Filters import FleetFilter
+from aisexplorer.Fleets import merge_fleet_rows
+from aisexplorer.Query import page_url
+from aisexplorer.Retry import with_retry
+from aisexplorer.Utils.Decoding import is_json_body
+from aisexplorer.Utils.Utility import build_typed_df
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class AsyncAIS(AIS):
+    """An asyncio variant of `AIS` built on aiohttp.
+
+    All request methods of `AIS` are coroutines here. A single `aiohttp.ClientSession`
+    is shared by all requests so connections are reused, and a semaphore bounds the
+    number of requests in flight. Retries wait with `asyncio.sleep` instead of blocking
+    the thread.
+
+    Attributes:
+        max_concurrency (int): Maximum number of requests in flight at the same time.
+        session (aiohttp.ClientSession): The session for HTTP requests, opened on first use.
+
+    Example:
+        >>> async with AsyncAIS(max_concurrency=50) as ais:
+        ...     locations = await asyncio.gather(*(ais.get_location(m) for m in mmsis))
+    """
+
+    def __init__(self, max_concurrency=100, **kwargs):
+        if aiohttp is None:
+            raise ImportError(
+                "AsyncAIS requires aiohttp. Install it with `pip install aiohttp`."
+            )
+        if not isinstance(max_concurrency, int) or max_concurrency < 1:
+            raise ValueError("max_concurrency must be a positive integer.")
+        if kwargs.get("cassette") is not None:
+            raise ValueError("AsyncAIS does not support cassettes, use AIS instead.")
+        if kwargs.get("reference_cache") is not None:
+            raise ValueError("AsyncAIS does not support reference caches, use AIS instead.")
+        if kwargs.get("result_cache") is not None:
+            raise ValueError("AsyncAIS does not support result caches, use AIS instead.")
+        self.max_concurrency = max_concurrency
+        super().__init__(**kwargs)
+
+    def configure_session(self, proxy, verbose, proxy_config):
+        """Prepare the session headers. The session itself is opened inside the event loop."""
+        if proxy:
+            raise ProxiesNoLongerSupportedError()
+        self.proxy = False
+        self.session = None
+        self.semaphore = None
+        self.session_headers = {
+            "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36",
+            "Vessel-Image": "00b3ac45291acfd4e2e0dc4e46b24ec56c05",
+        }
+
+    async def open_session(self):
+        """Open the shared session and semaphore if they are not open yet."""
+        if self.session is None or self.session.closed:
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+            self.session = aiohttp.ClientSession(
+                headers=self.session_headers,
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+                timeout=self.client_timeout(),
+            )
+        return self.session
+
+    def client_timeout(self):
+        """Translate `timeout` into the timeout of the aiohttp session."""
+        if isinstance(self.timeout, tuple):
+            connect, read = self.timeout
+            return aiohttp.ClientTimeout(total=None, sock_connect=connect, sock_read=read)
+        return aiohttp.ClientTimeout(total=self.timeout)
+
+    async def close(self):
+        """Close the shared session and its connections."""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+
+    async def __aenter__(self):
+        await self.open_session()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def login(self, email, password):
+        """Attempt to log in to the AIS service.
+
+        Args:
+            email (str): The email address for login.
+            password (str): The password for login.
+
+        Raises:
+            Exception: If the login fails.
+        """
+        session = await self.open_session()
+        async with self.semaphore:
+            async with session.post(
+                f"{self.base_url}/en/users/ajax_login",
+                data={"_method": "POST", "email": email, "password": password},
+                headers={
+                    "accept": "*/*",
+                    "content-type": "application/x-www-form-urlencoded; charset=UTF-8",
+                    "vessel-image": "00a6f77ecb46da49c92b753fa98af9bed230",
+                    "x-requested-with": "XMLHttpRequest",
+                },
+            ) as response:
+                text = await response.text()
+        if response.status == 200:
+            self.verbose_print("Login successful")
+            self.logged_in = True
+        else:
+            self.verbose_print("Login failed. Check credentials and try again.")
+            raise Exception(
+                str(response.status)
+                + "Login failed. Check credentials and try again."
+                + text
+            )
+
+    async def get_fleets(self, refresh=False):
+        """Fetches fleets data from the AIS service.
+
+        The fleets are kept in `fleet_registry` for `fleet_ttl` seconds and are only
+        fetched again once they expired or if `refresh` is set.
+
+        Raises:
+            UserNotLoggedInError: If the user is not logged in.
+            Exception: If the request fails with a non-200 status code.
+
+        Returns:
+            list: The JSON response containing fleets data.
+        """
+        self._ensure_logged_in()
+        if not refresh:
+            fleets = self.fleet_registry.fleets()
+            if fleets is not None:
+                return fleets
+        session = await self.open_session()
+        async with self.semaphore:
+            async with session.get(
+                f"{self.base_url}/en/search/fleetList",
+                headers={"x-requested-with": "XMLHttpRequest"},
+            ) as response:
+                text = await response.text()
+        if response.status == 200:
+            self.verbose_print("Fetching fleets successful")
+            fleets = json.loads(text)
+            self.fleet_registry.update(fleets)
+            return fleets
+        raise Exception(f"Something went wrong! {response.status}-{text}")
+
+    async def find_fleet(self, fleet_id=None, fleet_name=None):
+        """Looks up a fleet by id or by name, fetching the fleets again once if it is unknown.
+
+        Raises:
+            FleetNotFoundError: If the user has no such fleet.
+        """
+        if fleet_id is not None:
+            lookup, key = self.fleet_registry.by_id, fleet_id
+        else:
+            lookup, key = self.fleet_registry.by_name, fleet_name
+        await self.get_fleets()
+        fleet = lookup(key)
+        if fleet is None:
+            await self.get_fleets(refresh=True)
+            fleet = lookup(key)
+        if fleet is None:
+            raise FleetNotFoundError(key)
+        return fleet
+
+    async def get_vessels_by_fleet_id(self, fleet_id: str):
+        fleet = await self.find_fleet(fleet_id=fleet_id)
+        return await self.get_data(fleets_filter=FleetFilter([[fleet[0], fleet[1]]]))
+
+    async def get_vessels_by_fleet_name(self, fleet_name: str):
+        fleet = await self.find_fleet(fleet_name=fleet_name)
+        return await self.get_data(fleets_filter=FleetFilter([[fleet[0], fleet[1]]]))
+
+    async def get_vessels_in_all_fleets(self, chunk_size=20):
+        """Retrieves the vessels of every fleet of the user with concurrent, chunked queries."""
+        self._ensure_logged_in()
+        return await self.get_fleets_data(await self.get_fleets(), chunk_size)
+
+    async def fetch_fleet_chunk(self, chunk):
+        """Fetches every page of the vessels of a chunk of fleets."""
+        request_url, referer_url = self.build_data_urls(fleets_filter=FleetFilter(chunk))
+        self.query_print("request_url: " + request_url)
+        rows = []
+        async for data in self.iter_pages(request_url, referer_url):
+            rows.extend(data)
+        return rows
+
+    async def get_fleets_data(self, fleets, chunk_size=20):
+        """
+        Retrieves the vessels of the given fleets, one query per chunk of up to
+        `chunk_size` fleets. The chunks are fetched concurrently, bounded by
+        `max_concurrency`.
+        """
+        chunks = self.fleet_chunks(fleets, chunk_size)
+        self.verbose_print(f"Fetching {len(fleets)} fleets in {len(chunks)} chunks...")
+        results = await asyncio.gather(*(self.fetch_fleet_chunk(c) for c in chunks))
+        rows = merge_fleet_rows(results)
+        self.export(rows)
+        return self.format_result(rows, len(rows))
+
+    @with_retry
+    async def get_area_data(self, area):
+        """
+        Retrieves data for a specified geographic area from MarineTraffic.
+
+        Args:
+            area (str or iterable): A valid area code or an iterable of area codes.
+
+        Returns:
+            list or pd.DataFrame: The retrieved data.
+
+        Example:
+            >>> data = await ais.get_area_data(["ADRIA", "BALTIC"])
+        """
+        request_url, referer_url = self.build_area_urls(area)
+        self.query_print("request_url: " + request_url)
+        return await self.return_response(request_url, referer_url)
+
+    @with_retry
+    async def get_location(self, mmsi):
+        """
+        Retrieves location data for a vessel by its MMSI from MarineTraffic.
+
+        Args:
+            mmsi (int or str): The MMSI of the vessel to retrieve location data for.
+
+        Returns:
+            list or pd.DataFrame: The retrieved location data.
+
+        Example:
+            >>> location_data = await ais.get_location(211281610)
+        """
+        request_url, referer_url = self.build_location_urls(mmsi)
+        self.query_print("request_url: " + request_url)
+        return await self.return_response(request_url, referer_url)
+
+    async def get_locations(self, mmsis, chunk_size=100):
+        """
+        Retrieves location data for many vessels with as few requests as possible.
+
+        The MMSIs are packed into list filters of up to `chunk_size` entries and the
+        chunks are fetched concurrently, bounded by `max_concurrency`.
+
+        Returns:
+            pd.DataFrame: One row per requested MMSI, indexed by MMSI, with the column `FOUND`.
+
+        Example:
+            >>> locations = await ais.get_locations([211281610, 636016431])
+        """
+        requested, chunks = self.location_chunks(mmsis, chunk_size)
+
+        async def fetch_chunk(chunk):
+            request_url, referer_url = self.build_locations_urls(chunk)
+            self.query_print("request_url: " + request_url)
+            rows = []
+            async for data in self.iter_pages(request_url, referer_url):
+                rows.extend(data)
+            return rows
+
+        results = await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks))
+        return self.locations_frame(requested, [row for rows in results for row in rows])
+
+    @with_retry
+    async def get_data(self, use_Filters=False, fleets_filter=None):
+        """
+        Retrieves data from MarineTraffic based on specified filters and fleet options.
+
+        Args:
+            use_Filters (bool, optional): Whether to use the configured filters. Defaults to False.
+            fleets_filter (FleetsFilter, optional): Fleet-specific filter to apply. Defaults to None.
+
+        Returns:
+            list or pd.DataFrame: The retrieved data.
+        """
+        request_url, referer_url = self.build_data_urls(
+            use_Filters=use_Filters, fleets_filter=fleets_filter
+        )
+        self.query_print("request_url: " + request_url)
+        return await self.return_response(request_url, referer_url)
+
+    @with_retry
+    async def get_data_by_url(self, url):
+        """
+        Retrieves data from MarineTraffic using a provided URL.
+
+        Args:
+            url (str): The URL to retrieve data from.
+
+        Returns:
+            list or pd.DataFrame: The retrieved data.
+        """
+        return await self.return_response(url.replace("data", "reports"), url)
+
+    async def iter_area_data(self, area, chunks=False):
+        """
+        Iterates over the data of a geographic area page by page.
+
+        Args:
+            area (str or iterable): A valid area code or an iterable of area codes.
+            chunks (bool, optional): If True, yield whole pages instead of single rows. Defaults to False.
+
+        Yields:
+            dict or list or pd.DataFrame: A row, or a page as list or as DataFrame if `return_df` is set.
+
+        Example:
+            >>> async for row in ais.iter_area_data("EMED"):
+            ...     process(row)
+        """
+        request_url, referer_url = self.build_area_urls(area)
+        self.query_print("request_url: " + request_url)
+        async for item in self.iter_response(request_url, referer_url, chunks):
+            yield item
+
+    async def iter_data(self, use_Filters=False, fleets_filter=None, chunks=False):
+        """
+        Iterates over the data of a filtered query page by page.
+
+        Args:
+            use_Filters (bool, optional): Whether to use the configured filters. Defaults to False.
+            fleets_filter (FleetsFilter, optional): Fleet-specific filter to apply. Defaults to None.
+            chunks (bool, optional): If True, yield whole pages instead of single rows. Defaults to False.
+
+        Yields:
+            dict or list or pd.DataFrame: A row, or a page as list or as DataFrame if `return_df` is set.
+        """
+        request_url, referer_url = self.build_data_urls(
+            use_Filters=use_Filters, fleets_filter=fleets_filter
+        )
+        self.query_print("request_url: " + request_url)
+        async for item in self.iter_response(request_url, referer_url, chunks):
+            yield item
+
+    async def iter_response(self, request_url, referer_url, chunks=False):
+        """Yields the rows or pages of every page of a result."""
+        async for data in self.iter_pages(request_url, referer_url):
+            self.export(data)
+            if not chunks:
+                for row in data:
+                    yield row
+            elif self.return_df:
+                yield build_typed_df(data, compact=self.compact)
+            else:
+                yield data
+
+    async def iter_pages(self, request_url, referer_url):
+        """
+        Yields the rows of every page of a result in page order.
+
+        At most `max_workers` pages are fetched ahead of the consumer.
+        """
+        fetch_page = self.retry_policy.wrap(self.fetch_page, on_retry=self.on_retry)
+        payload = await fetch_page(request_url, referer_url)
+        total_count, page_size = payload["totalCount"], len(payload["data"])
+        yield payload["data"]
+        if page_size == 0 or page_size >= total_count:
+            return
+        pages = iter(range(2, math.ceil(total_count / page_size) + 1))
+
+        def schedule(page):
+            return asyncio.ensure_future(
+                fetch_page(page_url(request_url, page), referer_url)
+            )
+
+        in_flight = deque(
+            schedule(page) for page in itertools.islice(pages, self.max_workers)
+        )
+        try:
+            while in_flight:
+                payload = await in_flight.popleft()
+                page = next(pages, None)
+                if page is not None:
+                    in_flight.append(schedule(page))
+                yield payload["data"]
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+    async def send_request(self, request_url, referer_url):
+        """
+        Sends an HTTP request and checks non-JSON bodies for Cloudflare protection.
+
+        Args:
+            request_url (str): The URL to send the HTTP request to.
+            referer_url (str): The URL of the referring page.
+
+        Returns:
+            tuple: The status code and the body of the response.
+        """
+        session = await self.open_session()
+        if self.rate_limiter is not None:
+            await asyncio.sleep(self.rate_limiter.reserve())
+        async with self.semaphore:
+            self.emit("on_request_start", request_url)
+            start = time.perf_counter()
+            try:
+                async with session.get(
+                    request_url, headers=self.build_request_headers(referer_url)
+                ) as response:
+                    content = await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.verbose_print(f"An error occurred while sending the request: {e}")
+                self.emit(
+                    "on_request_end", request_url, None, time.perf_counter() - start, 0, e
+                )
+                raise e
+        seconds = time.perf_counter() - start
+        error = None
+        try:
+            if not is_json_body(content, response.headers.get("Content-Type")):
+                self.check_content_cloudflare(content)
+        except CloudflareError as e:
+            self.emit("on_cloudflare", request_url)
+            error = e
+            raise
+        finally:
+            self.emit(
+                "on_request_end", request_url, response.status, seconds, len(content), error
+            )
+        return response.status, content
+
+    async def fetch_page(self, request_url, referer_url):
+        """
+        Fetches a single page and returns the decoded response body.
+
+        Raises:
+            ResponseStatusError: If the server does not answer with status code 200.
+        """
+        payload = self.cached_payload(request_url)
+        if payload is not None:
+            return payload
+        status, content = await self.send_request(request_url, referer_url)
+        if status != 200:
+            raise ResponseStatusError(status, request_url)
+        return self.store_payload(request_url, self.decode(request_url, content))
+
+    async def return_response(self, request_url, referer_url):
+        """
+        Sends an HTTP request and returns the response data.
+
+        If pagination is enabled, the remaining pages are fetched concurrently and
+        merged into a single result.
+
+        Returns:
+            list or pd.DataFrame: The response data.
+
+        Raises:
+            ResponseStatusError: If the server does not answer with status code 200.
+        """
+        payload = await self.fetch_page(request_url, referer_url)
+        data, total_count = payload["data"], payload["totalCount"]
+        if self.paginate:
+            data = data + await self.fetch_remaining_pages(
+                request_url, referer_url, total_count, len(data)
+            )
+        self.export(data)
+        return self.format_result(data, total_count)
+
+    async def fetch_remaining_pages(self, request_url, referer_url, total_count, page_size):
+        """
+        Fetches every page after the first one of a paginated result concurrently.
+
+        Every page is retried on its own according to the retry policy.
+
+        Returns:
+            list: The rows of all remaining pages in page order.
+
+        Raises:
+            ResponseStatusError: If a page is not answered with status code 200 after
+                its retries.
+        """
+        if page_size == 0 or page_size >= total_count:
+            return []
+        pages = range(2, math.ceil(total_count / page_size) + 1)
+        self.verbose_print(f"Fetching {len(pages)} more pages...")
+        fetch_page = self.retry_policy.wrap(self.fetch_page, on_retry=self.on_retry)
+        results = await asyncio.gather(
+            *(fetch_page(page_url(request_url, page), referer_url) for page in pages)
+        )
+        return [row for payload in results for row in payload["data"]]
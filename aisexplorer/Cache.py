@@ -0,0 +1,185 @@
+import collections
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.parse
+
+
+def canonical_query(url):
+    """Return a canonical form of a request URL that does not depend on filter order.
+
+    The query parts are sorted and the comma separated values of list filters
+    (`..._in`) are sorted as well, so `Filters(flag=["DE", "NL"], speed=[1, 2])` and
+    `Filters(speed=[1, 2], flag=["NL", "DE"])` result in the same key.
+
+    Args:
+        url (str): The request URL.
+
+    Returns:
+        str: The canonical form of the URL.
+    """
+    split = urllib.parse.urlsplit(url)
+    parts = []
+    for part in split.query.split("&"):
+        if not part:
+            continue
+        name = part.split("|")[0].split("=")[0]
+        if name.endswith("_in"):
+            part = "=".join(
+                "|".join(",".join(sorted(item.split(","))) for item in side.split("|"))
+                for side in part.split("=")
+            )
+        parts.append(part)
+    return f"{split.netloc}{split.path}?{'&'.join(sorted(parts))}"
+
+
+def query_kind(url):
+    """Return the kind of query a request URL belongs to.
+
+    Args:
+        url (str): The request URL.
+
+    Returns:
+        str: "area", "location", "locations", "fleet" or "data".
+    """
+    query = urllib.parse.unquote(urllib.parse.urlsplit(url).query)
+    if "area_in" in query:
+        return "area"
+    if "mmsi|in|" in query:
+        return "locations"
+    if "mmsi|eq|" in query:
+        return "location"
+    if "fleet_in" in query:
+        return "fleet"
+    return "data"
+
+
+def copy_payload(payload):
+    """Return a copy of a decoded response whose rows can be changed without touching the original."""
+    return dict(payload, data=[dict(row) for row in payload["data"]])
+
+
+class BaseCache:
+    """Base class for response caches.
+
+    Attributes:
+        ttl (float): Default number of seconds an entry stays valid.
+    """
+
+    def __init__(self, ttl=60):
+        if ttl <= 0:
+            raise ValueError("ttl must be positive.")
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return the value stored for `key` or None if it is missing or expired."""
+        raise NotImplementedError("Must implement get in subclasses.")
+
+    def set(self, key, value, ttl=None):
+        """Store `value` for `key` for `ttl` seconds, or the default TTL if None."""
+        raise NotImplementedError("Must implement set in subclasses.")
+
+    def clear(self):
+        """Remove every entry."""
+        raise NotImplementedError("Must implement clear in subclasses.")
+
+    def expires_at(self, ttl):
+        return time.time() + (self.ttl if ttl is None else ttl)
+
+
+class MemoryCache(BaseCache):
+    """A thread-safe in-memory cache which evicts the least recently used entry when full.
+
+    Attributes:
+        max_entries (int): Maximum number of entries kept.
+    """
+
+    def __init__(self, max_entries=1024, ttl=60):
+        super().__init__(ttl)
+        if max_entries < 1:
+            raise ValueError("max_entries must be a positive integer.")
+        self.max_entries = max_entries
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] < time.time():
+                self.entries.pop(key, None)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        with self.lock:
+            self.entries[key] = (self.expires_at(ttl), value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class DiskCache(BaseCache):
+    """A cache storing every entry as a JSON file in a directory.
+
+    The file name is the SHA-256 hash of the key, so the cache can be shared by
+    several processes using the same directory.
+
+    Attributes:
+        directory (str): The directory the entries are stored in.
+    """
+
+    def __init__(self, directory, ttl=300):
+        super().__init__(ttl)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(
+            self.directory, hashlib.sha256(key.encode()).hexdigest() + ".json"
+        )
+
+    def get(self, key):
+        path = self.path(key)
+        try:
+            with open(path, encoding="utf-8") as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        if entry["expires_at"] < time.time():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry["value"]
+
+    def set(self, key, value, ttl=None):
+        entry = {"key": key, "expires_at": self.expires_at(ttl), "value": value}
+        # Write to a temporary file first so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(entry, file)
+        os.replace(tmp_path, self.path(key))
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                os.remove(os.path.join(self.directory, name))
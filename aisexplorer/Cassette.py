@@ -0,0 +1,208 @@
+import collections
+import gzip
+import json
+import os
+import threading
+import urllib.parse
+import warnings
+
+from aisexplorer.Cache import canonical_query
+from aisexplorer.Exceptions import CassetteMissError
+from aisexplorer.Utils.Decoding import json_loads
+
+
+class CassetteResponse:
+    """A recorded response offering the parts of `requests.Response` used by `AIS`.
+
+    Attributes:
+        url (str): The URL of the request.
+        status_code (int): The status code of the response.
+        content (bytes): The body of the response.
+        headers (dict): The Content-Type header, if it was recorded.
+    """
+
+    def __init__(self, url, status_code, content, content_type=None):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = {"Content-Type": content_type} if content_type else {}
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json_loads(self.content)
+
+
+class Cassette:
+    """Records HTTP exchanges to a file and replays them without network access.
+
+    In "record" mode every response is appended to a gzip compressed JSON lines
+    file. In "replay" mode the file is loaded and requests are answered from it: a
+    request is matched by its method and canonical URL, and repeated requests get the
+    recorded responses in the order they were recorded. The host is not part of the
+    match, so a cassette recorded against one server can be replayed with another
+    `base_url`. Request bodies, e.g. login credentials, are never recorded.
+
+    Attributes:
+        path (str): The cassette file.
+        mode (str): Either "record" or "replay".
+        repeat_last (bool): If True, replay the last response of a request once all
+            its recorded responses were served instead of raising `CassetteMissError`.
+
+    Example:
+        >>> with Cassette("2024-01-01.cassette", mode="record") as cassette:
+        ...     AIS(cassette=cassette).get_area_data("EMED")
+        >>> AIS(cassette=Cassette("2024-01-01.cassette")).get_area_data("EMED")
+    """
+
+    modes = ("record", "replay")
+
+    def __init__(self, path, mode="replay", repeat_last=False):
+        if mode not in self.modes:
+            raise ValueError("mode must be either 'record' or 'replay'.")
+        self.path = path
+        self.mode = mode
+        self.repeat_last = repeat_last
+        self.lock = threading.Lock()
+        self.file = None
+        self.exchanges = collections.defaultdict(collections.deque)
+        if mode == "replay":
+            self.load()
+
+    @staticmethod
+    def key(method, url):
+        """Return the key of a request: its method and canonical URL without the host."""
+        netloc = urllib.parse.urlsplit(url).netloc
+        return f"{method} {canonical_query(url)[len(netloc):]}"
+
+    def load(self):
+        """Load the exchanges of the cassette file.
+
+        If the recording was interrupted, the incomplete last exchange is skipped
+        with a warning and every complete exchange before it is loaded.
+        """
+        with gzip.open(self.path, "rb") as file:
+            try:
+                for line in file:
+                    # Every exchange is written as one line, a missing newline
+                    # means the last write was cut off
+                    if not line.endswith(b"\n"):
+                        self.warn_incomplete()
+                        break
+                    exchange = json.loads(line.decode("utf-8"))
+                    key = self.key(exchange["method"], exchange["url"])
+                    self.exchanges[key].append(exchange)
+            except EOFError:
+                # The compressed stream ends early, its last exchange is lost
+                self.warn_incomplete()
+
+    def warn_incomplete(self):
+        warnings.warn(
+            f"The last exchange of the cassette {self.path} is incomplete and was skipped."
+        )
+
+    def record(self, method, url, response):
+        """Append an exchange to the cassette file."""
+        exchange = {
+            "method": method,
+            "url": url,
+            "status": response.status_code,
+            "content_type": response.headers.get("Content-Type"),
+            "body": response.content.decode("utf-8", errors="surrogateescape"),
+        }
+        line = json.dumps(exchange, separators=(",", ":")) + "\n"
+        with self.lock:
+            if self.file is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self.file = gzip.open(self.path, "at", encoding="utf-8")
+            self.file.write(line)
+            self.file.flush()
+
+    def play(self, method, url):
+        """
+        Returns the next recorded response of a request.
+
+        Raises:
+            CassetteMissError: If no recorded response is left for the request.
+        """
+        key = self.key(method, url)
+        with self.lock:
+            recorded = self.exchanges.get(key)
+            if not recorded:
+                raise CassetteMissError(key)
+            if len(recorded) > 1 or not self.repeat_last:
+                exchange = recorded.popleft()
+            else:
+                exchange = recorded[0]
+        return CassetteResponse(
+            url,
+            exchange["status"],
+            exchange["body"].encode("utf-8", errors="surrogateescape"),
+            exchange["content_type"],
+        )
+
+    def wrap(self, session):
+        """Return a session recording the exchanges of `session`, or replaying them."""
+        if self.mode == "record":
+            return RecordingSession(session, self)
+        return ReplaySession(self)
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class RecordingSession:
+    """Sends requests with a `requests.Session` and records every response to a cassette."""
+
+    def __init__(self, session, cassette):
+        self.session = session
+        self.cassette = cassette
+
+    @property
+    def proxies(self):
+        return self.session.proxies
+
+    @proxies.setter
+    def proxies(self, proxies):
+        self.session.proxies = proxies
+
+    def get(self, url, **kwargs):
+        response = self.session.get(url, **kwargs)
+        self.cassette.record("GET", url, response)
+        return response
+
+    def post(self, url, **kwargs):
+        response = self.session.post(url, **kwargs)
+        self.cassette.record("POST", url, response)
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+
+class ReplaySession:
+    """Answers requests from a cassette without any network access."""
+
+    def __init__(self, cassette):
+        self.cassette = cassette
+        self.proxies = {}
+        self.headers = {}
+
+    def get(self, url, **kwargs):
+        return self.cassette.play("GET", url)
+
+    def post(self, url, **kwargs):
+        return self.cassette.play("POST", url)
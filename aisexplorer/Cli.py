@@ -0,0 +1,314 @@
+"""Export the vessels of MarineTraffic areas to CSV, NDJSON or Parquet.
+
+Every area (or comma separated group of areas, which is queried at once) is fetched
+by one of `--workers` threads, page by page, and every page is written to the
+output as soon as it arrives. Progress goes to stderr.
+
+    aisexplorer EMED WMED --filters '{"speed": [1, 30]}' --format parquet -o ships.parquet
+    aisexplorer EMED --columns shipname,mmsi,speed --format ndjson > ships.ndjson
+
+Exit status: 0 if every area was exported, 1 if some areas failed, 2 on invalid
+arguments and 3 if every area failed. The pages an area had fetched before it
+failed stay in the output.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from aisexplorer.AIS import AIS
+from aisexplorer.Hooks import MetricsCollector
+from aisexplorer.Retry import RetryPolicy
+from aisexplorer.Utils.Utility import build_typed_df
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+EXIT_OK = 0
+EXIT_PARTIAL_FAILURE = 1
+EXIT_USAGE = 2
+EXIT_FAILURE = 3
+
+
+class CsvWriter:
+    """Writes rows as CSV. The header is taken from the first rows written."""
+
+    def __init__(self, file):
+        self.file = file
+        self.writer = None
+
+    def write(self, rows):
+        if self.writer is None:
+            self.writer = csv.DictWriter(
+                self.file, fieldnames=list(rows[0]), restval="", extrasaction="ignore"
+            )
+            self.writer.writeheader()
+        self.writer.writerows(rows)
+        self.file.flush()
+
+    def close(self):
+        pass
+
+
+class NdjsonWriter:
+    """Writes every row as one line of JSON."""
+
+    def __init__(self, file):
+        self.file = file
+
+    def write(self, rows):
+        self.file.writelines(
+            json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n"
+            for row in rows
+        )
+        self.file.flush()
+
+    def close(self):
+        pass
+
+
+class ParquetWriter:
+    """Writes rows as typed row groups of a single Parquet file.
+
+    The columns are taken from the first rows written. Columns of `COLUMN_TYPES`
+    get their Arrow type from `arrow_schema`, every other column is stored as string.
+    """
+
+    def __init__(self, path, compression="zstd"):
+        if pa is None:
+            raise ImportError(
+                "Parquet output requires pyarrow. Install it with `pip install pyarrow`."
+            )
+        from aisexplorer.Sink import arrow_schema
+
+        self.path = path
+        self.compression = compression
+        self.fields = arrow_schema()
+        self.columns = None
+        self.schema = None
+        self.writer = None
+
+    def write(self, rows):
+        df = build_typed_df(rows)
+        if self.columns is None:
+            self.columns = list(df.columns)
+            self.schema = pa.schema(
+                [self.fields.get(c, pa.field(c, pa.string())) for c in self.columns]
+            )
+            self.writer = pq.ParquetWriter(
+                self.path, self.schema, compression=self.compression
+            )
+        df = df.reindex(columns=self.columns)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        self.writer.write_table(table.cast(self.schema, safe=False))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def open_writer(file_format, output):
+    """
+    Opens the writer of an output format.
+
+    Args:
+        file_format (str): "csv", "ndjson" or "parquet".
+        output (str): The output path, "-" for stdout.
+
+    Returns:
+        tuple: The writer and the file to close afterwards, or None.
+    """
+    if file_format == "parquet":
+        return ParquetWriter(output), None
+    if output == "-":
+        return (CsvWriter if file_format == "csv" else NdjsonWriter)(sys.stdout), None
+    file = open(output, "w", encoding="utf-8", newline="")
+    return (CsvWriter if file_format == "csv" else NdjsonWriter)(file), file
+
+
+def load_filter_config(value):
+    """Load a filter config given as JSON or as path of a JSON file."""
+    if value is None:
+        return {}
+    if os.path.isfile(value):
+        with open(value, encoding="utf-8") as file:
+            return json.load(file)
+    return json.loads(value)
+
+
+def export_areas(ais, areas, writer, workers=4, progress=None):
+    """
+    Fetches every area concurrently and writes each page as soon as it arrives.
+
+    Args:
+        ais (AIS): The client, shared by every worker.
+        areas (list): The area codes, or lists of area codes queried together.
+        writer: The writer every page is handed to, called by one thread at a time.
+        workers (int): The number of areas fetched at the same time.
+        progress (callable, optional): Called with every finished area's result.
+
+    Returns:
+        list: For every area, a dict with `area`, `rows`, `seconds` and `error`
+            (None if the area was exported completely).
+    """
+    lock = threading.Lock()
+
+    def export(area):
+        start = time.perf_counter()
+        rows, error = 0, None
+        try:
+            for page in ais.iter_area_data(area, chunks=True):
+                if page:
+                    with lock:
+                        writer.write(page)
+                    rows += len(page)
+        except Exception as e:
+            error = e
+        return {
+            "area": area,
+            "rows": rows,
+            "seconds": time.perf_counter() - start,
+            "error": error,
+        }
+
+    results = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(export, area) for area in areas]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if progress is not None:
+                progress(result, len(results), len(areas))
+    return results
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="aisexplorer",
+        description=__doc__.splitlines()[0],
+        epilog="Exit status: 0 success, 1 some areas failed, 2 usage error, 3 every area failed.",
+    )
+    parser.add_argument(
+        "areas",
+        nargs="+",
+        help="area codes, e.g. EMED; join codes with commas to query them together",
+    )
+    parser.add_argument(
+        "--filters", help="filter config as JSON or as path of a JSON file"
+    )
+    parser.add_argument(
+        "--columns", default="all", help="comma separated columns (default: all)"
+    )
+    parser.add_argument(
+        "--format",
+        choices=("csv", "ndjson", "parquet"),
+        help="output format (default: from the output extension, else csv)",
+    )
+    parser.add_argument(
+        "-o", "--output", default="-", help="output path (default: stdout)"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=4, help="areas fetched at the same time"
+    )
+    parser.add_argument(
+        "--page-workers", type=int, default=2, help="pages fetched at the same time per area"
+    )
+    parser.add_argument(
+        "--retries", type=int, default=5, help="attempts per page (default: 5)"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=60, help="seconds to wait for a response"
+    )
+    parser.add_argument("--base-url", help=argparse.SUPPRESS)
+    parser.add_argument(
+        "--metrics", help="write request metrics in Prometheus text format to this path"
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="do not report progress"
+    )
+    return parser
+
+
+def infer_format(output):
+    extension = os.path.splitext(output)[1].lower()
+    return {".ndjson": "ndjson", ".jsonl": "ndjson", ".parquet": "parquet"}.get(
+        extension, "csv"
+    )
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    file_format = args.format or infer_format(args.output)
+    if file_format == "parquet" and args.output == "-":
+        parser.error("parquet output needs a path, use --output")
+    if args.workers < 1 or args.page_workers < 1 or args.retries < 1:
+        parser.error("--workers, --page-workers and --retries must be positive")
+    areas = [area.split(",") if "," in area else area for area in args.areas]
+    columns = args.columns if args.columns == "all" else args.columns.split(",")
+
+    metrics = MetricsCollector() if args.metrics else None
+    try:
+        ais = AIS(
+            columns=columns,
+            filter_config=load_filter_config(args.filters),
+            paginate=True,
+            max_workers=args.page_workers,
+            pool_maxsize=args.workers * args.page_workers,
+            base_url=args.base_url,
+            retry_policy=RetryPolicy(max_attempts=args.retries),
+            timeout=args.timeout,
+            hooks=[metrics] if metrics else None,
+        )
+        writer, file = open_writer(file_format, args.output)
+    except (ValueError, OSError, ImportError) as e:
+        parser.error(str(e))
+    except Exception as e:
+        # Malformed filter configs raise the errors of aisexplorer.Exceptions
+        parser.error(f"{type(e).__name__}: {e}")
+
+    def progress(result, done, total):
+        if args.quiet:
+            return
+        name = ",".join(result["area"]) if isinstance(result["area"], list) else result["area"]
+        if result["error"] is None:
+            status = f"{result['rows']} rows"
+        else:
+            status = f"failed after {result['rows']} rows: {result['error']!r}"
+        print(
+            f"[{done}/{total}] {name}: {status} in {result['seconds']:.1f}s",
+            file=sys.stderr,
+        )
+
+    try:
+        results = export_areas(ais, areas, writer, args.workers, progress)
+    finally:
+        writer.close()
+        if file is not None:
+            file.close()
+    if metrics is not None:
+        with open(args.metrics, "w", encoding="utf-8") as metrics_file:
+            metrics_file.write(metrics.to_prometheus())
+
+    failed = sum(result["error"] is not None for result in results)
+    if not args.quiet:
+        rows = sum(result["rows"] for result in results)
+        print(
+            f"Exported {rows} rows of {len(results) - failed}/{len(results)} areas",
+            file=sys.stderr,
+        )
+    if failed == len(results):
+        return EXIT_FAILURE
+    return EXIT_PARTIAL_FAILURE if failed else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
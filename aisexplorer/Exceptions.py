@@ -134,3 +134,53 @@ class ProxiesNoLongerSupportedError(Exception):
         super().__init__(
             "Since using Proxies results in an unreliable experience, they are no longer supported."
         )
+
+
+class ProxyListError(Exception):
+    """Exception raised when the list of free proxies cannot be fetched."""
+
+    def __init__(self, error: Exception):
+        super().__init__(f"The proxy list could not be fetched: {error}")
+
+
+class ResponseStatusError(NoResultsError):
+    """Exception raised when a data request is not answered with status code 200."""
+
+    def __init__(self, status_code: int, request_url: str):
+        """
+        Args:
+            status_code: The status code of the response.
+            request_url: The URL of the request.
+        """
+        self.status_code = status_code
+        super().__init__(f"Response code: {status_code} - request_url: {request_url}")
+
+
+class RetryBudgetExhaustedError(NoResultsError):
+    """Exception raised when a request is not retried because the retry budget is used up."""
+
+    def __init__(self, attempts: int):
+        super().__init__(
+            f"Giving up after {attempts} attempts because the retry budget is exhausted."
+        )
+
+
+class CassetteMissError(NoResultsError):
+    """Exception raised when a replayed request has no recorded response left."""
+
+    def __init__(self, key: str):
+        super().__init__(f"The cassette has no recorded response left for {key}.")
+
+
+class SinkWriteError(Exception):
+    """Exception raised when fetched rows cannot be written to the sink."""
+
+    def __init__(self, error: Exception):
+        super().__init__(f"Writing to the sink failed: {error}")
+
+
+class FleetNotFoundError(Exception):
+    """Exception raised when a fleet is not among the fleets of the user."""
+
+    def __init__(self, fleet: str):
+        super().__init__(f"Fleet not found: {fleet}")
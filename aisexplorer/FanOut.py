@@ -0,0 +1,158 @@
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from aisexplorer.Query import page_url
+from aisexplorer.Utils.Utility import build_typed_df
+
+
+class AreaReport:
+    """The outcome of the query of one area or group of areas.
+
+    Attributes:
+        area (str or list): The area code, or the area codes queried together.
+        rows (int): The number of rows fetched.
+        total_count (int): The total count reported by the server, or None if the query failed.
+        seconds (float): The time the query took.
+        error (Exception): The error the query failed with, or None.
+    """
+
+    def __init__(self, area, rows=0, total_count=None, seconds=0.0, error=None):
+        self.area = area
+        self.rows = rows
+        self.total_count = total_count
+        self.seconds = seconds
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        outcome = f"rows={self.rows}" if self.ok else f"error={self.error!r}"
+        return f"AreaReport(area={self.area!r}, {outcome}, seconds={self.seconds:.2f})"
+
+
+class AreaFanOut:
+    """Fetches many areas with one query per area or group of areas, concurrently.
+
+    `get_area_data` packs all areas into a single `area_in` query which shares one row
+    limit and one request. Here every area, or every group of areas given as a list,
+    is queried on its own and all queries run at the same time, so a sweep takes about
+    as long as its slowest area. A failing area does not fail the sweep: its error is
+    kept in its `AreaReport`, and the rows of the other areas are merged and
+    deduplicated on `SHIP_ID`, keeping the row with the newest `LAST_POS`.
+
+    Attributes:
+        ais (AIS): The client used to send the requests.
+        max_workers (int): Number of areas fetched concurrently, or None for all at once.
+        paginate (bool): If True, fetch every page of every area. Defaults to `ais.paginate`.
+        reports (list): The `AreaReport` of every area of the last sweep, in the given order.
+    """
+
+    def __init__(self, ais, max_workers=None, paginate=None):
+        if max_workers is not None and (not isinstance(max_workers, int) or max_workers < 1):
+            raise ValueError("max_workers must be a positive integer.")
+        self.ais = ais
+        self.max_workers = max_workers
+        self.paginate = ais.paginate if paginate is None else paginate
+        self.reports = []
+
+    @property
+    def failed(self):
+        """The reports of the areas that failed in the last sweep."""
+        return [report for report in self.reports if not report.ok]
+
+    def fetch_area(self, area, urls):
+        """Fetch the rows of one area and report how it went.
+
+        Args:
+            area (str or list): The area code or group of area codes.
+            urls (tuple): The request and referer URLs of the area.
+
+        Returns:
+            tuple: The rows and the `AreaReport` of the area.
+        """
+        start = time.perf_counter()
+        report = AreaReport(area)
+        request_url, referer_url = urls
+        fetch_page = self.ais.retry_policy.wrap(
+            self.ais.fetch_page, on_retry=self.ais.on_retry
+        )
+        rows = []
+        try:
+            payload = fetch_page(request_url, referer_url)
+            rows.extend(payload["data"])
+            report.total_count = total_count = payload["totalCount"]
+            page_size = len(rows)
+            if self.paginate and 0 < page_size < total_count:
+                # Areas already run concurrently, so the pages of an area are sequential
+                for page in range(2, math.ceil(total_count / page_size) + 1):
+                    payload = fetch_page(page_url(request_url, page), referer_url)
+                    rows.extend(payload["data"])
+        except Exception as e:
+            self.ais.verbose_print(f"Fetching {area} failed: {e!r}")
+            report.error = e
+        report.rows = len(rows)
+        report.seconds = time.perf_counter() - start
+        return rows, report
+
+    def fetch(self, areas):
+        """
+        Fetches every area concurrently and merges the results.
+
+        Args:
+            areas (iterable): Area codes, or lists of area codes queried together.
+
+        Returns:
+            list or pd.DataFrame: The deduplicated rows, as DataFrame if `ais.return_df` is set.
+
+        Raises:
+            NotSupportedParameterError: If an area code is not valid. No request is sent then.
+
+        Example:
+            To fetch the Mediterranean, with the Adriatic and Black Sea queried together:
+            >>> fan_out = AreaFanOut(AIS(return_df=True))
+            >>> df = fan_out.fetch(["WMED", "EMED", ["ADRIA", "BSEA"]])
+            >>> fan_out.failed
+            []
+        """
+        areas = list(areas)
+        queries = [self.ais.build_area_urls(area) for area in areas]
+        self.ais.verbose_print(f"Fetching {len(areas)} areas...")
+        max_workers = self.max_workers or max(1, len(areas))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(self.fetch_area, areas, queries))
+        self.reports = [report for _, report in results]
+        return self.merge(row for rows, _ in results for row in rows)
+
+    def merge(self, rows):
+        """Deduplicate rows on `SHIP_ID`, keeping the row with the newest `LAST_POS`.
+
+        A vessel crossing an area boundary can be returned by both areas. Rows without
+        `SHIP_ID` are all kept.
+        """
+        newest = {}
+        merged = []
+        for row in rows:
+            ship_id = row.get("SHIP_ID")
+            if ship_id is None:
+                merged.append(row)
+                continue
+            index = newest.get(ship_id)
+            if index is None:
+                newest[ship_id] = len(merged)
+                merged.append(row)
+            elif last_position(row) > last_position(merged[index]):
+                merged[index] = row
+        merged = self.ais.join_references(merged)
+        if self.ais.return_df:
+            return build_typed_df(merged, compact=self.ais.compact)
+        return merged
+
+
+def last_position(row):
+    """Return the `LAST_POS` timestamp of a row, or -1 if it is missing or masked."""
+    try:
+        return int(row.get("LAST_POS"))
+    except (TypeError, ValueError):
+        return -1
@@ -1,5 +1,8 @@
+import math
 import urllib.parse
 from collections.abc import Iterable
+
+import pandas as pd
 from aisexplorer.Exceptions import (
     NotSupportedKeyError,
     NotSupportedKeyTypeError,
@@ -19,6 +22,12 @@ class BaseFilter:
     def to_query(self):
         raise NotImplementedError("Must implement to_query in subclasses.")
 
+    def to_mask(self, df):
+        raise NotImplementedError("Must implement to_mask in subclasses.")
+
+    def covers(self, other):
+        raise NotImplementedError("Must implement covers in subclasses.")
+
 
 class StrFilter(BaseFilter):
     """Filter for string type queries."""
@@ -31,16 +40,43 @@ class StrFilter(BaseFilter):
         "current_port": "current_port_in",
     }
 
+    # Columns of the typed vessel frame the filters are evaluated on locally
+    _columns = {
+        "vessel_name": "SHIPNAME",
+        "destination_port": "NEXT_PORT_NAME",
+        "reported_dest": "DESTINATION",
+        "callsign": "CALLSIGN",
+        "current_port": "CURRENT_PORT",
+    }
+
     def __init__(self, key, value):
         super().__init__(key, value, str)
+        self.column = self._columns.get(key)
+
+    @property
+    def operator(self):
+        if self.key in ["vessel_name", "recognized_next_port_in"]:
+            return "begins"
+        return "eq"
 
     def to_query(self):
         query_key = self.dict_var[self.key]
-        if self.key in ["vessel_name", "recognized_next_port_in"]:
-            operator = "begins"
+        return f"&{query_key}|{self.operator}|{query_key}={self.value}"
+
+    def to_mask(self, df):
+        """Return a boolean Series of the rows of `df` matching the filter, ignoring case."""
+        values = df[self.column].astype("string").str.upper()
+        if self.operator == "begins":
+            mask = values.str.startswith(self.value.upper())
         else:
-            operator = "eq"
-        return f"&{query_key}|{operator}|{query_key}={self.value}"
+            mask = values == self.value.upper()
+        return mask.fillna(False).astype(bool)
+
+    def covers(self, other):
+        """Return True if every row matching `other` matches this filter as well."""
+        if self.operator == "begins":
+            return other.value.upper().startswith(self.value.upper())
+        return other.value.upper() == self.value.upper()
 
 
 class SliderFilter:
@@ -57,6 +93,22 @@ class SliderFilter:
         "draught": "draught_between",
     }
 
+    # `latest_report` is relative to the time of the request and has no column
+    _columns = {
+        "lon": "LON",
+        "lat": "LAT",
+        "speed": "SPEED",
+        "course": "COURSE",
+        "dwt": "DWT",
+        "built": "YOB",
+        "length": "LENGTH",
+        "width": "WIDTH",
+        "draught": "DRAUGHT",
+    }
+
+    # The server reports speeds in tenths of a knot, the filter takes knots
+    _scales = {"speed": 10}
+
     def __init__(self, key: str, values: Iterable):
         if not isinstance(values, Iterable) or isinstance(values, str):
             raise NotSupportedArgumentType(
@@ -68,6 +120,7 @@ class SliderFilter:
             )
         self.key = key
         self.value = [str(value) for value in values]
+        self.column = self._columns.get(key)
 
     def to_query(self) -> str:
         query_key = self._dict_var.get(self.key)
@@ -85,6 +138,38 @@ class SliderFilter:
 
         return f"&{query_key}|{operator}|{query_key}={','.join(self.value)}"
 
+    @property
+    def bounds(self):
+        """The lower and upper bound in the unit of the column, NaN if open."""
+        scale = self._scales.get(self.key, 1)
+        return tuple(float(value) * scale for value in self.value)
+
+    @property
+    def wraps(self):
+        """True if a course range crosses north, e.g. from 350 to 10 degrees."""
+        low, high = self.bounds
+        return self.key == "course" and low > high
+
+    def to_mask(self, df):
+        """Return a boolean Series of the rows of `df` within the bounds, inclusive."""
+        values = pd.to_numeric(df[self.column], errors="coerce").astype("float64")
+        low, high = self.bounds
+        above = values >= low if not math.isnan(low) else values.notna()
+        below = values <= high if not math.isnan(high) else values.notna()
+        if self.wraps:
+            return above | below
+        return above & below
+
+    def covers(self, other):
+        """Return True if the range of `other` lies within the range of this filter."""
+        if self.key == "latest_report" or self.wraps or other.wraps:
+            return self.value == other.value
+        low, high = self.bounds
+        other_low, other_high = other.bounds
+        return (math.isnan(low) or (not math.isnan(other_low) and low <= other_low)) and (
+            math.isnan(high) or (not math.isnan(other_high) and other_high <= high)
+        )
+
 
 class IntFilter:
     _dict_var = {
@@ -93,11 +178,18 @@ class IntFilter:
         "mmsi": "mmsi",
     }
 
+    _columns = {
+        "imo": "IMO",
+        "emi": "INLAND_ENI",
+        "mmsi": "MMSI",
+    }
+
     def __init__(self, key: str, value: int):
         if not isinstance(value, int):
             raise NotSupportedKeyTypeError(f"The value for {key} must be an integer.")
         self.key = key
         self.value = value
+        self.column = self._columns.get(key)
 
     def to_query(self) -> str:
         query_key = self._dict_var.get(self.key)
@@ -107,6 +199,14 @@ class IntFilter:
             )
         return f"&{query_key}|eq|{query_key}={self.value}"
 
+    def to_mask(self, df):
+        """Return a boolean Series of the rows of `df` equal to the value."""
+        return pd.to_numeric(df[self.column], errors="coerce").astype("float64") == self.value
+
+    def covers(self, other):
+        """Return True if `other` selects the same value."""
+        return other.value == self.value
+
 
 class ListFilter:
     _dict_var = {
@@ -117,6 +217,17 @@ class ListFilter:
         "nav_status": "navigational_status_in",
         "current_port_country": "current_port_country_in",
         "fleets": "fleet_in",
+        "mmsis": "mmsi",
+    }
+
+    # Fleets and navigational states have no column in the rows
+    _columns = {
+        "flag": "CODE2",
+        "vessel_type": "SHIPTYPE",
+        "global_area": "AREA_CODE",
+        "local_area": "AREA_CODE",
+        "current_port_country": "CURRENT_PORT_COUNTRY",
+        "mmsis": "MMSI",
     }
 
     def __init__(self, key: str, value):
@@ -131,6 +242,14 @@ class ListFilter:
             self.operator = value.get("operator", "in")
         else:
             self.value = value
+        self.column = self._columns.get(key) if self.operator in ("in", "notin") else None
+
+    @property
+    def values(self):
+        """The values of the filter as a set of strings."""
+        if isinstance(self.value, list):
+            return {str(value) for value in self.value}
+        return set(str(self.value).split(","))
 
     def to_query(self) -> str:
         query_key = self._dict_var.get(self.key)
@@ -144,6 +263,24 @@ class ListFilter:
             value_str = str(self.value)
         return f"&{query_key}|{self.operator}|{value_str}"
 
+    def to_mask(self, df):
+        """Return a boolean Series of the rows of `df` whose value is (not) in the list."""
+        values = df[self.column]
+        if values.dtype.kind in "iu":
+            values = values.astype("Int64")
+        mask = values.astype("string").isin(self.values).fillna(False).astype(bool)
+        return ~mask if self.operator == "notin" else mask
+
+    def covers(self, other):
+        """Return True if every value selected by `other` is selected by this filter."""
+        if other.operator != self.operator:
+            return False
+        if self.operator == "in":
+            return other.values <= self.values
+        if self.operator == "notin":
+            return self.values <= other.values
+        return other.values == self.values
+
 
 class FleetFilter:
     def __init__(self, user_fleets: Iterable[Iterable[str]]):
@@ -199,6 +336,7 @@ class Filters:
         "nav_status": ListFilter,
         "current_port_country": ListFilter,
         "fleets": ListFilter,
+        "mmsis": ListFilter,
     }
 
     def __init__(self, **kwargs: dict):
@@ -211,22 +349,95 @@ class Filters:
         unsupported_keys = set(kwargs) - self.filters.keys()
         if unsupported_keys:
             raise NotSupportedKeyError(f"Unsupported filter keys: {unsupported_keys}.")
+        self._queries = {}
+
+    @staticmethod
+    def _ignored(ignore_filter):
+        """Return `ignore_filter` as a frozenset of keys, or None."""
+        if ignore_filter is None:
+            return None
+        if isinstance(ignore_filter, str):
+            return frozenset({ignore_filter})
+        if not isinstance(ignore_filter, Iterable):
+            raise ValueError("ignore_filter must be a string or an iterable of strings.")
+        return frozenset(ignore_filter)
 
     def to_query(self, ignore_filter=None) -> str:
-        """Generate a query string from filters, excluding any specified in ignore_filter."""
-        if ignore_filter is not None:
-            if isinstance(ignore_filter, str):
-                ignore_filter = {ignore_filter}
-            elif not isinstance(ignore_filter, Iterable) or isinstance(
-                ignore_filter, str
-            ):
-                raise ValueError(
-                    "ignore_filter must be a string or an iterable of strings."
-                )
-
-        query_parts = [
-            filter_instance.to_query()
-            for key, filter_instance in self.filters.items()
-            if ignore_filter is None or key not in ignore_filter
+        """Generate a query string from filters, excluding any specified in ignore_filter.
+
+        The query of every `ignore_filter` is built once and then reused.
+        """
+        ignore_filter = self._ignored(ignore_filter)
+        query = self._queries.get(ignore_filter)
+        if query is None:
+            query_parts = [
+                filter_instance.to_query()
+                for key, filter_instance in self.filters.items()
+                if ignore_filter is None or key not in ignore_filter
+            ]
+            query = "&".join(query_parts).replace("&&", "&")
+            self._queries[ignore_filter] = query
+        return query
+
+    def to_mask(self, df, keys=None):
+        """Evaluate the filters on a typed vessel frame, see `build_typed_df`.
+
+        Args:
+            df (pd.DataFrame): The frame.
+            keys (iterable, optional): The keys of the filters to evaluate. Defaults to all.
+
+        Returns:
+            pd.Series: True for the rows matching every filter.
+
+        Raises:
+            NotSupportedKeyError: If a filter cannot be evaluated on the columns of `df`.
+        """
+        keys = self.filters if keys is None else keys
+        mask = pd.Series(True, index=df.index)
+        for key in keys:
+            filter_instance = self.filters[key]
+            if not self.evaluable(key, df.columns):
+                raise NotSupportedKeyError(list(self.filters), key)
+            mask &= filter_instance.to_mask(df)
+        return mask
+
+    def evaluable(self, key, columns):
+        """Return True if the filter of `key` can be evaluated on a frame with `columns`."""
+        column = getattr(self.filters[key], "column", None)
+        return column is not None and column in columns
+
+    def narrowing_keys(self, other, ignore_filter=None):
+        """Return the keys of the filters of `other` which differ from the filters here."""
+        ignore_filter = self._ignored(ignore_filter) or frozenset()
+        return [
+            key
+            for key, filter_instance in other.filters.items()
+            if key not in ignore_filter
+            and not (
+                key in self.filters
+                and filter_instance.covers(self.filters[key])
+                and self.filters[key].covers(filter_instance)
+            )
         ]
-        return "&".join(query_parts).replace("&&", "&")
+
+    def subsumes(self, other, ignore_filter=None):
+        """Check whether the result of these filters contains the result of `other`.
+
+        That is the case if `other` restricts every key restricted here at least as
+        much, e.g. `Filters(speed=[0, 30])` subsumes `Filters(speed=[5, 10], flag=["MT"])`.
+
+        Args:
+            other (Filters): The narrower filters.
+            ignore_filter (str or iterable, optional): Keys left out of the comparison.
+
+        Returns:
+            bool: True if every row matching `other` matches these filters as well.
+        """
+        ignore_filter = self._ignored(ignore_filter) or frozenset()
+        for key, filter_instance in self.filters.items():
+            if key in ignore_filter:
+                continue
+            narrower = other.filters.get(key)
+            if narrower is None or not filter_instance.covers(narrower):
+                return False
+        return True
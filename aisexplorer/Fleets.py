@@ -0,0 +1,71 @@
+import threading
+import time
+
+
+class FleetRegistry:
+    """A thread-safe cache of the user's fleets, indexed by id and by name.
+
+    The fleet list changes rarely, so it is kept for `ttl` seconds and lookups by id
+    or name are dictionary lookups instead of a request and a scan of the list.
+
+    Attributes:
+        ttl (float): Seconds the fleet list stays valid.
+        updated_at (float): Clock time of the last update, or None.
+    """
+
+    def __init__(self, ttl=300, clock=time.monotonic):
+        if ttl <= 0:
+            raise ValueError("ttl must be positive.")
+        self.ttl = ttl
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.updated_at = None
+        self._fleets = []
+        self._by_id = {}
+        self._by_name = {}
+
+    def update(self, fleets):
+        """Replace the cached fleets by `fleets`, a list of [id, name] pairs."""
+        by_id, by_name = {}, {}
+        for fleet in fleets:
+            by_id.setdefault(str(fleet[0]), fleet)
+            by_name.setdefault(fleet[1], fleet)
+        with self.lock:
+            self._fleets = list(fleets)
+            self._by_id = by_id
+            self._by_name = by_name
+            self.updated_at = self.clock()
+
+    def fleets(self):
+        """Return the cached fleets, or None if they are missing or expired."""
+        with self.lock:
+            if self.updated_at is None or self.clock() - self.updated_at >= self.ttl:
+                return None
+            return list(self._fleets)
+
+    def by_id(self, fleet_id):
+        """Return the fleet with the id `fleet_id`, or None."""
+        with self.lock:
+            return self._by_id.get(str(fleet_id))
+
+    def by_name(self, fleet_name):
+        """Return the first fleet named `fleet_name`, or None."""
+        with self.lock:
+            return self._by_name.get(fleet_name)
+
+    def invalidate(self):
+        with self.lock:
+            self.updated_at = None
+
+
+def merge_fleet_rows(results):
+    """Concatenate the rows of fleet chunks, dropping vessels that are in several fleets."""
+    seen = set()
+    rows = []
+    for chunk_rows in results:
+        for row in chunk_rows:
+            ship_id = row.get("SHIP_ID")
+            if ship_id is None or ship_id not in seen:
+                seen.add(ship_id)
+                rows.append(row)
+    return rows
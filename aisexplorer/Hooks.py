@@ -0,0 +1,209 @@
+import bisect
+import collections
+import threading
+
+from aisexplorer.Cache import canonical_query, query_kind
+
+
+def query_label(url):
+    """Return a label of a request URL with bounded cardinality, for use in metrics.
+
+    The label holds the kind of query, the area codes of an area query and the
+    names of the filters in canonical order. Filter values, MMSIs, columns and the
+    page are left out, so looking up another vessel or changing a filter range does
+    not create new series, e.g. "area=EMED lat_of_latest_position_between".
+    """
+    query = canonical_query(url).partition("?")[2]
+    label = query_kind(url)
+    names = []
+    for part in query.split("&"):
+        name = part.split("|")[0].split("=")[0]
+        if name == "area_in":
+            label += "=" + part.rpartition("=")[2]
+        elif name and name not in ("asset_type", "columns", "page", "mmsi", "fleet_in"):
+            names.append(name)
+    return " ".join([label] + names)
+
+
+class Hooks:
+    """Base class of the hooks `AIS` calls while sending requests.
+
+    Every method does nothing, subclasses override the events they are interested
+    in. Hooks are called from the threads sending the requests, so they have to be
+    thread-safe. An exception raised by a hook is printed in verbose mode and
+    otherwise ignored.
+    """
+
+    def on_request_start(self, request_url):
+        """Called before a request is sent."""
+
+    def on_request_end(self, request_url, status_code, seconds, bytes_received, error):
+        """Called after a request, with the status code (None if no response was
+        received), the duration, the size of the body and the error, if any."""
+
+    def on_retry(self, attempt, wait, error):
+        """Called before the retry policy waits `wait` seconds after the failed `attempt`."""
+
+    def on_cloudflare(self, request_url):
+        """Called when a response is a Cloudflare challenge."""
+
+    def on_proxy_renewed(self, old_proxy, new_proxy):
+        """Called after the proxy has been replaced."""
+
+    def on_decode(self, request_url, seconds, rows):
+        """Called after a response body has been decoded into `rows` rows."""
+
+
+class Histogram:
+    """Counts observations into cumulative buckets like a Prometheus histogram."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative_counts(self):
+        """Return the bucket bounds, ending with +Inf, and the cumulative counts."""
+        bounds = [str(bucket) for bucket in self.buckets] + ["+Inf"]
+        total, counts = 0, []
+        for count in self.counts:
+            total += count
+            counts.append(total)
+        return list(zip(bounds, counts))
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsCollector(Hooks):
+    """Hooks collecting counters and latency histograms in memory.
+
+    Requests are labelled by `query_label`, so slow or failing areas and filters
+    can be told apart. `to_prometheus` renders every metric in the Prometheus text
+    exposition format, e.g. to be served by a metrics endpoint.
+
+    Attributes:
+        counters (dict): The value of every counter by metric name and labels.
+        histograms (dict): The `Histogram` of every histogram by metric name and labels.
+
+    Example:
+        >>> metrics = MetricsCollector()
+        >>> AIS(hooks=[metrics]).get_area_data("EMED")
+        >>> print(metrics.to_prometheus())
+    """
+
+    latency_buckets = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+    decode_buckets = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+
+    descriptions = {
+        "requests_total": ("counter", "Requests sent, by query and status code."),
+        "request_errors_total": ("counter", "Requests that failed, by query and error."),
+        "bytes_received_total": ("counter", "Bytes of response bodies, by query."),
+        "rows_total": ("counter", "Rows decoded, by query."),
+        "retries_total": ("counter", "Retries, by the error that caused them."),
+        "cloudflare_challenges_total": ("counter", "Cloudflare challenges, by query."),
+        "proxy_renewals_total": ("counter", "Proxy renewals."),
+        "request_duration_seconds": ("histogram", "Request latency, by query."),
+        "decode_duration_seconds": ("histogram", "JSON decode time, by query."),
+    }
+
+    def __init__(self, prefix="aisexplorer", label=query_label):
+        self.prefix = prefix
+        self.label = label
+        self.lock = threading.Lock()
+        self.counters = collections.defaultdict(float)
+        self.histograms = {}
+
+    def increment(self, name, labels=(), value=1):
+        with self.lock:
+            self.counters[(name, tuple(labels))] += value
+
+    def observe(self, name, labels, value, buckets):
+        key = (name, tuple(labels))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def on_request_end(self, request_url, status_code, seconds, bytes_received, error):
+        query = ("query", self.label(request_url))
+        status = "none" if status_code is None else str(status_code)
+        self.increment("requests_total", (query, ("status", status)))
+        self.observe("request_duration_seconds", (query,), seconds, self.latency_buckets)
+        if bytes_received:
+            self.increment("bytes_received_total", (query,), bytes_received)
+        if error is not None:
+            self.increment("request_errors_total", (query, ("error", type(error).__name__)))
+
+    def on_retry(self, attempt, wait, error):
+        self.increment("retries_total", (("error", type(error).__name__),))
+
+    def on_cloudflare(self, request_url):
+        self.increment("cloudflare_challenges_total", (("query", self.label(request_url)),))
+
+    def on_proxy_renewed(self, old_proxy, new_proxy):
+        self.increment("proxy_renewals_total")
+
+    def on_decode(self, request_url, seconds, rows):
+        query = ("query", self.label(request_url))
+        self.increment("rows_total", (query,), rows)
+        self.observe("decode_duration_seconds", (query,), seconds, self.decode_buckets)
+
+    def value(self, name, **labels):
+        """Return the sum of a counter over every label set containing `labels`."""
+        wanted = set(labels.items())
+        with self.lock:
+            return sum(
+                value
+                for (metric, metric_labels), value in self.counters.items()
+                if metric == name and wanted <= set(metric_labels)
+            )
+
+    def to_prometheus(self):
+        """Render every metric in the Prometheus text exposition format."""
+        with self.lock:
+            counters = dict(self.counters)
+            histograms = {
+                key: (histogram.cumulative_counts(), histogram.sum, histogram.count)
+                for key, histogram in self.histograms.items()
+            }
+
+        def render_labels(labels):
+            if not labels:
+                return ""
+            return "{" + ",".join(f'{k}="{escape_label(v)}"' for k, v in labels) + "}"
+
+        lines = []
+        for name, (kind, description) in self.descriptions.items():
+            metric = f"{self.prefix}_{name}"
+            if kind == "counter":
+                samples = [
+                    f"{metric}{render_labels(labels)} {value:g}"
+                    for (counter, labels), value in sorted(counters.items())
+                    if counter == name
+                ]
+            else:
+                samples = []
+                for (histogram, labels), (buckets, total, count) in sorted(
+                    histograms.items()
+                ):
+                    if histogram != name:
+                        continue
+                    for bound, cumulative in buckets:
+                        bucket_labels = render_labels(labels + (("le", bound),))
+                        samples.append(f"{metric}_bucket{bucket_labels} {cumulative}")
+                    samples.append(f"{metric}_sum{render_labels(labels)} {total:g}")
+                    samples.append(f"{metric}_count{render_labels(labels)} {count}")
+            if samples:
+                lines.append(f"# HELP {metric} {description}")
+                lines.append(f"# TYPE {metric} {kind}")
+                lines.extend(samples)
+        return "\n".join(lines) + "\n"
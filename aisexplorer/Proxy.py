@@ -1,12 +1,16 @@
+import math
 import random
-import sys
+import threading
 import time
 import lxml.html as lh
 import requests
 import pandas as pd
 import collections
 import warnings
-from typing import Union, Iterable, Optional, Dict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Union, Iterable, Optional, Dict, List
+
+from aisexplorer.Exceptions import ProxyListError
 
 
 def check_valid_ip(string: str) -> bool:
@@ -39,6 +43,8 @@ class FreeProxy:
         https: bool = True,
         refresh_after: int = 900,
         verbose: bool = False,
+        max_workers: int = 32,
+        check_url: Optional[str] = None,
         **filters,
     ):
         self.timeout = timeout
@@ -46,6 +52,8 @@ class FreeProxy:
         self.https = https
         self.refresh_after = refresh_after
         self.verbose = verbose
+        self.max_workers = max_workers
+        self.check_url = check_url
         self.filters = filters
         self.proxies = None
         self.fetched_at = None
@@ -62,7 +70,11 @@ class FreeProxy:
         return {protocol: f"{series.name}:{series['port']}"}
 
     def fetch_proxy_list(self):
-        """Fetch the list of proxies from the web and clean the DataFrame."""
+        """Fetch the list of proxies from the web and clean the DataFrame.
+
+        Raises:
+            ProxyListError: If the list cannot be fetched.
+        """
         try:
             page = requests.get("https://www.sslproxies.org")
             doc = lh.fromstring(page.content)
@@ -93,8 +105,7 @@ class FreeProxy:
             self.proxies = clean_dataframe_column(self.proxies, "https")
             self.fetched_at = time.time()
         except requests.exceptions.RequestException as e:
-            print(e)
-            sys.exit(1)
+            raise ProxyListError(e) from e
 
     def get_filtered_proxies(self) -> pd.DataFrame:
         """Filter the DataFrame of proxies based on the given filters."""
@@ -115,27 +126,48 @@ class FreeProxy:
         filter_str = " & ".join(conditions)
         return self.proxies.query(filter_str) if filter_str else self.proxies
 
-    def find_working_proxy(self) -> Optional[Dict[str, str]]:
-        """Find a working proxy from the filtered DataFrame."""
+    def candidates(self) -> List[Dict[str, str]]:
+        """Return the filtered proxies as proxy dictionaries."""
         self.filtered_df = self.get_filtered_proxies()
-        if self.filtered_df.empty:
-            return None
-
         proxy_list = (
             self.filtered_df.sample(frac=1) if self.random else self.filtered_df
         )
-        for _, proxy_series in proxy_list.iterrows():
-            proxy = self.series_to_proxy(proxy_series)
-            if self.check_if_proxy_is_working(proxy):
-                return proxy
-        return None
+        return [self.series_to_proxy(series) for _, series in proxy_list.iterrows()]
+
+    def find_working_proxy(self) -> Optional[Dict[str, str]]:
+        """Find a working proxy from the filtered DataFrame.
+
+        Up to `max_workers` proxies are checked at the same time and the first one
+        that answers is returned.
+        """
+        proxies = self.candidates()
+        if not proxies:
+            return None
+
+        workers = min(self.max_workers, len(proxies))
+        executor = ThreadPoolExecutor(max_workers=workers)
+        futures = {}
+        try:
+            for proxy in proxies:
+                futures[executor.submit(self.check_if_proxy_is_working, proxy)] = proxy
+            for future in as_completed(futures):
+                if future.result():
+                    return futures[future]
+            return None
+        finally:
+            # Pending checks are dropped and running ones finish in the background
+            # instead of being awaited. `cancel_futures` needs Python 3.9.
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
 
     def check_if_proxy_is_working(self, proxy: Dict[str, str]) -> bool:
         """Check if a given proxy is working."""
         protocol = "https" if self.https else "http"
+        url = self.check_url or f"{protocol}://github.com/reyemb/AISExplorer/"
         try:
             r = requests.get(
-                f"{protocol}://github.com/reyemb/AISExplorer/",
+                url,
                 proxies=proxy,
                 timeout=self.timeout,
             )
@@ -155,3 +187,216 @@ class FreeProxy:
         self.filters.pop("prefered_country", None)
         self.filters.pop("prefered_country_code", None)
         return self.find_working_proxy()
+
+
+def proxy_key(proxy: Dict[str, str]) -> tuple:
+    """Return a hashable key of a proxy dictionary."""
+    return tuple(sorted(proxy.items()))
+
+
+class ProxyStats:
+    """Health statistics of a single proxy.
+
+    Attributes:
+        proxy (dict): The proxy dictionary as used by requests.
+        successes (int): Number of successful checks and requests.
+        failures (int): Number of failed checks and requests.
+        latency (float): Smoothed seconds a successful check took, or None.
+        alive (bool): If True, the last check or request succeeded.
+        checked_at (float): Time of the last check or request, or None.
+    """
+
+    def __init__(self, proxy: Dict[str, str]):
+        self.proxy = proxy
+        self.successes = 0
+        self.failures = 0
+        self.latency = None
+        self.alive = False
+        self.checked_at = None
+
+    @property
+    def success_rate(self) -> float:
+        """The share of successes, starting from an even prior."""
+        return (self.successes + 1) / (self.successes + self.failures + 2)
+
+    @property
+    def cost(self) -> float:
+        """The expected seconds per successful request, lower is better."""
+        if self.latency is None:
+            return math.inf
+        return self.latency / self.success_rate
+
+    def record(
+        self, success: bool, latency: Optional[float], now: float, smoothing: float
+    ):
+        if success:
+            self.successes += 1
+            if latency is not None:
+                self.latency = (
+                    latency
+                    if self.latency is None
+                    else smoothing * latency + (1 - smoothing) * self.latency
+                )
+        else:
+            self.failures += 1
+        self.alive = success
+        self.checked_at = now
+
+
+class ProxyPool:
+    """A pool of scored proxies which are checked concurrently and in the background.
+
+    `refresh` checks every candidate of a `FreeProxy` and every known proxy with up
+    to `max_workers` threads and records whether it answered and how long it took.
+    `best` then returns the live proxy with the lowest expected time per successful
+    request without sending a request. `start` keeps re-checking the proxies in a
+    daemon thread every `recheck_interval` seconds.
+
+    Attributes:
+        freeproxy (FreeProxy): Source of candidates and of the health check.
+        max_workers (int): Number of proxies checked at the same time.
+        recheck_interval (float): Seconds between two background refreshes.
+        smoothing (float): Weight of the newest latency in the smoothed latency.
+        stats (dict): The `ProxyStats` of every known proxy.
+
+    Example:
+        >>> pool = ProxyPool(FreeProxy(timeout=1))
+        >>> pool.refresh()
+        >>> pool.start()
+        >>> session.proxies = pool.best()
+    """
+
+    def __init__(
+        self,
+        freeproxy: FreeProxy,
+        max_workers: int = 32,
+        recheck_interval: float = 60.0,
+        smoothing: float = 0.3,
+        clock=time.monotonic,
+    ):
+        if max_workers < 1:
+            raise ValueError("max_workers must be a positive integer.")
+        self.freeproxy = freeproxy
+        self.max_workers = max_workers
+        self.recheck_interval = recheck_interval
+        self.smoothing = smoothing
+        self.clock = clock
+        self.stats = {}
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def stats_of(self, proxy: Dict[str, str]) -> ProxyStats:
+        with self.lock:
+            key = proxy_key(proxy)
+            if key not in self.stats:
+                self.stats[key] = ProxyStats(proxy)
+            return self.stats[key]
+
+    def record(
+        self, proxy: Dict[str, str], success: bool, latency: Optional[float] = None
+    ):
+        stats = self.stats_of(proxy)
+        with self.lock:
+            stats.record(success, latency, self.clock(), self.smoothing)
+
+    def check(self, proxy: Dict[str, str]) -> bool:
+        """Check a proxy and record the result."""
+        start = self.clock()
+        success = self.freeproxy.check_if_proxy_is_working(proxy)
+        self.record(proxy, success, self.clock() - start)
+        return success
+
+    def refresh(
+        self, proxies: Optional[Iterable[Dict[str, str]]] = None
+    ) -> List[Dict[str, str]]:
+        """
+        Checks proxies concurrently.
+
+        Without `proxies`, the statistics of dead proxies that are no longer
+        candidates are dropped, so the pool does not grow with every fetched list.
+
+        Args:
+            proxies (iterable, optional): The proxies to check. Defaults to the
+                candidates of `freeproxy` and every known proxy.
+
+        Returns:
+            list: The live proxies, best first.
+        """
+        if proxies is None:
+            proxies = self.freeproxy.candidates()
+            candidates = {proxy_key(proxy) for proxy in proxies}
+            with self.lock:
+                for key in [
+                    key
+                    for key, stats in self.stats.items()
+                    if key not in candidates and not stats.alive
+                ]:
+                    del self.stats[key]
+                known = [stats.proxy for stats in self.stats.values()]
+            proxies = proxies + known
+        unique = list({proxy_key(proxy): proxy for proxy in proxies}.values())
+        if unique:
+            workers = min(self.max_workers, len(unique))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(self.check, unique))
+        return self.live()
+
+    def live(self) -> List[Dict[str, str]]:
+        """Return the live proxies, best first."""
+        with self.lock:
+            alive = [stats for stats in self.stats.values() if stats.alive]
+        return [stats.proxy for stats in sorted(alive, key=lambda stats: stats.cost)]
+
+    def best(
+        self, exclude: Optional[Dict[str, str]] = None
+    ) -> Optional[Dict[str, str]]:
+        """
+        Returns the best live proxy without checking it again.
+
+        Args:
+            exclude (dict, optional): A proxy that must not be returned, e.g. the
+                one that just failed.
+
+        Returns:
+            dict: The proxy, or None if no proxy is known to be alive.
+        """
+        for proxy in self.live():
+            if exclude is None or proxy_key(proxy) != proxy_key(exclude):
+                return proxy
+        return None
+
+    def is_alive(self, proxy: Dict[str, str]) -> bool:
+        """Return whether the last check or request through a proxy succeeded."""
+        with self.lock:
+            stats = self.stats.get(proxy_key(proxy))
+            return stats is not None and stats.alive
+
+    def report_success(self, proxy: Dict[str, str], latency: Optional[float] = None):
+        """Record a request that succeeded through a proxy."""
+        self.record(proxy, True, latency)
+
+    def report_failure(self, proxy: Dict[str, str]):
+        """Record a failed request so the proxy is not handed out until it recovers."""
+        self.record(proxy, False)
+
+    def run(self):
+        while not self.stopped.wait(self.recheck_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                self.freeproxy.verbose_print(f"Re-checking proxies failed: {e}")
+
+    def start(self):
+        """Re-check the proxies every `recheck_interval` seconds in a daemon thread."""
+        if self.thread is None or not self.thread.is_alive():
+            self.stopped.clear()
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        """Stop re-checking the proxies in the background."""
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
@@ -0,0 +1,132 @@
+import hashlib
+
+from aisexplorer.Cache import canonical_query
+
+
+def page_url(request_url, page):
+    """Return the request URL of a page of a result, given the URL of its first page."""
+    return f"{request_url}&page={page}"
+
+
+class CompiledQuery:
+    """An immutable, hashable query rendered to its request and referer URLs once.
+
+    Two queries are equal if their canonical forms are equal, i.e. if they differ
+    only in the order of their filters or of the values of list filters. A query can
+    therefore be used directly as a dictionary key, e.g. to deduplicate requests in
+    flight, and `digest` is a short label that is stable across processes.
+
+    Attributes:
+        base_url (str): Scheme and host the URLs point to.
+        columns (str): The comma separated columns of the result.
+        request_query (str): The filter part of the request URL.
+        referer_query (str): The filter part of the referer URL.
+        request_url (str): The URL the data is requested from.
+        referer_url (str): The URL of the page referring to the request.
+        canonical (str): The request URL with its filters in canonical order.
+        digest (str): A hex digest of `canonical`.
+
+    Example:
+        >>> query = CompiledQuery.build(AIS.base_url, "shipname,mmsi", filters=Filters(flag=["MT"]))
+        >>> query.request_url
+        'https://www.marinetraffic.com/en/reports?asset_type=vessels&columns=shipname,mmsi&flag_in|in|MT'
+    """
+
+    __slots__ = (
+        "base_url",
+        "columns",
+        "request_query",
+        "referer_query",
+        "request_url",
+        "referer_url",
+        "canonical",
+        "digest",
+        "_hash",
+    )
+
+    def __init__(self, base_url, columns, request_query="", referer_query=None):
+        if referer_query is None:
+            referer_query = request_query
+        request_url = (
+            f"{base_url}/en/reports?asset_type=vessels&columns={columns}{request_query}"
+        )
+        referer_url = (
+            f"{base_url}/en/data/?asset_type=vessels&columns={columns}{referer_query}"
+        )
+        canonical = canonical_query(request_url)
+        values = {
+            "base_url": base_url,
+            "columns": columns,
+            "request_query": request_query,
+            "referer_query": referer_query,
+            "request_url": request_url,
+            "referer_url": referer_url,
+            "canonical": canonical,
+            "digest": hashlib.sha256(canonical.encode()).hexdigest()[:16],
+            "_hash": hash(canonical),
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    @classmethod
+    def build(
+        cls,
+        base_url,
+        columns,
+        query="",
+        filters=None,
+        ignore_filter=None,
+        fleets_filter=None,
+    ):
+        """
+        Compiles a query from its parts.
+
+        Args:
+            base_url (str): Scheme and host the URLs point to.
+            columns (str): The comma separated columns of the result.
+            query (str, optional): Query parts put in front of the filters, e.g. the area.
+            filters (Filters, optional): The filters of the query.
+            ignore_filter (str or iterable, optional): Filters left out of the query.
+            fleets_filter (FleetFilter, optional): Fleets the vessels have to be part of.
+
+        Returns:
+            CompiledQuery: The compiled query.
+        """
+        if filters is not None:
+            query += filters.to_query(ignore_filter=ignore_filter)
+        if fleets_filter is None:
+            return cls(base_url, columns, query)
+        return cls(
+            base_url,
+            f"{columns},notes",
+            query + fleets_filter.to_request_query(),
+            query + fleets_filter.to_referer_query(),
+        )
+
+    @property
+    def urls(self):
+        """The request URL and the referer URL."""
+        return self.request_url, self.referer_url
+
+    def __reduce__(self):
+        return (
+            CompiledQuery,
+            (self.base_url, self.columns, self.request_query, self.referer_query),
+        )
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CompiledQuery is immutable.")
+
+    def __delattr__(self, name):
+        raise AttributeError("CompiledQuery is immutable.")
+
+    def __eq__(self, other):
+        if not isinstance(other, CompiledQuery):
+            return NotImplemented
+        return self.canonical == other.canonical
+
+    def __hash__(self):
+        return self._hash
+
+    def __repr__(self):
+        return f"CompiledQuery({self.canonical!r})"
@@ -0,0 +1,132 @@
+import os
+import struct
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+class TokenBucket:
+    """A thread-safe token bucket pacing requests ahead of time.
+
+    The bucket holds up to `burst` tokens and refills at `rate` tokens per second.
+    Every request takes one token. Tokens are reserved even if the bucket is empty,
+    the caller then waits until its token has been refilled, so waiting callers are
+    served in the order they arrived.
+
+    Attributes:
+        rate (float): Tokens added per second, i.e. the sustained requests per second.
+        burst (int): Maximum number of tokens, i.e. requests that may be sent at once.
+    """
+
+    def __init__(self, rate, burst=1, clock=time.monotonic, sleep=time.sleep):
+        if rate <= 0:
+            raise ValueError("rate must be positive.")
+        if burst < 1:
+            raise ValueError("burst must be at least 1.")
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self.lock = threading.Lock()
+        self.state = (float(burst), clock())
+
+    def take(self, state, tokens, now):
+        """Take tokens from a bucket state.
+
+        Args:
+            state (tuple): The tokens left and the time they were counted.
+            tokens (float): The number of tokens to take.
+            now (float): The current time.
+
+        Returns:
+            tuple: The new state and the seconds to wait before the tokens are available.
+        """
+        available, updated_at = state
+        available = min(self.burst, available + (now - updated_at) * self.rate)
+        available -= tokens
+        wait = -available / self.rate if available < 0 else 0.0
+        return (available, now), wait
+
+    def reserve(self, tokens=1):
+        """Reserve tokens without waiting.
+
+        Returns:
+            float: The seconds the caller has to wait before sending.
+        """
+        with self.lock:
+            self.state, wait = self.take(self.state, tokens, self.clock())
+        return wait
+
+    def acquire(self, tokens=1):
+        """Reserve tokens and block until they are available.
+
+        Returns:
+            float: The seconds waited.
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+
+class FileTokenBucket(TokenBucket):
+    """A token bucket whose state is stored in a file, shared by every process using it.
+
+    The state is read and written under an exclusive file lock, so worker processes
+    started independently of each other can share one request budget by using the
+    same path. The wall clock is used since monotonic clocks are not comparable
+    between processes.
+
+    Attributes:
+        path (str): The file holding the bucket state.
+    """
+
+    state_format = "dd"
+
+    def __init__(self, path, rate, burst=1, clock=time.time, sleep=time.sleep):
+        super().__init__(rate, burst, clock=clock, sleep=sleep)
+        self.path = path
+        self.size = struct.calcsize(self.state_format)
+        self.flags = os.O_RDWR | getattr(os, "O_BINARY", 0)
+        os.close(os.open(path, self.flags | os.O_CREAT, 0o644))
+
+    def lock_file(self, fd):
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_LOCK, self.size)
+
+    def unlock_file(self, fd):
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, self.size)
+
+    def reserve(self, tokens=1):
+        with self.lock:
+            fd = os.open(self.path, self.flags)
+            try:
+                self.lock_file(fd)
+                try:
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    content = os.read(fd, self.size)
+                    now = self.clock()
+                    if len(content) == self.size:
+                        state = struct.unpack(self.state_format, content)
+                    else:
+                        state = (float(self.burst), now)
+                    state, wait = self.take(state, tokens, now)
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    os.write(fd, struct.pack(self.state_format, *state))
+                finally:
+                    self.unlock_file(fd)
+            finally:
+                os.close(fd)
+        return wait
@@ -0,0 +1,83 @@
+"""Static vessel attributes kept apart from the positions of a poll.
+
+Most columns describe the vessel itself and do not change between polls. With a
+reference cache, `AIS` requests only the dynamic columns of a query and fills in the
+static attributes of every vessel from the cache, fetching them once per vessel.
+"""
+
+# Request columns whose values are attributes of the vessel, not of its voyage
+STATIC_COLUMNS = (
+    "flag",
+    "shipname",
+    "imo",
+    "ship_type",
+    "eni",
+    "year_of_build",
+    "length",
+    "width",
+    "dwt",
+    "callsign",
+)
+
+# Columns every split query keeps, to look up the vessels missing from the cache
+KEY_COLUMNS = ("mmsi",)
+
+# Response field of every key column
+KEY_COLUMN_FIELDS = {"mmsi": "MMSI"}
+
+# Fields identifying a row, which are never taken from the reference
+KEY_FIELDS = ("SHIP_ID", "MMSI")
+
+
+def split_columns(columns):
+    """
+    Splits request columns into static and dynamic ones.
+
+    Args:
+        columns (list): The request columns.
+
+    Returns:
+        tuple: The static columns and the dynamic columns, which always include the
+            key columns.
+    """
+    static = [column for column in columns if column in STATIC_COLUMNS]
+    dynamic = [column for column in columns if column not in STATIC_COLUMNS]
+    dynamic += [column for column in KEY_COLUMNS if column not in dynamic]
+    return static, dynamic
+
+
+def reference_key(ship_id):
+    """Return the cache key of the reference of a vessel."""
+    return f"reference/{ship_id}"
+
+
+def to_reference(row):
+    """Return the static attributes of a row fetched with the static columns."""
+    return {field: value for field, value in row.items() if field not in KEY_FIELDS}
+
+
+def added_key_fields(columns):
+    """Return the fields of the key columns `split_columns` adds to the request columns."""
+    return [KEY_COLUMN_FIELDS[column] for column in KEY_COLUMNS if column not in columns]
+
+
+def join_reference(row, reference, drop=()):
+    """
+    Joins the static attributes of a vessel into a row.
+
+    Args:
+        row (dict): The row of a split query.
+        reference (dict): The static attributes of the vessel, or None.
+        drop (iterable, optional): Fields to remove, e.g. key fields the caller did not request.
+
+    Returns:
+        dict: The row with every attribute of the reference it does not have itself.
+    """
+    if not reference and not drop:
+        return row
+    joined = dict(row)
+    for field, value in (reference or {}).items():
+        joined.setdefault(field, value)
+    for field in drop:
+        joined.pop(field, None)
+    return joined
@@ -0,0 +1,148 @@
+import collections
+import threading
+import time
+
+import numpy as np
+
+from aisexplorer.Utils.Utility import build_typed_df
+
+
+class CachedResult:
+    """A complete result of a query, kept to answer narrower queries.
+
+    Attributes:
+        scope (str): The canonical query without filters, e.g. of an area.
+        filters (Filters): The filters of the query.
+        ignore_filter (frozenset): Keys of `filters` the query did not apply.
+        rows (list): Every row of the result.
+        expires_at (float): Time after which the result is no longer used.
+    """
+
+    def __init__(self, scope, filters, ignore_filter, rows, expires_at):
+        self.scope = scope
+        self.filters = filters
+        self.ignore_filter = ignore_filter
+        self.rows = rows
+        self.expires_at = expires_at
+        self._frame = None
+
+    @property
+    def frame(self):
+        """The rows as a typed DataFrame, built on first use."""
+        if self._frame is None:
+            self._frame = build_typed_df(self.rows)
+        return self._frame
+
+    def answer(self, filters):
+        """
+        Selects the rows of a narrower query.
+
+        Args:
+            filters (Filters): The filters of the narrower query.
+
+        Returns:
+            list: Copies of the matching rows, or None if the result does not subsume
+                the query or a narrowing filter cannot be evaluated locally.
+        """
+        if not self.filters.subsumes(filters, self.ignore_filter):
+            return None
+        keys = self.filters.narrowing_keys(filters, self.ignore_filter)
+        if not keys:
+            return [dict(row) for row in self.rows]
+        if not all(filters.evaluable(key, self.frame.columns) for key in keys):
+            return None
+        mask = filters.to_mask(self.frame, keys).to_numpy()
+        return [dict(self.rows[i]) for i in np.flatnonzero(mask)]
+
+
+class ResultCache:
+    """A thread-safe store of complete query results answering narrower queries locally.
+
+    A dashboard typically polls an area and then the same area restricted to some
+    speeds or vessel types. Once the whole area has been fetched, the narrower
+    queries are answered by evaluating their filters as vectorized masks over the
+    cached rows, without sending a request. Only results with every row, i.e. not
+    truncated by the page size, are stored.
+
+    Attributes:
+        max_entries (int): Maximum number of results kept, the oldest is evicted first.
+        ttl (float): Seconds a result is used to answer queries.
+
+    Example:
+        >>> ais = AIS(result_cache=ResultCache(ttl=60), paginate=True)
+        >>> ais.get_area_data("EMED")
+        >>> ais.set_filters({"speed": [10, 30]})
+        >>> ais.get_area_data("EMED")  # answered from the first result
+    """
+
+    def __init__(self, max_entries=32, ttl=60, clock=time.time):
+        if max_entries < 1:
+            raise ValueError("max_entries must be a positive integer.")
+        if ttl <= 0:
+            raise ValueError("ttl must be positive.")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def store(self, scope, filters, rows, ignore_filter=None):
+        """
+        Stores the complete result of a query.
+
+        Args:
+            scope (str): The canonical query without filters.
+            filters (Filters): The filters of the query.
+            rows (list): Every row of the result.
+            ignore_filter (str or iterable, optional): Keys of `filters` the query did not apply.
+        """
+        ignore_filter = filters._ignored(ignore_filter)
+        key = (scope, filters.to_query(ignore_filter))
+        entry = CachedResult(
+            scope,
+            filters,
+            ignore_filter,
+            [dict(row) for row in rows],
+            self.clock() + self.ttl,
+        )
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def lookup(self, scope, filters):
+        """
+        Answers a query from the newest stored result subsuming it.
+
+        Args:
+            scope (str): The canonical query without filters.
+            filters (Filters): The filters of the query.
+
+        Returns:
+            list: The rows of the query, or None if no stored result subsumes it.
+        """
+        now = self.clock()
+        with self.lock:
+            for key in [key for key, entry in self.entries.items() if entry.expires_at <= now]:
+                del self.entries[key]
+            candidates = [
+                entry for entry in reversed(self.entries.values()) if entry.scope == scope
+            ]
+        for entry in candidates:
+            rows = entry.answer(filters)
+            if rows is not None:
+                self.hits += 1
+                return rows
+        self.misses += 1
+        return None
+
+    def clear(self):
+        """Remove every result."""
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
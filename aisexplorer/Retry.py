@@ -0,0 +1,246 @@
+import functools
+import inspect
+import threading
+import time
+
+from aisexplorer.Exceptions import (
+    CloudflareError,
+    MalformedFilterError,
+    MalformedFunctionError,
+    NoResultsError,
+    ProxiesNoLongerSupportedError,
+    ResponseStatusError,
+    RetryBudgetExhaustedError,
+    SinkWriteError,
+    UserNotLoggedInError,
+)
+from tenacity import (
+    AsyncRetrying,
+    Retrying,
+    retry_if_exception,
+    wait_exponential,
+    wait_random_exponential,
+)
+
+
+def raise_no_results_error(retry_state):
+    """Raise a NoResultsError after a certain number of attempts.
+
+    Args:
+        retry_state (tenacity.RetryCallState): The current state of the retry logic.
+
+    Raises:
+        NoResultsError: If no results are obtained after the specified attempts.
+    """
+    attempt_num = retry_state.attempt_number
+    error_message = (
+        f"After {attempt_num} attempts still no results are given. "
+        f"If you think this is an error in the module raise an issue at "
+        f"https://github.com/reyemb/AISExplorer "
+    )
+    raise NoResultsError(error_message) from retry_state.outcome.exception()
+
+
+class RetryBudget:
+    """A thread-safe budget limiting how many retries may happen in a period.
+
+    A budget can be shared by several retry policies and clients. Once it is used up,
+    failing requests are given up immediately instead of being retried, so a broken
+    backend or a query that never succeeds cannot tie up every worker.
+
+    Attributes:
+        max_retries (int): Maximum number of retries in a period.
+        per_seconds (float): The length of the period in seconds.
+    """
+
+    def __init__(self, max_retries=50, per_seconds=60, clock=time.monotonic):
+        if max_retries < 1 or per_seconds <= 0:
+            raise ValueError("max_retries and per_seconds must be positive.")
+        self.max_retries = max_retries
+        self.per_seconds = per_seconds
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.available = float(max_retries)
+        self.updated_at = clock()
+
+    def try_spend(self):
+        """Spend one retry.
+
+        Returns:
+            bool: False if the budget is used up.
+        """
+        with self.lock:
+            now = self.clock()
+            refill = (now - self.updated_at) * self.max_retries / self.per_seconds
+            self.available = min(self.max_retries, self.available + refill)
+            self.updated_at = now
+            if self.available < 1:
+                return False
+            self.available -= 1
+            return True
+
+
+class RetryPolicy:
+    """Retry logic with exponential backoff, fatal errors and an optional retry budget.
+
+    Errors that cannot be fixed by trying again are raised immediately: Cloudflare
+    challenges, malformed queries, missing logins, failed sink writes, programming
+    errors like a `TypeError` or `AttributeError` from a wrong argument, and responses
+    with a 4xx status code other than 429. Every other error is retried after an exponentially growing wait,
+    randomized with full jitter unless `jitter` is False.
+
+    Attributes:
+        max_attempts (int): Maximum number of attempts, including the first one.
+        initial_wait (float): Scale of the backoff in seconds.
+        max_wait (float): Maximum wait between two attempts in seconds.
+        jitter (bool): If True, wait a random time up to the backoff.
+        max_delay (float): Give up once this many seconds passed since the first attempt, or None.
+        budget (RetryBudget): Budget shared with other policies, or None.
+        sleep (callable): Called with the seconds to wait instead of `time.sleep`, or
+            `asyncio.sleep` for coroutines. May be a coroutine function. None for the default.
+
+    Example:
+        >>> budget = RetryBudget(max_retries=20, per_seconds=60)
+        >>> AIS(retry_policy=RetryPolicy(max_attempts=4, max_wait=10, budget=budget))
+    """
+
+    fatal_exceptions = (
+        CloudflareError,
+        MalformedFunctionError,
+        MalformedFilterError,
+        UserNotLoggedInError,
+        ProxiesNoLongerSupportedError,
+        NoResultsError,
+        SinkWriteError,
+        TypeError,
+        AttributeError,
+    )
+
+    def __init__(
+        self,
+        max_attempts=10,
+        initial_wait=1,
+        max_wait=15,
+        jitter=True,
+        max_delay=None,
+        budget=None,
+        sleep=None,
+    ):
+        if not isinstance(max_attempts, int) or max_attempts < 1:
+            raise ValueError("max_attempts must be a positive integer.")
+        self.max_attempts = max_attempts
+        self.initial_wait = initial_wait
+        self.max_wait = max_wait
+        self.jitter = jitter
+        self.max_delay = max_delay
+        self.budget = budget
+        self.sleep = sleep
+
+    def is_retryable(self, exception):
+        """Check whether a failed attempt may succeed when it is tried again."""
+        if isinstance(exception, ResponseStatusError):
+            return exception.status_code == 429 or exception.status_code >= 500
+        return not isinstance(exception, self.fatal_exceptions)
+
+    def should_stop(self, retry_state):
+        """Check whether to give up instead of retrying a retryable error.
+
+        Raises:
+            RetryBudgetExhaustedError: If another retry is allowed but the budget is used up.
+        """
+        if retry_state.attempt_number >= self.max_attempts:
+            return True
+        if self.max_delay is not None and retry_state.seconds_since_start >= self.max_delay:
+            return True
+        if self.budget is not None and not self.budget.try_spend():
+            raise RetryBudgetExhaustedError(
+                retry_state.attempt_number
+            ) from retry_state.outcome.exception()
+        return False
+
+    def retrying_options(self, on_retry=None):
+        """Return the keyword arguments for tenacity's `Retrying`.
+
+        Args:
+            on_retry (callable, optional): Called with the number of the failed attempt,
+                the wait in seconds and the error before every retry.
+        """
+        wait_strategy = wait_random_exponential if self.jitter else wait_exponential
+        options = {
+            "stop": self.should_stop,
+            "wait": wait_strategy(multiplier=self.initial_wait, max=self.max_wait),
+            "retry": retry_if_exception(self.is_retryable),
+            "retry_error_callback": raise_no_results_error,
+        }
+        if on_retry is not None:
+
+            def before_sleep(retry_state):
+                on_retry(
+                    retry_state.attempt_number,
+                    retry_state.next_action.sleep,
+                    retry_state.outcome.exception(),
+                )
+
+            options["before_sleep"] = before_sleep
+        return options
+
+    def call(self, function, *args, on_retry=None, **kwargs):
+        """Call a function and retry it according to the policy."""
+        options = self.retrying_options(on_retry)
+        if self.sleep is not None:
+            options["sleep"] = self.sleep
+        return Retrying(**options)(function, *args, **kwargs)
+
+    async def acall(self, function, *args, on_retry=None, **kwargs):
+        """Await a coroutine function and retry it according to the policy."""
+        options = self.retrying_options(on_retry)
+        if self.sleep is not None:
+            options["sleep"] = self.async_sleep
+        return await AsyncRetrying(**options)(function, *args, **kwargs)
+
+    async def async_sleep(self, seconds):
+        """Wait with `sleep`, which may be a plain function or a coroutine function."""
+        result = self.sleep(seconds)
+        if inspect.isawaitable(result):
+            await result
+
+    def wrap(self, function, on_retry=None):
+        """Return a version of a function or coroutine function which is retried."""
+        if inspect.iscoroutinefunction(function):
+
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                return await self.acall(function, *args, on_retry=on_retry, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            return self.call(function, *args, on_retry=on_retry, **kwargs)
+
+        return wrapper
+
+
+def with_retry(method):
+    """Decorator retrying a client method according to the client's `retry_policy`.
+
+    The policy is looked up on every call, so every instance can have its own. Retries
+    are reported to the client's `on_retry` method, if it has one.
+    """
+    if inspect.iscoroutinefunction(method):
+
+        @functools.wraps(method)
+        async def async_wrapper(self, *args, **kwargs):
+            on_retry = getattr(self, "on_retry", None)
+            return await self.retry_policy.acall(
+                method, self, *args, on_retry=on_retry, **kwargs
+            )
+
+        return async_wrapper
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        on_retry = getattr(self, "on_retry", None)
+        return self.retry_policy.call(method, self, *args, on_retry=on_retry, **kwargs)
+
+    return wrapper
@@ -0,0 +1,120 @@
+import datetime
+import os
+import uuid
+
+from aisexplorer.Utils.Utility import COLUMN_TYPES, build_typed_df
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+
+def arrow_schema():
+    """Build the Arrow field for every column of `COLUMN_TYPES`.
+
+    Returns:
+        dict: The Arrow field of each column name.
+    """
+    arrow_types = {
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "bool": pa.bool_(),
+        "str": pa.string(),
+        "unix": pa.timestamp("s"),
+        "unix_masked": pa.timestamp("s"),
+        "timestamp": pa.timestamp("s"),
+    }
+    return {
+        column: pa.field(column, arrow_types[dtype])
+        for dtype, columns in COLUMN_TYPES.items()
+        for column in columns
+    }
+
+
+class SnapshotSink:
+    """Writes fetched snapshots to Parquet or Arrow IPC files, partitioned by area and hour.
+
+    Every call of `write` appends new files and never rewrites existing ones, so a
+    long running poller only holds the current batch in memory. Files are laid out
+    Hive-style, `<directory>/area_code=EMED/fetch_hour=2024-01-01T13/part-<id>.parquet`,
+    and can be read back with `pyarrow.dataset` or `pandas.read_parquet`.
+
+    Attributes:
+        directory (str): The root directory of the dataset.
+        file_format (str): Either "parquet" or "arrow".
+        compression (str): The compression codec of the files.
+        files_written (list): The paths of all files written by this sink.
+    """
+
+    file_formats = ("parquet", "arrow")
+
+    def __init__(self, directory, file_format="parquet", compression="zstd"):
+        if pa is None:
+            raise ImportError(
+                "SnapshotSink requires pyarrow. Install it with `pip install pyarrow`."
+            )
+        if file_format not in self.file_formats:
+            raise ValueError("file_format must be either 'parquet' or 'arrow'.")
+        self.directory = directory
+        self.file_format = file_format
+        self.compression = compression
+        self.files_written = []
+        self.fields = arrow_schema()
+
+    def to_table(self, df):
+        """Convert a typed DataFrame to an Arrow table using the `COLUMN_TYPES` schema."""
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        schema = pa.schema(
+            [self.fields.get(field.name, field) for field in table.schema]
+        )
+        return table.cast(schema, safe=False)
+
+    def write(self, data, area_code=None, fetched_at=None):
+        """
+        Appends a batch of rows to the dataset.
+
+        Rows are partitioned by their `AREA_CODE` column, or by `area_code` if the rows
+        have none, and by the hour they were fetched.
+
+        Args:
+            data (list or pd.DataFrame): The rows to write.
+            area_code (str, optional): The area used for rows without `AREA_CODE`.
+            fetched_at (datetime.datetime, optional): The fetch time. Defaults to now (UTC).
+
+        Returns:
+            list: The paths of the files written.
+        """
+        df = data if hasattr(data, "columns") else build_typed_df(data)
+        if df.empty:
+            return []
+        if fetched_at is None:
+            fetched_at = datetime.datetime.now(datetime.timezone.utc)
+        fetch_hour = fetched_at.strftime("%Y-%m-%dT%H")
+
+        if "AREA_CODE" in df.columns:
+            areas = df["AREA_CODE"].astype(object)
+            areas = areas.where(areas.notna(), area_code).fillna("unknown")
+            groups = df.groupby(areas, sort=False)
+        else:
+            groups = [(area_code or "unknown", df)]
+
+        paths = []
+        for area, group in groups:
+            partition = os.path.join(
+                self.directory, f"area_code={area}", f"fetch_hour={fetch_hour}"
+            )
+            os.makedirs(partition, exist_ok=True)
+            path = os.path.join(
+                partition, f"part-{uuid.uuid4().hex}.{self.file_format}"
+            )
+            table = self.to_table(group)
+            if self.file_format == "parquet":
+                pq.write_table(table, path, compression=self.compression)
+            else:
+                feather.write_feather(table, path, compression=self.compression)
+            paths.append(path)
+        self.files_written.extend(paths)
+        return paths
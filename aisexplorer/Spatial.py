@@ -0,0 +1,268 @@
+import math
+import threading
+
+import pandas as pd
+
+# Mean radius of the earth in kilometres
+EARTH_RADIUS_KM = 6371.0088
+
+# Largest distance between two points on the earth
+HALF_CIRCUMFERENCE_KM = math.pi * EARTH_RADIUS_KM
+
+KM_PER_DEGREE = HALF_CIRCUMFERENCE_KM / 180
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Return the great circle distance in kilometres between two points given in degrees."""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    a = (
+        math.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def position(row):
+    """Return the latitude and longitude of a row, or None if it has no valid position."""
+    try:
+        lat = float(row.get("LAT"))
+        lon = float(row.get("LON"))
+    except (TypeError, ValueError):
+        return None
+    if math.isnan(lat) or math.isnan(lon) or not -90 <= lat <= 90:
+        return None
+    return lat, (lon + 180) % 360 - 180
+
+
+def lon_ranges(lon_min, lon_max):
+    """Split a longitude range crossing the antimeridian (`lon_min > lon_max`) in two."""
+    if lon_min <= lon_max:
+        return [(lon_min, lon_max)]
+    return [(lon_min, 180.0), (-180.0, lon_max)]
+
+
+class SpatialIndex:
+    """A thread-safe grid hash of vessel positions for bounding box, radius and nearest queries.
+
+    Vessels are bucketed into cells of `cell_size` degrees on `LAT`/`LON`, so a query
+    only looks at the vessels of the cells it overlaps instead of scanning every row.
+    The index is keyed by `SHIP_ID`: updating it with the rows of a new poll moves the
+    vessels that changed position and adds new ones, and rows without a valid
+    position take their vessel out of the index.
+
+    Attributes:
+        cell_size (float): Edge length of a cell in degrees.
+        key (str): The field identifying a vessel.
+        cells (dict): Maps a cell to the positions of its vessels by key.
+        entries (dict): Maps a key to the cell, latitude, longitude and row of the vessel.
+
+    Example:
+        >>> index = SpatialIndex.from_result(AIS().get_area_data("EMED"))
+        >>> index.nearest(35.9, 14.5, k=5)
+        [(1.2, {'SHIP_ID': '...', ...}), ...]
+    """
+
+    def __init__(self, cell_size=0.1, key="SHIP_ID"):
+        if cell_size <= 0 or cell_size > 180:
+            raise ValueError("cell_size must be between 0 and 180 degrees.")
+        self.cell_size = cell_size
+        self.key = key
+        self.cells = {}
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_result(cls, result, **kwargs):
+        """
+        Builds an index from the result of `get_area_data`, `get_data` or similar.
+
+        Args:
+            result (list or pd.DataFrame or tuple): The rows, optionally paired with
+                the total count.
+            **kwargs: Passed on to `SpatialIndex`.
+
+        Returns:
+            SpatialIndex: The index.
+        """
+        index = cls(**kwargs)
+        index.update(result)
+        return index
+
+    def cell_of(self, lat, lon):
+        """Return the cell of a position."""
+        return math.floor(lat / self.cell_size), math.floor(lon / self.cell_size)
+
+    def update(self, rows):
+        """
+        Adds or moves the vessels of a result.
+
+        Args:
+            rows (list or pd.DataFrame or tuple): The rows, optionally paired with the
+                total count.
+
+        Returns:
+            int: The number of vessels added or moved.
+        """
+        if isinstance(rows, tuple):
+            rows = rows[0]
+        if isinstance(rows, pd.DataFrame):
+            rows = rows.to_dict("records")
+        updated = 0
+        with self.lock:
+            for row in rows:
+                key = row.get(self.key)
+                if key is None or key is pd.NA or (isinstance(key, float) and math.isnan(key)):
+                    continue
+                key = str(key)
+                point = position(row)
+                self._discard(key)
+                if point is None:
+                    continue
+                cell = self.cell_of(*point)
+                self.cells.setdefault(cell, {})[key] = point
+                self.entries[key] = (cell, point[0], point[1], row)
+                updated += 1
+        return updated
+
+    def remove(self, keys):
+        """Remove the vessels of `keys` from the index."""
+        with self.lock:
+            for key in keys:
+                self._discard(str(key))
+
+    def _discard(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        members = self.cells[entry[0]]
+        del members[key]
+        if not members:
+            del self.cells[entry[0]]
+
+    def get(self, key):
+        """Return the row of a vessel, or None if it is not indexed."""
+        entry = self.entries.get(str(key))
+        return None if entry is None else entry[3]
+
+    def clear(self):
+        """Remove every vessel."""
+        with self.lock:
+            self.cells.clear()
+            self.entries.clear()
+
+    def _candidates(self, lat_min, lat_max, ranges):
+        """Yield the key, latitude and longitude of every vessel in the cells overlapping the box."""
+        rows = range(math.floor(lat_min / self.cell_size), math.floor(lat_max / self.cell_size) + 1)
+        columns = [
+            range(math.floor(low / self.cell_size), math.floor(high / self.cell_size) + 1)
+            for low, high in ranges
+        ]
+        if len(rows) * sum(map(len, columns)) > len(self.cells):
+            # A box larger than the occupied area is cheaper to check cell by cell
+            cells = [
+                members
+                for (i, j), members in self.cells.items()
+                if i in rows and any(j in column for column in columns)
+            ]
+        else:
+            cells = [
+                members
+                for i in rows
+                for column in columns
+                for j in column
+                if (members := self.cells.get((i, j)))
+            ]
+        for members in cells:
+            for key, (lat, lon) in members.items():
+                yield key, lat, lon
+
+    def bbox(self, lat_min, lat_max, lon_min, lon_max):
+        """
+        Finds the vessels within a bounding box, borders included.
+
+        Args:
+            lat_min (float): Southern border in degrees.
+            lat_max (float): Northern border in degrees.
+            lon_min (float): Western border in degrees.
+            lon_max (float): Eastern border in degrees. A box crossing the antimeridian
+                has `lon_min > lon_max`.
+
+        Returns:
+            list: The rows of the vessels.
+        """
+        ranges = lon_ranges(lon_min, lon_max)
+        with self.lock:
+            return [
+                self.entries[key][3]
+                for key, lat, lon in self._candidates(lat_min, lat_max, ranges)
+                if lat_min <= lat <= lat_max
+                and any(low <= lon <= high for low, high in ranges)
+            ]
+
+    def within(self, lat, lon, radius_km):
+        """
+        Finds the vessels within a great circle distance of a point.
+
+        Args:
+            lat (float): Latitude of the point in degrees.
+            lon (float): Longitude of the point in degrees.
+            radius_km (float): The distance in kilometres.
+
+        Returns:
+            list: Tuples of the distance in kilometres and the row, nearest first.
+        """
+        lon = (lon + 180) % 360 - 180
+        dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+        lat_min, lat_max = lat - dlat, lat + dlat
+        ratio = math.sin(min(radius_km / EARTH_RADIUS_KM, math.pi / 2)) / max(
+            math.cos(math.radians(lat)), 1e-12
+        )
+        if lat_min <= -90 or lat_max >= 90 or ratio >= 1:
+            ranges = [(-180.0, 180.0)]
+        else:
+            dlon = math.degrees(math.asin(ratio))
+            west = (lon - dlon + 180) % 360 - 180
+            east = (lon + dlon + 180) % 360 - 180
+            ranges = lon_ranges(west, east)
+        with self.lock:
+            found = []
+            for key, other_lat, other_lon in self._candidates(
+                max(lat_min, -90), min(lat_max, 90), ranges
+            ):
+                distance = haversine(lat, lon, other_lat, other_lon)
+                if distance <= radius_km:
+                    found.append((distance, key))
+            found.sort()
+            return [(distance, self.entries[key][3]) for distance, key in found]
+
+    def nearest(self, lat, lon, k=1):
+        """
+        Finds the `k` vessels nearest to a point.
+
+        The search radius starts at the size of a cell and doubles until it holds
+        `k` vessels, so dense regions are answered from a few cells.
+
+        Args:
+            lat (float): Latitude of the point in degrees.
+            lon (float): Longitude of the point in degrees.
+            k (int): The number of vessels.
+
+        Returns:
+            list: Tuples of the distance in kilometres and the row, nearest first.
+                Fewer than `k` if the index holds fewer vessels.
+        """
+        if k < 1:
+            raise ValueError("k must be a positive integer.")
+        radius = self.cell_size * KM_PER_DEGREE
+        while True:
+            found = self.within(lat, lon, radius)
+            if len(found) >= k or radius >= HALF_CIRCUMFERENCE_KM:
+                return found[:k]
+            radius = min(radius * 2, HALF_CIRCUMFERENCE_KM)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return str(key) in self.entries
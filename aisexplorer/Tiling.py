@@ -0,0 +1,153 @@
+from concurrent.futures import ThreadPoolExecutor
+from aisexplorer.Filters import Filters
+from aisexplorer.Utils.Utility import build_typed_df
+
+
+class Tile:
+    """A bounding box given by its latitude and longitude ranges."""
+
+    def __init__(self, lat_min, lat_max, lon_min, lon_max, depth=0):
+        if lat_min >= lat_max or lon_min >= lon_max:
+            raise ValueError("A tile needs lat_min < lat_max and lon_min < lon_max.")
+        self.lat_min = lat_min
+        self.lat_max = lat_max
+        self.lon_min = lon_min
+        self.lon_max = lon_max
+        self.depth = depth
+
+    def split(self):
+        """Split the tile into its four quadrants."""
+        lat_mid = (self.lat_min + self.lat_max) / 2
+        lon_mid = (self.lon_min + self.lon_max) / 2
+        return [
+            Tile(lat_min, lat_max, lon_min, lon_max, self.depth + 1)
+            for lat_min, lat_max in ((self.lat_min, lat_mid), (lat_mid, self.lat_max))
+            for lon_min, lon_max in ((self.lon_min, lon_mid), (lon_mid, self.lon_max))
+        ]
+
+    def to_filter_config(self):
+        """Return the `lat`/`lon` filter configuration covering the tile."""
+        return {
+            "lat": [self.lat_min, self.lat_max],
+            "lon": [self.lon_min, self.lon_max],
+        }
+
+    def __repr__(self):
+        return (
+            f"Tile(lat=[{self.lat_min}, {self.lat_max}], "
+            f"lon=[{self.lon_min}, {self.lon_max}], depth={self.depth})"
+        )
+
+
+class AdaptiveTiler:
+    """A query planner that covers a bounding box with as few requests as possible.
+
+    Every tile is queried with `lat`/`lon` slider filters. Whenever the total count of
+    a tile exceeds the number of rows a single request returns, the tile is split into
+    quadrants which are queried in the next round. Tiles of a round are fetched in
+    parallel and the rows of all leaf tiles are merged and deduplicated on `SHIP_ID`.
+
+    Attributes:
+        ais (AIS): The client used to send the requests.
+        max_rows (int): Maximum number of rows a single request returns.
+        max_depth (int): Maximum number of splits. Tiles at this depth are paginated instead.
+        max_workers (int): Number of tiles fetched concurrently.
+        filter_config (dict): Additional filters applied to every tile.
+        leaves (list): The leaf tiles of the last sweep.
+        requests_made (int): The number of tile requests of the last sweep.
+    """
+
+    def __init__(self, ais, max_rows=500, max_depth=8, max_workers=4, filter_config=None):
+        if filter_config is None:
+            filter_config = {}
+        if "lat" in filter_config or "lon" in filter_config:
+            raise ValueError("filter_config must not contain the lat or lon filter.")
+        if not isinstance(max_workers, int) or max_workers < 1:
+            raise ValueError("max_workers must be a positive integer.")
+        self.ais = ais
+        self.max_rows = max_rows
+        self.max_depth = max_depth
+        self.max_workers = max_workers
+        self.filter_config = filter_config
+        self.leaves = []
+        self.requests_made = 0
+        self.fetch_tile = ais.retry_policy.wrap(self.fetch_tile, on_retry=ais.on_retry)
+
+    def fetch_tile(self, tile):
+        """Fetch the first page of a tile.
+
+        Args:
+            tile (Tile): The tile to fetch.
+
+        Returns:
+            tuple: The rows of the first page and the total count of the tile.
+        """
+        filters = Filters(**self.filter_config, **tile.to_filter_config())
+        request_url, referer_url = self.ais.build_data_urls(
+            use_Filters=True, filters=filters
+        )
+        self.ais.query_print("request_url: " + request_url)
+        payload = self.ais.fetch_page(request_url, referer_url)
+        data, total_count = payload["data"], payload["totalCount"]
+        if total_count > len(data) and tile.depth >= self.max_depth:
+            data = data + self.ais.fetch_remaining_pages(
+                request_url, referer_url, total_count, len(data)
+            )
+        return data, total_count
+
+    def is_leaf(self, tile, total_count):
+        """Check whether the rows of a tile are complete or the tile cannot be split further."""
+        return total_count <= self.max_rows or tile.depth >= self.max_depth
+
+    def fetch(self, lat_min=-90, lat_max=90, lon_min=-180, lon_max=180):
+        """
+        Fetches every vessel inside a bounding box.
+
+        Args:
+            lat_min (float): Southern boundary. Defaults to -90.
+            lat_max (float): Northern boundary. Defaults to 90.
+            lon_min (float): Western boundary. Defaults to -180.
+            lon_max (float): Eastern boundary. Defaults to 180.
+
+        Returns:
+            list or pd.DataFrame: The deduplicated rows, as DataFrame if `ais.return_df` is set.
+
+        Example:
+            To fetch every vessel in the English Channel:
+            >>> AdaptiveTiler(AIS(return_df=True)).fetch(48.5, 51.5, -6, 2)
+        """
+        self.leaves = []
+        self.requests_made = 0
+        rows = []
+        pending = [Tile(lat_min, lat_max, lon_min, lon_max)]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending:
+                self.ais.verbose_print(f"Fetching {len(pending)} tiles...")
+                results = list(executor.map(self.fetch_tile, pending))
+                self.requests_made += len(pending)
+                next_round = []
+                for tile, (data, total_count) in zip(pending, results):
+                    if self.is_leaf(tile, total_count):
+                        self.leaves.append(tile)
+                        rows.extend(data)
+                    else:
+                        next_round.extend(tile.split())
+                pending = next_round
+        return self.merge(rows)
+
+    def merge(self, rows):
+        """Deduplicate rows on `SHIP_ID`, keeping the first occurrence.
+
+        Vessels lying exactly on a tile boundary are returned by both neighbouring tiles.
+        """
+        seen = set()
+        merged = []
+        for row in rows:
+            ship_id = row.get("SHIP_ID")
+            if ship_id is None or ship_id not in seen:
+                seen.add(ship_id)
+                merged.append(row)
+        merged = self.ais.join_references(merged)
+        if self.ais.return_df:
+            return build_typed_df(merged, compact=self.ais.compact)
+        return merged
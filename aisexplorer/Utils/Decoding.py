@@ -0,0 +1,44 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_loads(content):
+    """
+    Decode a JSON document, using orjson if it is installed.
+
+    Args:
+        content (bytes or str): The JSON document.
+
+    Returns:
+        The decoded document.
+    """
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def is_json_body(content, content_type=None):
+    """
+    Check whether a response body is JSON without parsing it.
+
+    The content type header is trusted if it names JSON or HTML. Otherwise the first
+    non-whitespace byte of the body decides.
+
+    Args:
+        content (bytes): The body of the response.
+        content_type (str, optional): The value of the Content-Type header.
+
+    Returns:
+        bool: True if the body is JSON.
+    """
+    if content_type:
+        content_type = content_type.lower()
+        if "json" in content_type:
+            return True
+        if "html" in content_type:
+            return False
+    return content.lstrip()[:1] in (b"{", b"[")
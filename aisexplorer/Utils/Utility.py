@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 # Define columns and their respective data types
@@ -43,36 +44,164 @@ COLUMN_TYPES = {
     "timestamp": ["ETA_UPDATED"],
 }
 
+# Dtypes used by the opt-in compact mode to reduce the memory of large frames
+COMPACT_TYPES = {
+    "category": [
+        "CODE2",
+        "COUNTRY",
+        "TYPE_SUMMARY",
+        "STATUS_NAME",
+        "AREA_CODE",
+        "CURRENT_PORT_COUNTRY",
+    ],
+    "float32": ["LAT", "LON", "SPEED"],
+    "smallest_int": ["SHIP_ID", "IMO", "MMSI"],
+}
+
+
+def to_int(series):
+    """Convert a series to nullable integers, or to floats if it holds fractional values."""
+    numeric = pd.to_numeric(series, errors="coerce")
+    if numeric.dtype.kind == "f" and not (numeric.dropna() % 1 == 0).all():
+        return numeric
+    return numeric.astype("Int64")
+
+
+def to_float(series):
+    """Convert a series to floats. Values that are not numeric become NaN."""
+    return pd.to_numeric(series, errors="coerce").astype("float64")
+
+
+def to_bool(series):
+    """Convert a series to booleans. Missing values become False."""
+    return series.astype(bool) & series.notna()
+
+
+def to_str(series):
+    """Convert a series to strings, keeping missing values as <NA>."""
+    return series.astype("string")
+
+
+def to_unix_datetime(series):
+    """Convert seconds since the epoch to datetimes. Masked, invalid or out of range values become NaT."""
+    seconds = pd.to_numeric(series, errors="coerce")
+    # Values too large for a timestamp overflow instead of being coerced
+    seconds = seconds.where(seconds.abs() <= pd.Timestamp.max.timestamp())
+    return pd.to_datetime(seconds, unit="s", errors="coerce")
+
+
+def to_datetime(series):
+    """Convert timestamp strings to datetimes. Invalid values become NaT."""
+    return pd.to_datetime(series, errors="coerce")
+
+
+# "masked" is not numeric, so `unix_masked` columns need no special treatment
+CONVERTERS = {
+    "int": to_int,
+    "float": to_float,
+    "bool": to_bool,
+    "str": to_str,
+    "unix": to_unix_datetime,
+    "unix_masked": to_unix_datetime,
+    "timestamp": to_datetime,
+}
+
+COLUMN_CONVERTERS = {
+    column: CONVERTERS[dtype]
+    for dtype, columns in COLUMN_TYPES.items()
+    for column in columns
+}
+
+
+def to_smallest_int(series):
+    """Downcast an integer series to the smallest nullable integer type its values fit in."""
+    valid = series.dropna()
+    if series.dtype.kind == "f" or valid.empty:
+        return series
+    low, high = valid.min(), valid.max()
+    if low >= 0:
+        candidates = ("UInt8", "UInt16", "UInt32", "UInt64")
+    else:
+        candidates = ("Int8", "Int16", "Int32", "Int64")
+    for dtype in candidates:
+        info = np.iinfo(dtype.lower())
+        if info.min <= low and high <= info.max:
+            return series.astype(dtype)
+    return series
 
-def set_types_df(df):
+
+COMPACT_CONVERTERS = {
+    "category": lambda series: series.astype("category"),
+    "float32": lambda series: series.astype("float32"),
+    "smallest_int": to_smallest_int,
+}
+
+
+def compact_df(df):
+    """
+    Convert the columns of a typed DataFrame to the memory-lean dtypes of `COMPACT_TYPES`.
+
+    Low-cardinality strings become categories, positions and speed float32 and IDs the
+    smallest integer type that fits. Columns missing from the DataFrame are skipped.
+
+    Args:
+        df (pd.DataFrame): A DataFrame typed by `build_typed_df` or `set_types_df`.
+
+    Returns:
+        pd.DataFrame: The DataFrame with compact dtypes.
+    """
+    for dtype, columns in COMPACT_TYPES.items():
+        for column in columns:
+            if column in df.columns:
+                df[column] = COMPACT_CONVERTERS[dtype](df[column])
+    return df
+
+
+def build_typed_df(records, compact=False):
+    """
+    Build a DataFrame with correctly typed columns directly from decoded records.
+
+    Every column is collected once from the records and converted as a whole, so no
+    intermediate object frame is created. Columns missing from `COLUMN_TYPES` are kept
+    as they are and columns missing from the records are skipped.
+
+    Args:
+        records (list): The rows of a response, as dictionaries.
+        compact (bool): If True, use the memory-lean dtypes of `COMPACT_TYPES`.
+
+    Returns:
+        pd.DataFrame: The typed DataFrame.
+    """
+    if not records:
+        return pd.DataFrame()
+    columns = dict.fromkeys(key for record in records for key in record)
+    data = {}
+    for column in columns:
+        series = pd.Series([record.get(column) for record in records], dtype=object)
+        converter = COLUMN_CONVERTERS.get(column)
+        data[column] = converter(series) if converter else series.infer_objects()
+    df = pd.DataFrame(data)
+    return compact_df(df) if compact else df
+
+
+def set_types_df(df, compact=False):
     """
     Set the data types for a DataFrame's columns based on predefined mappings.
 
+    Columns missing from the DataFrame are skipped.
+
     Args:
         df (pd.DataFrame): The DataFrame whose data types are to be set.
+        compact (bool): If True, use the memory-lean dtypes of `COMPACT_TYPES`.
 
     Returns:
         pd.DataFrame: The DataFrame with updated data types.
     """
-    df = df.copy()
-
-    # Apply types for each group of columns
-    for dtype, cols in COLUMN_TYPES.items():
-        if dtype == "int":
-            df[cols] = df[cols].apply(pd.to_numeric, errors="coerce")
-        elif dtype == "float":
-            df[cols] = df[cols].apply(pd.to_numeric, errors="coerce")
-        elif dtype == "bool":
-            df[cols] = df[cols].astype(bool)
-        elif dtype == "str":
-            df[cols] = df[cols].astype(str)
-        elif dtype in ["unix", "unix_masked"]:
-            for col in cols:
-                if dtype == "unix_masked":
-                    df[col] = df[col].apply(lambda x: x if x != "masked" else None)
-                df[col] = pd.to_numeric(df[col], errors="coerce")
-                df[col] = pd.to_datetime(df[col], unit="s", errors="coerce")
-        elif dtype == "timestamp":
-            df[cols] = df[cols].apply(pd.to_datetime, errors="coerce")
-
-    return df
+    df = df.assign(
+        **{
+            column: COLUMN_CONVERTERS[column](df[column])
+            for column in df.columns
+            if column in COLUMN_CONVERTERS
+        }
+    )
+    return compact_df(df) if compact else df
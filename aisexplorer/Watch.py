@@ -0,0 +1,266 @@
+import heapq
+import itertools
+import time
+
+from aisexplorer.Filters import Filters
+
+
+class VesselChange:
+    """A change of a single vessel between two snapshots of a watch target.
+
+    Attributes:
+        target (str): The name of the watch target.
+        kind (str): One of "entered", "left", "moved" or "changed".
+        key (str): The `SHIP_ID` of the vessel, or its `MMSI` if there is no `SHIP_ID`.
+        row (dict): The current row, or the last known row if the vessel left.
+        previous (dict): The previous row, or None if the vessel entered.
+        fields (list): The tracked fields that changed, for "changed" events.
+    """
+
+    def __init__(self, target, kind, key, row, previous=None, fields=None):
+        self.target = target
+        self.kind = kind
+        self.key = key
+        self.row = row
+        self.previous = previous
+        self.fields = fields or []
+
+    def __repr__(self):
+        fields = f", fields={self.fields}" if self.fields else ""
+        return f"VesselChange({self.target!r}, {self.kind!r}, {self.key!r}{fields})"
+
+
+def vessel_key(row):
+    """Return the key a vessel is tracked by: its `SHIP_ID` or else its `MMSI`."""
+    key = row.get("SHIP_ID")
+    return row.get("MMSI") if key is None else key
+
+
+def as_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def diff_snapshots(
+    target,
+    previous,
+    current,
+    tracked_fields=("STATUS", "DESTINATION"),
+    position_tolerance=0.0,
+):
+    """
+    Compare two snapshots of a watch target.
+
+    Args:
+        target (str): The name of the watch target.
+        previous (dict): The rows of the previous snapshot by vessel key.
+        current (dict): The rows of the current snapshot by vessel key.
+        tracked_fields (iterable): Fields reported as "changed" when they differ.
+        position_tolerance (float): Minimal change of `LAT` or `LON` in degrees reported as "moved".
+
+    Returns:
+        list: The `VesselChange` events, entered and changed vessels in the order of the current snapshot, then left vessels.
+    """
+    changes = []
+    for key, row in current.items():
+        old = previous.get(key)
+        if old is None:
+            changes.append(VesselChange(target, "entered", key, row))
+            continue
+        for field in ("LAT", "LON"):
+            new_value, old_value = as_float(row.get(field)), as_float(old.get(field))
+            if new_value is None or old_value is None:
+                moved = new_value != old_value
+            else:
+                moved = abs(new_value - old_value) > position_tolerance
+            if moved:
+                changes.append(VesselChange(target, "moved", key, row, old))
+                break
+        fields = [field for field in tracked_fields if row.get(field) != old.get(field)]
+        if fields:
+            changes.append(VesselChange(target, "changed", key, row, old, fields))
+    for key, old in previous.items():
+        if key not in current:
+            changes.append(VesselChange(target, "left", key, old, old))
+    return changes
+
+
+class WatchTarget:
+    """An area or filter query that is polled on its own interval.
+
+    Attributes:
+        name (str): The name used in the emitted changes.
+        interval (float): Seconds between two polls.
+        snapshot (dict): The rows of the last successful poll by vessel key, or None before the first poll.
+        last_error (Exception): The error of the last poll, or None if it succeeded.
+    """
+
+    def __init__(self, name, build_urls, interval):
+        if interval <= 0:
+            raise ValueError("interval must be positive.")
+        self.name = name
+        self.build_urls = build_urls
+        self.interval = interval
+        self.snapshot = None
+        self.last_error = None
+
+
+class Watcher:
+    """Polls areas and filter queries and emits only what changed between two polls.
+
+    Every target keeps its last snapshot keyed by `SHIP_ID` (or `MMSI`). Each poll
+    fetches every page of the target and is compared with the previous snapshot, so
+    consumers receive vessels entering or leaving, moved positions and changed
+    `STATUS`/`DESTINATION` instead of full snapshots.
+
+    Attributes:
+        ais (AIS): The client used to send the requests.
+        tracked_fields (tuple): Fields reported as "changed" when they differ.
+        position_tolerance (float): Minimal change of `LAT` or `LON` in degrees reported as "moved".
+        emit_initial (bool): If True, the first poll of a target reports every vessel as "entered".
+        targets (dict): The watch targets by name.
+
+    Example:
+        >>> watcher = Watcher(AIS())
+        >>> watcher.watch_area("EMED", interval=60)
+        >>> watcher.watch_filters({"flag": ["MT"], "speed": [1, 30]}, interval=300, name="maltese")
+        >>> for target, changes in watcher.run():
+        ...     handle(changes)
+    """
+
+    def __init__(
+        self,
+        ais,
+        tracked_fields=("STATUS", "DESTINATION"),
+        position_tolerance=0.0,
+        emit_initial=True,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        self.ais = ais
+        self.tracked_fields = tuple(tracked_fields)
+        self.position_tolerance = position_tolerance
+        self.emit_initial = emit_initial
+        self.clock = clock
+        self.sleep = sleep
+        self.targets = {}
+
+    def add_target(self, target):
+        if target.name in self.targets:
+            raise ValueError(f"A target named {target.name} is already watched.")
+        self.targets[target.name] = target
+        return target
+
+    def watch_area(self, area, interval=60, name=None):
+        """
+        Watches one or more areas.
+
+        Args:
+            area (str or iterable): A valid area code or an iterable of area codes.
+            interval (float): Seconds between two polls. Defaults to 60.
+            name (str, optional): The name of the target. Defaults to the area codes.
+
+        Returns:
+            WatchTarget: The new target.
+        """
+        self.ais.build_area_urls(area)
+        if name is None:
+            name = area if isinstance(area, str) else ",".join(area)
+        return self.add_target(
+            WatchTarget(name, lambda: self.ais.build_area_urls(area), interval)
+        )
+
+    def watch_filters(self, filter_config, interval=60, name=None):
+        """
+        Watches the vessels matching a filter configuration.
+
+        Args:
+            filter_config (dict): A configuration as accepted by `Filters`.
+            interval (float): Seconds between two polls. Defaults to 60.
+            name (str, optional): The name of the target. Defaults to the filter query.
+
+        Returns:
+            WatchTarget: The new target.
+        """
+        filters = Filters(**filter_config)
+        if name is None:
+            name = filters.to_query()
+        return self.add_target(
+            WatchTarget(
+                name,
+                lambda: self.ais.build_data_urls(use_Filters=True, filters=filters),
+                interval,
+            )
+        )
+
+    def poll(self, target):
+        """
+        Polls a target once and updates its snapshot.
+
+        Args:
+            target (WatchTarget or str): The target or its name.
+
+        Returns:
+            list: The `VesselChange` events since the previous poll.
+        """
+        if isinstance(target, str):
+            target = self.targets[target]
+        request_url, referer_url = target.build_urls()
+        current = {}
+        for rows in self.ais.iter_pages(request_url, referer_url):
+            for row in self.ais.join_references(rows):
+                current[vessel_key(row)] = row
+        previous = target.snapshot
+        target.snapshot = current
+        target.last_error = None
+        if previous is None and not self.emit_initial:
+            return []
+        return diff_snapshots(
+            target.name,
+            previous or {},
+            current,
+            tracked_fields=self.tracked_fields,
+            position_tolerance=self.position_tolerance,
+        )
+
+    def run(self, max_polls=None):
+        """
+        Polls every target on its interval and yields the changes of each poll.
+
+        A failing poll keeps the previous snapshot, is recorded in `last_error` and is
+        retried on the next interval. A poll taking longer than its interval is
+        followed by the next one an interval after it finished, instead of catching
+        up on the missed ticks back to back.
+
+        Args:
+            max_polls (int, optional): Stop after this many polls. Defaults to running forever.
+
+        Yields:
+            tuple: The target name and the list of `VesselChange` events of a poll.
+        """
+        counter = itertools.count()
+        now = self.clock()
+        schedule = [(now, next(counter), target) for target in self.targets.values()]
+        heapq.heapify(schedule)
+        polls = 0
+        while schedule and (max_polls is None or polls < max_polls):
+            due, _, target = heapq.heappop(schedule)
+            delay = due - self.clock()
+            if delay > 0:
+                self.sleep(delay)
+            try:
+                changes = self.poll(target)
+            except Exception as e:
+                self.ais.verbose_print(f"Polling {target.name} failed: {e}")
+                target.last_error = e
+                changes = None
+            due += target.interval
+            now = self.clock()
+            if due <= now:
+                due = now + target.interval
+            heapq.heappush(schedule, (due, next(counter), target))
+            polls += 1
+            if changes is not None:
+                yield target.name, changes
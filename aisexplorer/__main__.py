@@ -0,0 +1,5 @@
+import sys
+
+from aisexplorer.Cli import main
+
+sys.exit(main())
@@ -0,0 +1,311 @@
+"""Offline benchmarks of AISExplorer against a local MarineTraffic stand-in.
+
+Run from the repository root:
+
+    python -m benchmarks.run --rows 500 --requests 200 --workers 8 --output report.json
+    python -m benchmarks.run --compare previous-report.json
+
+Every request is answered by a local HTTP server with a synthetic (or recorded, see
+`--payload`) `/en/reports` payload, so the numbers only depend on the client and
+the machine. The server runs in the same process and competes for the GIL, which
+makes absolute numbers pessimistic but keeps them comparable between releases.
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import aisexplorer
+from aisexplorer.AIS import AIS
+from aisexplorer.Exceptions import CloudflareError
+from aisexplorer.Retry import RetryPolicy
+from aisexplorer.Spatial import SpatialIndex
+from aisexplorer.Utils import Decoding
+from aisexplorer.Utils.Utility import COLUMN_TYPES, build_typed_df, set_types_df
+from benchmarks.stand_in import CLOUDFLARE_PAGE, StandInServer
+
+
+def make_rows(count, seed=0):
+    """Create `count` rows with every column of `COLUMN_TYPES`, encoded as strings."""
+    rng = random.Random(seed)
+    countries = ["MT", "GR", "IT", "NL", "DE", "PA", "LR"]
+    statuses = ["UNDERWAY USING ENGINE", "AT ANCHOR", "MOORED"]
+    rows = []
+    for i in range(count):
+        row = {}
+        for column in COLUMN_TYPES["int"]:
+            row[column] = str(rng.randint(0, 10**7))
+        row["SHIP_ID"] = str(100000 + i)
+        row["MMSI"] = str(200000000 + i)
+        for column in COLUMN_TYPES["float"]:
+            row[column] = f"{rng.uniform(-90, 90):.5f}"
+        for column in COLUMN_TYPES["bool"]:
+            row[column] = rng.choice(["0", "1"])
+        for column in COLUMN_TYPES["str"]:
+            row[column] = f"{column.lower()} {rng.randint(0, 50)}"
+        row["SHIPNAME"] = f"VESSEL {i}"
+        row["CODE2"] = row["COUNTRY"] = rng.choice(countries)
+        row["STATUS_NAME"] = rng.choice(statuses)
+        row["AREA_CODE"] = "EMED"
+        row["LAST_POS"] = str(1700000000 + rng.randint(0, 86400))
+        row["ETA"] = rng.choice(["masked", str(1700100000 + i)])
+        row["ETA_UPDATED"] = "2024-01-01 12:00:00"
+        rows.append(row)
+    return rows
+
+
+class StaticBackend:
+    """Answers every request with the same pre-rendered body."""
+
+    def __init__(self, body, status=200):
+        self.body = body
+        self.status = status
+
+    def handle(self, url):
+        return self.status, self.body
+
+
+def percentiles(latencies):
+    """Return the latency percentiles in milliseconds."""
+    ordered = sorted(latencies)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+    return {
+        "p50": pick(0.5),
+        "p90": pick(0.9),
+        "p99": pick(0.99),
+        "max": ordered[-1] * 1000,
+        "mean": statistics.fmean(ordered) * 1000,
+    }
+
+
+def peak_memory(function):
+    """Return the peak memory in bytes allocated while calling `function`."""
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def time_calls(function, repeat):
+    """Return the mean seconds of `repeat` calls of `function`."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def bench_requests(ais, count, workers, expected_error=None):
+    """Send `count` area requests with `workers` threads sharing one client."""
+    latencies = []
+
+    def request(_):
+        start = time.perf_counter()
+        try:
+            ais.get_area_data("EMED")
+        except Exception as e:
+            if expected_error is None or not isinstance(e, expected_error):
+                raise
+        latencies.append(time.perf_counter() - start)
+
+    request(None)
+    latencies.clear()
+    start = time.perf_counter()
+    if workers == 1:
+        for i in range(count):
+            request(i)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(request, range(count)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": count,
+        "workers": workers,
+        "seconds": elapsed,
+        "requests_per_second": count / elapsed,
+        "latency_ms": percentiles(latencies),
+        "peak_memory_bytes": peak_memory(lambda: request(None)),
+    }
+
+
+def bench_conversion(function, rows, repeat):
+    seconds = time_calls(function, repeat)
+    return {
+        "seconds_per_call": seconds,
+        "rows_per_second": rows / seconds if seconds else None,
+        "peak_memory_bytes": peak_memory(function),
+    }
+
+
+def bench_spatial(data, repeat):
+    """Time building a `SpatialIndex` (per call) and its bbox, radius and nearest queries."""
+    index = SpatialIndex.from_result(data)
+    rng = random.Random(0)
+    points = [(rng.uniform(-80, 80), rng.uniform(-180, 180)) for _ in range(100)]
+
+    def per_query(query):
+        return time_calls(lambda: [query(lat, lon) for lat, lon in points], repeat) / len(points)
+
+    return {
+        "seconds_per_call": time_calls(lambda: SpatialIndex.from_result(data), repeat),
+        "bbox_seconds": per_query(lambda lat, lon: index.bbox(lat, lat + 1, lon, lon + 1)),
+        "radius_seconds": per_query(lambda lat, lon: index.within(lat, lon, 100)),
+        "nearest_seconds": per_query(lambda lat, lon: index.nearest(lat, lon, k=10)),
+    }
+
+
+def run_benchmarks(rows=500, requests=200, workers=8, repeat=5, payload=None):
+    """
+    Runs every benchmark.
+
+    Args:
+        rows (int): Rows of the synthetic payload. Ignored if `payload` is given.
+        requests (int): Requests sent by each request benchmark.
+        workers (int): Threads of the parallel benchmark.
+        repeat (int): Repetitions of the decode, typing and spatial index benchmarks.
+        payload (str, optional): Path of a recorded `/en/reports` response to serve instead.
+
+    Returns:
+        dict: The report.
+    """
+    if payload is None:
+        data = make_rows(rows)
+        body = json.dumps({"data": data, "totalCount": len(data)})
+    else:
+        with open(payload, encoding="utf-8") as file:
+            body = file.read()
+        data = json.loads(body)["data"]
+    content = body.encode()
+    policy = RetryPolicy(max_attempts=1)
+
+    results = {}
+    with StandInServer(StaticBackend(body)) as server:
+        ais = AIS(base_url=server.url, retry_policy=policy, pool_maxsize=workers)
+        results["sync"] = bench_requests(ais, requests, 1)
+        results["parallel"] = bench_requests(ais, requests, workers)
+    with StandInServer(StaticBackend(CLOUDFLARE_PAGE, status=403)) as server:
+        ais = AIS(base_url=server.url, retry_policy=policy, pool_maxsize=workers)
+        results["cloudflare"] = bench_requests(
+            ais, requests, workers, expected_error=CloudflareError
+        )
+
+    results["json_decode"] = bench_conversion(
+        lambda: Decoding.json_loads(content), len(data), repeat
+    )
+    results["json_decode"]["decoder"] = "orjson" if Decoding.orjson else "json"
+    results["json_decode"]["payload_bytes"] = len(content)
+    raw_df = pd.DataFrame(data)
+    results["set_types_df"] = bench_conversion(
+        lambda: set_types_df(raw_df), len(data), repeat
+    )
+    results["build_typed_df"] = bench_conversion(
+        lambda: build_typed_df(data), len(data), repeat
+    )
+    results["build_typed_df_compact"] = bench_conversion(
+        lambda: build_typed_df(data, compact=True), len(data), repeat
+    )
+    results["spatial_index"] = bench_spatial(data, repeat)
+
+    return {
+        "aisexplorer": aisexplorer.__version__,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "config": {
+            "rows": len(data),
+            "requests": requests,
+            "workers": workers,
+            "repeat": repeat,
+            "payload": payload,
+        },
+        "results": results,
+    }
+
+
+def flatten(results, prefix=""):
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def compare_reports(previous, current):
+    """
+    Compares the numeric results of two reports.
+
+    Returns:
+        dict: The ratio current / previous of every metric both reports have.
+    """
+    old, new = flatten(previous["results"]), flatten(current["results"])
+    return {
+        key: new[key] / old[key] for key in sorted(old.keys() & new.keys()) if old[key]
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500, help="rows per payload")
+    parser.add_argument("--requests", type=int, default=200, help="requests per benchmark")
+    parser.add_argument(
+        "--workers", type=int, default=8, help="threads of the parallel benchmark"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="repetitions of decode and typing"
+    )
+    parser.add_argument("--payload", help="recorded /en/reports response to serve")
+    parser.add_argument("--output", default="benchmark-report.json", help="report path")
+    parser.add_argument("--compare", help="previous report to compare with")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(
+        rows=args.rows,
+        requests=args.requests,
+        workers=args.workers,
+        repeat=args.repeat,
+        payload=args.payload,
+    )
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            report["comparison"] = compare_reports(json.load(file), report)
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+
+    for name, result in report["results"].items():
+        if "requests_per_second" in result:
+            latency = result["latency_ms"]
+            print(
+                f"{name:>24}: {result['requests_per_second']:8.1f} req/s"
+                f"  p50 {latency['p50']:.2f} ms  p99 {latency['p99']:.2f} ms"
+            )
+        elif "nearest_seconds" in result:
+            print(
+                f"{name:>24}: {result['seconds_per_call'] * 1000:8.2f} ms/build"
+                f"  bbox {result['bbox_seconds'] * 1e6:.1f} us"
+                f"  radius {result['radius_seconds'] * 1e6:.1f} us"
+                f"  nearest {result['nearest_seconds'] * 1e6:.1f} us"
+            )
+        else:
+            print(f"{name:>24}: {result['seconds_per_call'] * 1000:8.2f} ms/call")
+    print(f"Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
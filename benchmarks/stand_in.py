@@ -0,0 +1,199 @@
+"""A minimal stand-in for the MarineTraffic `/en/reports` endpoint used by the benchmarks and offline tests."""
+
+import json
+import random
+import threading
+import time
+import urllib.parse
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CLOUDFLARE_PAGE = (
+    "<!DOCTYPE html><html><head><title>Just a moment... | Cloudflare</title></head>"
+    "<body>Checking your browser before accessing the website.</body></html>"
+)
+
+
+def make_vessels(count, lat_range=(-60, 60), lon_range=(-170, 170), areas=("WMED",), seed=0):
+    """Create `count` synthetic vessels spread uniformly over the given ranges."""
+    rng = random.Random(seed)
+    return [
+        {
+            "SHIP_ID": str(100000 + i),
+            "MMSI": str(200000000 + i),
+            "SHIPNAME": f"VESSEL {i}",
+            "LAT": str(round(rng.uniform(*lat_range), 5)),
+            "LON": str(round(rng.uniform(*lon_range), 5)),
+            "SPEED": str(rng.randint(0, 200)),
+            "AREA_CODE": areas[i % len(areas)],
+        }
+        for i in range(count)
+    ]
+
+
+class StandInBackend:
+    """Answers report queries over a list of vessels.
+
+    Supports the `lat`/`lon` range filters, `area_in`, `mmsi` (single and list),
+    `fleet_in` and `page`, as well as the login and fleet list endpoints.
+    """
+
+    def __init__(self, vessels, page_size=500, delay=0, fleets=None, cloudflare=False):
+        self.vessels = vessels
+        self.page_size = page_size
+        self.delay = delay
+        self.fleets = fleets or []
+        self.cloudflare = cloudflare
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def parse(self, url):
+        query = urllib.parse.urlsplit(url).query
+        conditions = {}
+        page = 1
+        for part in query.split("&"):
+            key, _, value = urllib.parse.unquote(part).partition("=")
+            name = key.split("|")[0]
+            if name == "page":
+                page = int(value)
+            elif name in ("lat_of_latest_position_between", "lon_of_latest_position_between"):
+                low, high = (float(v) for v in value.split(","))
+                conditions[name[:3].upper()] = lambda v, low=low, high=high: low <= float(v) <= high
+            elif name == "area_in":
+                areas = set(value.split(","))
+                conditions["AREA_CODE"] = lambda v, areas=areas: v in areas
+            elif name == "mmsi" and key.split("|")[1:2] == ["in"]:
+                mmsis = set(key.split("|")[2].split(","))
+                conditions["MMSI"] = lambda v, mmsis=mmsis: v in mmsis
+            elif name == "mmsi":
+                conditions["MMSI"] = lambda v, mmsi=value: v == mmsi
+            elif name == "fleet_in":
+                fleet_ids = set(value.split(","))
+                conditions["FLEET_ID"] = lambda v, fleet_ids=fleet_ids: v in fleet_ids
+        return conditions, page
+
+    def handle(self, url):
+        """Return the status code and body for a request URL."""
+        with self.lock:
+            self.requests.append(url)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.delay:
+                time.sleep(self.delay)
+            return self.route(url)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def route(self, url):
+        path = urllib.parse.urlsplit(url).path
+        if self.cloudflare:
+            return 403, CLOUDFLARE_PAGE
+        if path == "/en/users/ajax_login":
+            return 200, "{}"
+        if path == "/en/search/fleetList":
+            return 200, json.dumps(self.fleets)
+        conditions, page = self.parse(url)
+        matches = [
+            vessel
+            for vessel in self.vessels
+            if all(check(vessel.get(column, "")) for column, check in conditions.items())
+        ]
+        start = (page - 1) * self.page_size
+        body = {"data": matches[start : start + self.page_size], "totalCount": len(matches)}
+        return 200, json.dumps(body)
+
+
+class FakeResponse:
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode()
+        content_type = "text/html" if text.startswith("<") else "application/json"
+        self.headers = {"Content-Type": f"{content_type}; charset=utf-8"}
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class FakeSession:
+    """Replaces `requests.Session` and routes every request to a `StandInBackend`."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.proxies = {}
+        self.headers = {}
+
+    def get(self, url, headers=None, **kwargs):
+        return FakeResponse(*self.backend.handle(url))
+
+
+class StandInServer:
+    """Serves a `StandInBackend` over HTTP on a free local port.
+
+    Example:
+        >>> with StandInServer(StandInBackend(make_vessels(10))) as server:
+        ...     AIS(base_url=server.url).get_area_data("WMED")
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.connections = 0
+        lock = threading.Lock()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately, so small bodies would wait
+            # for the delayed ACK of the client
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with lock:
+                    stand_in.connections += 1
+
+            def respond(self):
+                status, body = backend.handle(self.path)
+                payload = body.encode()
+                content_type = "text/html" if body.startswith("<") else "application/json"
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up waiting, e.g. after a timeout
+                    self.close_connection = True
+
+            def do_GET(self):
+                self.respond()
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                self.rfile.read(length)
+                self.respond()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,97 @@
+"""Helpers of the offline tests, built on the stand-in of `benchmarks.stand_in`."""
+
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from aisexplorer.AIS import AIS
+from benchmarks.stand_in import (
+    CLOUDFLARE_PAGE,
+    FakeResponse,
+    FakeSession,
+    StandInBackend,
+    StandInServer,
+    make_vessels,
+)
+
+
+class FailingBackend(StandInBackend):
+    """Answers queries of the areas in `failing` with status code 404."""
+
+    def __init__(self, vessels, failing, **kwargs):
+        super().__init__(vessels, **kwargs)
+        self.failing = failing
+
+    def route(self, url):
+        if any(f"area_in={area}" in url for area in self.failing):
+            return 404, "{}"
+        return super().route(url)
+
+
+def make_client(backend=None, session=None, **kwargs):
+    """Return an `AIS` answered by `backend` through a `FakeSession`, or by `session`."""
+    ais = AIS(**kwargs)
+    ais.session = FakeSession(backend) if session is None else session
+    return ais
+
+
+class FakeClock:
+    """A clock that only advances when it is set or `sleep` is called.
+
+    Example:
+        >>> clock = FakeClock()
+        >>> bucket = TokenBucket(rate=10, burst=3, clock=clock, sleep=clock.sleep)
+    """
+
+    def __init__(self, now=0.0):
+        self.now = now
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class StandInProxy:
+    """A local HTTP proxy answering every request itself after `delay` seconds.
+
+    Example:
+        >>> with StandInProxy(delay=0.1) as proxy:
+        ...     requests.get("http://example.invalid/", proxies={"http": proxy.address})
+    """
+
+    def __init__(self, delay=0, status=200):
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                time.sleep(delay)
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+
+    @property
+    def address(self):
+        host, port = self.server.server_address
+        return f"{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,118 @@
+import asyncio
+import unittest
+
+import pandas as pd
+
+from aisexplorer.AsyncAIS import AsyncAIS, aiohttp
+from aisexplorer.Exceptions import NoResultsError, ResponseStatusError
+from tests.stand_in import StandInBackend, StandInServer, make_vessels
+
+
+@unittest.skipIf(aiohttp is None, "aiohttp is not installed")
+class TestAsyncAis(unittest.TestCase):
+    def run_with_server(self, backend, coroutine_function, **kwargs):
+        async def main(server):
+            async with AsyncAIS(base_url=server.url, **kwargs) as ais:
+                return await coroutine_function(ais)
+
+        with StandInServer(backend) as server:
+            return asyncio.run(main(server))
+
+    def test_get_area_data(self):
+        backend = StandInBackend(make_vessels(30, areas=("WMED", "EMED")))
+        data = self.run_with_server(backend, lambda ais: ais.get_area_data("EMED"))
+        self.assertEqual(len(data), 15)
+        self.assertTrue(all(row["AREA_CODE"] == "EMED" for row in data))
+
+    def test_get_location_return_df(self):
+        backend = StandInBackend(make_vessels(10))
+        df = self.run_with_server(
+            backend, lambda ais: ais.get_location(200000003), return_df=True
+        )
+        self.assertIsInstance(df, pd.DataFrame)
+        self.assertEqual(list(df["SHIP_ID"]), [100003])
+
+    def test_get_locations(self):
+        backend = StandInBackend(make_vessels(10))
+        df = self.run_with_server(
+            backend, lambda ais: ais.get_locations([200000001, 200000004, 1], chunk_size=2)
+        )
+        self.assertEqual(list(df.index), [200000001, 200000004, 1])
+        self.assertEqual(list(df["FOUND"]), [True, True, False])
+        self.assertEqual(len(backend.requests), 2)
+
+    def test_concurrency_is_bounded(self):
+        backend = StandInBackend(make_vessels(40), delay=0.05)
+
+        async def lookups(ais):
+            return await asyncio.gather(
+                *(ais.get_location(200000000 + i) for i in range(40))
+            )
+
+        results = self.run_with_server(backend, lookups, max_concurrency=8)
+        self.assertEqual(len(results), 40)
+        self.assertTrue(all(len(result) == 1 for result in results))
+        self.assertLessEqual(backend.max_in_flight, 8)
+        self.assertGreater(backend.max_in_flight, 1)
+
+    def test_paginate(self):
+        backend = StandInBackend(make_vessels(230), page_size=50)
+        data = self.run_with_server(
+            backend, lambda ais: ais.get_data(), paginate=True, return_total_count=True
+        )
+        self.assertEqual(len(data[0]), 230)
+        self.assertEqual(data[1], 230)
+
+    def test_fleets(self):
+        vessels = make_vessels(6)
+        for i, vessel in enumerate(vessels):
+            vessel["FLEET_ID"] = "1" if i % 2 else "2"
+        backend = StandInBackend(vessels, fleets=[["1", "Tankers"], ["2", "Bulkers"]])
+
+        async def fleet_lookup(ais):
+            await ais.login("user@example.com", "secret")
+            return await ais.get_vessels_by_fleet_name("Bulkers")
+
+        data = self.run_with_server(backend, fleet_lookup)
+        self.assertEqual({row["FLEET_ID"] for row in data}, {"2"})
+
+    def test_all_fleets_are_chunked(self):
+        fleets = [[str(i), f"Fleet {i}"] for i in range(10)]
+        vessels = make_vessels(100)
+        for i, vessel in enumerate(vessels):
+            vessel["FLEET_ID"] = str(i % 10)
+        backend = StandInBackend(vessels, page_size=15, fleets=fleets)
+
+        async def all_fleets(ais):
+            await ais.login("user@example.com", "secret")
+            return await ais.get_vessels_in_all_fleets(chunk_size=3)
+
+        data = self.run_with_server(backend, all_fleets)
+        self.assertEqual(len(data), 100)
+        self.assertEqual(sum("fleetList" in url for url in backend.requests), 1)
+
+    def test_fetch_page_error(self):
+        backend = StandInBackend(make_vessels(1))
+
+        async def missing_page(ais):
+            return await ais.fetch_page(f"{ais.base_url}/missing", ais.base_url)
+
+        backend.route = lambda url: (404, "{}")
+        with self.assertRaises(NoResultsError):
+            self.run_with_server(backend, missing_page)
+
+    def test_status_errors_are_raised(self):
+        backend = StandInBackend(make_vessels(1))
+        backend.route = lambda url: (404, "{}")
+        with self.assertRaises(ResponseStatusError):
+            self.run_with_server(backend, lambda ais: ais.get_area_data("EMED"))
+        self.assertEqual(len(backend.requests), 1)
+
+    def test_iter_data_chunks(self):
+        backend = StandInBackend(make_vessels(230), page_size=50)
+
+        async def collect(ais):
+            return [chunk async for chunk in ais.iter_data(chunks=True)]
+
+        chunks = self.run_with_server(backend, collect, max_workers=3)
+        self.assertEqual([len(chunk) for chunk in chunks], [50, 50, 50, 50, 30])
@@ -0,0 +1,48 @@
+import json
+import os
+import tempfile
+import unittest
+
+from benchmarks.run import compare_reports, main, make_rows, run_benchmarks
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_report(self):
+        report = run_benchmarks(rows=20, requests=5, workers=2, repeat=1)
+        results = report["results"]
+        self.assertEqual(
+            set(results),
+            {
+                "sync",
+                "parallel",
+                "cloudflare",
+                "json_decode",
+                "set_types_df",
+                "build_typed_df",
+                "build_typed_df_compact",
+                "spatial_index",
+            },
+        )
+        self.assertEqual(results["parallel"]["requests"], 5)
+        self.assertGreater(results["sync"]["requests_per_second"], 0)
+        self.assertGreater(results["set_types_df"]["peak_memory_bytes"], 0)
+        comparison = compare_reports(report, report)
+        self.assertTrue(all(ratio == 1 for ratio in comparison.values()))
+
+    def test_recorded_payload_and_output(self):
+        with tempfile.TemporaryDirectory() as directory:
+            payload = os.path.join(directory, "payload.json")
+            output = os.path.join(directory, "report.json")
+            with open(payload, "w", encoding="utf-8") as file:
+                json.dump({"data": make_rows(7), "totalCount": 7}, file)
+            args = ["--requests", "3", "--workers", "2", "--repeat", "1"]
+            main(args + ["--payload", payload, "--output", output])
+            main(args + ["--payload", payload, "--output", output, "--compare", output])
+            with open(output, encoding="utf-8") as file:
+                report = json.load(file)
+        self.assertEqual(report["config"]["rows"], 7)
+        self.assertIn("sync.requests_per_second", report["comparison"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import tempfile
+import time
+import unittest
+
+from aisexplorer.AIS import AIS
+from aisexplorer.Cache import DiskCache, MemoryCache, canonical_query, query_kind
+from tests.stand_in import StandInBackend, make_client, make_vessels
+
+
+class TestCanonicalQuery(unittest.TestCase):
+    def test_filter_order(self):
+        self.assertEqual(
+            canonical_query("https://host/en/reports?columns=a&mmsi|eq|mmsi=1&flag_in|in|DE,NL"),
+            canonical_query("https://host/en/reports?columns=a&flag_in|in|NL,DE&mmsi|eq|mmsi=1"),
+        )
+
+    def test_range_order_matters(self):
+        self.assertNotEqual(
+            canonical_query("https://host/en/reports?speed_between|range|speed_between=1,2"),
+            canonical_query("https://host/en/reports?speed_between|range|speed_between=2,1"),
+        )
+
+    def test_page_matters(self):
+        self.assertNotEqual(
+            canonical_query("https://host/en/reports?columns=a"),
+            canonical_query("https://host/en/reports?columns=a&page=2"),
+        )
+
+    def test_query_kind(self):
+        ais = AIS()
+        self.assertEqual(query_kind(ais.area_query("EMED").request_url), "area")
+        self.assertEqual(query_kind(ais.location_query(1).request_url), "location")
+        self.assertEqual(query_kind(ais.locations_query([1, 2]).request_url), "locations")
+        self.assertEqual(query_kind(ais.data_query().request_url), "data")
+
+
+class TestCaches(unittest.TestCase):
+    def test_memory_lru_eviction(self):
+        cache = MemoryCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(len(cache), 2)
+
+    def test_memory_ttl(self):
+        cache = MemoryCache(ttl=60)
+        cache.set("a", 1, ttl=0.01)
+        cache.set("b", 2)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), 2)
+
+    def test_disk_roundtrip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            DiskCache(directory).set("key", {"data": [1], "totalCount": 1})
+            self.assertEqual(DiskCache(directory).get("key"), {"data": [1], "totalCount": 1})
+            cache = DiskCache(directory)
+            cache.set("old", 1, ttl=0.01)
+            time.sleep(0.02)
+            self.assertIsNone(cache.get("old"))
+            cache.clear()
+            self.assertIsNone(cache.get("key"))
+
+
+class TestAisCache(unittest.TestCase):
+    def test_repeated_calls_hit_cache(self):
+        backend = StandInBackend(make_vessels(20, areas=("WMED", "EMED")))
+        ais = make_client(backend, cache=MemoryCache())
+        first = ais.get_area_data("EMED")
+        second = ais.get_area_data("EMED")
+        ais.get_location(200000001)
+        ais.get_location(200000001)
+        self.assertEqual(first, second)
+        self.assertEqual(len(backend.requests), 2)
+        self.assertEqual(ais.cache.hits, 2)
+
+    def test_without_cache(self):
+        backend = StandInBackend(make_vessels(5))
+        ais = make_client(backend)
+        ais.get_area_data("WMED")
+        ais.get_area_data("WMED")
+        self.assertEqual(len(backend.requests), 2)
+
+    def test_results_do_not_alias_the_cache(self):
+        backend = StandInBackend(make_vessels(5))
+        ais = make_client(backend, cache=MemoryCache())
+        first = ais.get_area_data("WMED")
+        first.append({"SHIP_ID": "0"})
+        first[0]["LAT"] = "0"
+        second = ais.get_area_data("WMED")
+        second.pop()
+        third = ais.get_area_data("WMED")
+        self.assertEqual(len(third), 5)
+        self.assertNotEqual(third[0]["LAT"], "0")
+        self.assertEqual(len(backend.requests), 1)
+
+    def test_ttl_per_query_kind(self):
+        backend = StandInBackend(make_vessels(5))
+        cache = MemoryCache(ttl=60)
+        ais = make_client(backend, cache=cache, cache_ttl={"location": 0.01})
+        ais.get_location(200000001)
+        ais.get_area_data("WMED")
+        time.sleep(0.02)
+        ais.get_location(200000001)
+        ais.get_area_data("WMED")
+        self.assertEqual(len(backend.requests), 3)
@@ -0,0 +1,119 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from aisexplorer.AIS import AIS
+from aisexplorer.Cassette import Cassette
+from aisexplorer.Exceptions import CassetteMissError, CloudflareError
+from aisexplorer.Retry import RetryPolicy
+from tests.stand_in import StandInBackend, StandInServer, make_vessels
+
+
+class TestCassette(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "day", "polls.cassette")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def replay(self, **kwargs):
+        return AIS(
+            base_url="http://replay.invalid",
+            cassette=Cassette(self.path, **kwargs),
+            retry_policy=RetryPolicy(max_attempts=1),
+        )
+
+    def test_record_and_replay(self):
+        backend = StandInBackend(make_vessels(120, areas=("EMED",)), page_size=50)
+        with StandInServer(backend) as server, Cassette(self.path, mode="record") as cassette:
+            ais = AIS(base_url=server.url, cassette=cassette, paginate=True, max_workers=2)
+            recorded_area = ais.get_area_data("EMED")
+            recorded_location = ais.get_location(200000003)
+        self.assertEqual(len(backend.requests), 4)
+
+        ais = AIS(
+            base_url="http://replay.invalid",
+            cassette=Cassette(self.path),
+            paginate=True,
+            max_workers=2,
+        )
+        self.assertEqual(ais.get_area_data("EMED"), recorded_area)
+        self.assertEqual(ais.get_location(200000003), recorded_location)
+        self.assertEqual(len(recorded_area), 120)
+
+    def test_repeated_polls_replay_in_order(self):
+        backend = StandInBackend(make_vessels(3, areas=("EMED",)))
+        with StandInServer(backend) as server, Cassette(self.path, mode="record") as cassette:
+            ais = AIS(base_url=server.url, cassette=cassette)
+            first = ais.get_area_data("EMED")
+            backend.vessels = backend.vessels[:1]
+            second = ais.get_area_data("EMED")
+
+        ais = self.replay()
+        self.assertEqual(ais.get_area_data("EMED"), first)
+        self.assertEqual(ais.get_area_data("EMED"), second)
+        with self.assertRaises(CassetteMissError):
+            ais.get_area_data("EMED")
+
+        ais = self.replay(repeat_last=True)
+        ais.get_area_data("EMED")
+        self.assertEqual(ais.get_area_data("EMED"), second)
+        self.assertEqual(ais.get_area_data("EMED"), second)
+
+    def test_incomplete_last_exchange_is_skipped(self):
+        backend = StandInBackend(make_vessels(3, areas=("EMED",)))
+        with StandInServer(backend) as server, Cassette(self.path, mode="record") as cassette:
+            recorded = AIS(base_url=server.url, cassette=cassette).get_area_data("EMED")
+        with gzip.open(self.path, "at", encoding="utf-8") as file:
+            file.write('{"method":"GET","url":"http://x/en/rep')
+
+        with self.assertWarns(UserWarning):
+            ais = self.replay()
+        self.assertEqual(ais.get_area_data("EMED"), recorded)
+
+        # A compressed stream cut off in the middle
+        with open(self.path, "rb") as file:
+            content = file.read()
+        with open(self.path, "wb") as file:
+            file.write(content[:-10])
+        with self.assertWarns(UserWarning):
+            ais = self.replay()
+        self.assertEqual(ais.get_area_data("EMED"), recorded)
+
+    def test_filter_order_does_not_matter(self):
+        backend = StandInBackend(make_vessels(5))
+        with StandInServer(backend) as server, Cassette(self.path, mode="record") as cassette:
+            config = {"lat": [-90, 90], "lon": [-180, 180]}
+            AIS(base_url=server.url, cassette=cassette, filter_config=config).get_data(
+                use_Filters=True
+            )
+        config = {"lon": [-180, 180], "lat": [-90, 90]}
+        ais = AIS(
+            base_url="http://replay.invalid",
+            cassette=Cassette(self.path),
+            filter_config=config,
+        )
+        self.assertEqual(len(ais.get_data(use_Filters=True)), 5)
+
+    def test_cloudflare_is_replayed(self):
+        backend = StandInBackend(make_vessels(1), cloudflare=True)
+        with StandInServer(backend) as server, Cassette(self.path, mode="record") as cassette:
+            ais = AIS(
+                base_url=server.url,
+                cassette=cassette,
+                retry_policy=RetryPolicy(max_attempts=1),
+            )
+            with self.assertRaises(CloudflareError):
+                ais.get_area_data("WMED")
+        with self.assertRaises(CloudflareError):
+            self.replay().get_area_data("WMED")
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            Cassette(self.path, mode="live")
+
+
+if __name__ == "__main__":
+    unittest.main()
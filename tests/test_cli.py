@@ -0,0 +1,105 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from aisexplorer.Cli import (
+    EXIT_FAILURE,
+    EXIT_OK,
+    EXIT_PARTIAL_FAILURE,
+    EXIT_USAGE,
+    main,
+    pa,
+)
+from tests.stand_in import FailingBackend, StandInServer, make_vessels
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        vessels = make_vessels(90, areas=("EMED", "WMED", "ADRIA"))
+        self.backend = FailingBackend(vessels, failing=("ADRIA",), page_size=10)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_cli(self, *args):
+        stderr = io.StringIO()
+        with StandInServer(self.backend) as server, contextlib.redirect_stderr(stderr):
+            code = main(["--base-url", server.url, "--retries", "1", *args])
+        return code, stderr.getvalue()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def test_ndjson_of_every_page(self):
+        output = self.path("ships.ndjson")
+        code, progress = self.run_cli("EMED", "WMED", "--workers", "2", "-o", output)
+        self.assertEqual(code, EXIT_OK)
+        with open(output, encoding="utf-8") as file:
+            rows = [json.loads(line) for line in file]
+        self.assertEqual(len(rows), 60)
+        self.assertEqual({row["AREA_CODE"] for row in rows}, {"EMED", "WMED"})
+        self.assertIn("[2/2]", progress)
+        self.assertIn("Exported 60 rows of 2/2 areas", progress)
+
+    def test_partial_failure(self):
+        output = self.path("ships.csv")
+        code, progress = self.run_cli("EMED", "ADRIA", "-o", output)
+        self.assertEqual(code, EXIT_PARTIAL_FAILURE)
+        self.assertIn("ADRIA: failed after 0 rows", progress)
+        with open(output, encoding="utf-8") as file:
+            lines = file.read().splitlines()
+        self.assertEqual(len(lines), 31)
+        self.assertIn("SHIP_ID", lines[0])
+
+        code, _ = self.run_cli("ADRIA", "-o", output, "--quiet")
+        self.assertEqual(code, EXIT_FAILURE)
+
+    def test_area_groups_and_metrics(self):
+        output, metrics = self.path("ships.csv"), self.path("metrics.prom")
+        code, _ = self.run_cli("EMED,WMED", "-o", output, "--metrics", metrics)
+        self.assertEqual(code, EXIT_OK)
+        with open(output, encoding="utf-8") as file:
+            self.assertEqual(len(file.read().splitlines()), 61)
+        with open(metrics, encoding="utf-8") as file:
+            self.assertIn("aisexplorer_requests_total", file.read())
+
+    def test_filters(self):
+        output = self.path("ships.ndjson")
+        filters = json.dumps({"lat": [0, 90]})
+        code, _ = self.run_cli("EMED", "--filters", filters, "-o", output)
+        self.assertEqual(code, EXIT_OK)
+        with open(output, encoding="utf-8") as file:
+            rows = [json.loads(line) for line in file]
+        self.assertTrue(rows)
+        self.assertTrue(all(float(row["LAT"]) >= 0 for row in rows))
+
+    @unittest.skipIf(pa is None, "pyarrow is not installed")
+    def test_parquet(self):
+        import pandas as pd
+
+        output = self.path("ships.parquet")
+        code, _ = self.run_cli("EMED", "WMED", "-o", output)
+        self.assertEqual(code, EXIT_OK)
+        df = pd.read_parquet(output)
+        self.assertEqual(len(df), 60)
+        self.assertEqual(str(df["SPEED"].dtype), "float64")
+
+    def test_usage_errors(self):
+        with self.assertRaises(SystemExit) as context, contextlib.redirect_stderr(
+            io.StringIO()
+        ):
+            main(["EMED", "--format", "parquet"])
+        self.assertEqual(context.exception.code, EXIT_USAGE)
+        with self.assertRaises(SystemExit) as context, contextlib.redirect_stderr(
+            io.StringIO()
+        ):
+            main(["EMED", "--filters", '{"unknown": 1}'])
+        self.assertEqual(context.exception.code, EXIT_USAGE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+
+from aisexplorer.AIS import AIS
+from aisexplorer.Exceptions import CloudflareError
+from aisexplorer.Utils.Decoding import is_json_body, json_loads
+from tests.stand_in import CLOUDFLARE_PAGE, FakeSession, StandInBackend, make_vessels
+
+
+class TestDecoding(unittest.TestCase):
+    def test_is_json_body(self):
+        self.assertTrue(is_json_body(b'{"data": []}', "application/json; charset=utf-8"))
+        self.assertTrue(is_json_body(b'  {"data": []}'))
+        self.assertTrue(is_json_body(b'{"data": []}', "text/plain"))
+        self.assertFalse(is_json_body(CLOUDFLARE_PAGE.encode()))
+        self.assertFalse(is_json_body(b"{}", "text/html"))
+
+    def test_json_loads(self):
+        self.assertEqual(json_loads(b'{"totalCount": 3}'), {"totalCount": 3})
+        self.assertEqual(json_loads('{"totalCount": 3}'), {"totalCount": 3})
+
+
+class CountingAIS(AIS):
+    html_checks = 0
+
+    def check_content_cloudflare(self, content):
+        self.html_checks += 1
+        super().check_content_cloudflare(content)
+
+
+class TestResponseDecoding(unittest.TestCase):
+    def test_json_body_skips_html_inspection(self):
+        ais = CountingAIS(return_total_count=True)
+        ais.session = FakeSession(StandInBackend(make_vessels(3)))
+        data, total_count = ais.get_data()
+        self.assertEqual((len(data), total_count), (3, 3))
+        self.assertEqual(ais.html_checks, 0)
+
+    def test_cloudflare_page_is_detected(self):
+        ais = CountingAIS()
+        ais.session = FakeSession(StandInBackend([], cloudflare=True))
+        with self.assertRaises(CloudflareError):
+            ais.send_request(f"{ais.base_url}/en/reports", ais.base_url)
+        self.assertEqual(ais.html_checks, 1)
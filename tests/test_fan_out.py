@@ -0,0 +1,75 @@
+import unittest
+
+from aisexplorer.Exceptions import NotSupportedParameterError
+from aisexplorer.FanOut import AreaFanOut, last_position
+from aisexplorer.Retry import RetryPolicy
+from tests.stand_in import FailingBackend, make_client, make_vessels
+
+AREAS = ("WMED", "EMED", "ADRIA", "BSEA", "BALTIC")
+
+
+class TestAreaFanOut(unittest.TestCase):
+    def test_areas_are_queried_concurrently(self):
+        backend = FailingBackend(make_vessels(50, areas=AREAS), failing=(), delay=0.05)
+        fan_out = AreaFanOut(make_client(backend, retry_policy=RetryPolicy(max_attempts=1)))
+        rows = fan_out.fetch(AREAS)
+        self.assertEqual(len(rows), 50)
+        self.assertEqual(len(backend.requests), 5)
+        self.assertEqual(backend.max_in_flight, 5)
+        self.assertEqual([report.area for report in fan_out.reports], list(AREAS))
+        self.assertTrue(all(report.rows == 10 for report in fan_out.reports))
+        self.assertTrue(all(report.seconds >= 0.05 for report in fan_out.reports))
+
+    def test_groups_and_max_workers(self):
+        backend = FailingBackend(make_vessels(50, areas=AREAS), failing=(), delay=0.02)
+        fan_out = AreaFanOut(make_client(backend, retry_policy=RetryPolicy(max_attempts=1), return_df=True), max_workers=2)
+        df = fan_out.fetch([["WMED", "EMED"], "ADRIA", ["BSEA", "BALTIC"]])
+        self.assertEqual(len(df), 50)
+        self.assertEqual([report.rows for report in fan_out.reports], [20, 10, 20])
+        self.assertLessEqual(backend.max_in_flight, 2)
+
+    def test_pagination(self):
+        backend = FailingBackend(make_vessels(60, areas=AREAS[:2]), failing=(), page_size=7)
+        fan_out = AreaFanOut(make_client(backend, retry_policy=RetryPolicy(max_attempts=1)), paginate=True)
+        self.assertEqual(len(fan_out.fetch(AREAS[:2])), 60)
+        self.assertEqual([report.total_count for report in fan_out.reports], [30, 30])
+
+        fan_out = AreaFanOut(make_client(backend, retry_policy=RetryPolicy(max_attempts=1)))
+        self.assertEqual(len(fan_out.fetch(AREAS[:2])), 14)
+
+    def test_failures_are_reported_per_area(self):
+        backend = FailingBackend(make_vessels(50, areas=AREAS), failing=("ADRIA",))
+        fan_out = AreaFanOut(make_client(backend, retry_policy=RetryPolicy(max_attempts=1)))
+        rows = fan_out.fetch(AREAS)
+        self.assertEqual(len(rows), 40)
+        self.assertEqual([report.area for report in fan_out.failed], ["ADRIA"])
+        self.assertEqual(fan_out.failed[0].error.status_code, 404)
+        self.assertIsNone(fan_out.failed[0].total_count)
+
+    def test_invalid_area_sends_no_request(self):
+        backend = FailingBackend(make_vessels(10), failing=())
+        with self.assertRaises(NotSupportedParameterError):
+            AreaFanOut(make_client(backend, retry_policy=RetryPolicy(max_attempts=1))).fetch(["WMED", "NOWHERE"])
+        self.assertEqual(backend.requests, [])
+
+    def test_duplicates_keep_newest_position(self):
+        vessels = make_vessels(4, areas=("WMED", "EMED"))
+        for i, vessel in enumerate(vessels):
+            vessel["LAST_POS"] = str(1700000000 + i)
+        crossing = dict(vessels[0], AREA_CODE="EMED", LAT="1.5", LAST_POS="1700000100")
+        stale = dict(vessels[1], AREA_CODE="WMED", LAT="2.5", LAST_POS="1600000000")
+        backend = FailingBackend(vessels + [crossing, stale], failing=())
+        rows = AreaFanOut(make_client(backend, retry_policy=RetryPolicy(max_attempts=1))).fetch(["WMED", "EMED"])
+        by_ship = {row["SHIP_ID"]: row for row in rows}
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(by_ship[vessels[0]["SHIP_ID"]]["LAT"], "1.5")
+        self.assertEqual(by_ship[vessels[1]["SHIP_ID"]]["LAT"], vessels[1]["LAT"])
+
+    def test_last_position(self):
+        self.assertEqual(last_position({"LAST_POS": "17"}), 17)
+        self.assertEqual(last_position({"LAST_POS": "masked"}), -1)
+        self.assertEqual(last_position({}), -1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,14 @@
 import unittest
 
+from aisexplorer.Exceptions import NotSupportedKeyError
 from aisexplorer.Filters import Filters
+from aisexplorer.Utils.Utility import build_typed_df
+
+ROWS = [
+    {"SHIPNAME": "Alpha", "MMSI": "1", "SPEED": "120", "COURSE": "355", "CODE2": "MT", "SHIPTYPE": "7"},
+    {"SHIPNAME": "Beta", "MMSI": "2", "SPEED": "40", "COURSE": "90", "CODE2": "DE", "SHIPTYPE": "8"},
+    {"SHIPNAME": "alpine", "MMSI": "3", "SPEED": None, "COURSE": "5", "CODE2": None, "SHIPTYPE": "7"},
+]
 
 
 class TestFilters(unittest.TestCase):
@@ -21,3 +29,50 @@ class TestFilters(unittest.TestCase):
             Filters(lon=[20, 30]).to_query(ignore_filter="vessel_name"),
             "&lon_of_latest_position_between|range|lon_of_latest_position_between=20,30",
         )
+
+
+class TestFilterMasks(unittest.TestCase):
+    def setUp(self):
+        self.df = build_typed_df(ROWS)
+
+    def matches(self, **filter_config):
+        return list(Filters(**filter_config).to_mask(self.df))
+
+    def test_masks(self):
+        self.assertEqual(self.matches(speed=[10, 12]), [True, False, False])
+        self.assertEqual(self.matches(speed=[0, "NaN"]), [True, True, False])
+        self.assertEqual(self.matches(course=[350, 10]), [True, False, True])
+        self.assertEqual(self.matches(vessel_name="alp"), [True, False, True])
+        self.assertEqual(self.matches(mmsi=2), [False, True, False])
+        self.assertEqual(self.matches(mmsis=[1, 3]), [True, False, True])
+        self.assertEqual(self.matches(flag=["MT"], vessel_type=["7"]), [True, False, False])
+        self.assertEqual(
+            self.matches(flag={"values": ["MT"], "operator": "notin"}), [False, True, True]
+        )
+        self.assertEqual(self.matches(), [True, True, True])
+
+    def test_unevaluable_filters(self):
+        filters = Filters(latest_report=[60, "NaN"], nav_status=["0"])
+        self.assertFalse(filters.evaluable("latest_report", self.df.columns))
+        self.assertFalse(filters.evaluable("nav_status", self.df.columns))
+        self.assertFalse(Filters(dwt=[1, 2]).evaluable("dwt", self.df.columns))
+        with self.assertRaises(NotSupportedKeyError):
+            filters.to_mask(self.df)
+
+    def test_subsumption(self):
+        broad = Filters(speed=[0, 30], flag=["MT", "DE"], latest_report=[60, "NaN"])
+        narrow = Filters(speed=[5, 10], flag=["MT"], latest_report=[60, "NaN"], dwt=[1, 9])
+        self.assertTrue(broad.subsumes(narrow))
+        self.assertFalse(narrow.subsumes(broad))
+        self.assertEqual(broad.narrowing_keys(narrow), ["speed", "flag", "dwt"])
+        self.assertTrue(Filters().subsumes(narrow))
+        self.assertFalse(broad.subsumes(Filters(speed=[5, 10], flag=["MT"])))
+        self.assertFalse(Filters(speed=[0, 30]).subsumes(Filters(speed=[5, "NaN"])))
+        self.assertTrue(Filters(speed=[0, "NaN"]).subsumes(Filters(speed=[5, "NaN"])))
+        self.assertFalse(
+            Filters(latest_report=[60, "NaN"]).subsumes(Filters(latest_report=[30, "NaN"]))
+        )
+        self.assertTrue(Filters(vessel_name="AL").subsumes(Filters(vessel_name="alpha")))
+        self.assertTrue(
+            Filters(global_area=["EMED"]).subsumes(Filters(), ignore_filter="global_area")
+        )
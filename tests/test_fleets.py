@@ -0,0 +1,88 @@
+import unittest
+
+from aisexplorer.Exceptions import FleetNotFoundError, UserNotLoggedInError
+from aisexplorer.Fleets import FleetRegistry
+from tests.stand_in import FakeClock, StandInBackend, make_client, make_vessels
+
+
+def make_fleet_ais(fleet_count=30, vessels_per_fleet=4, page_size=500, **kwargs):
+    fleets = [[str(i), f"Fleet {i}"] for i in range(fleet_count)]
+    vessels = make_vessels(fleet_count * vessels_per_fleet)
+    for i, vessel in enumerate(vessels):
+        vessel["FLEET_ID"] = str(i % fleet_count)
+    backend = StandInBackend(vessels, page_size=page_size, fleets=fleets)
+    ais = make_client(backend, **kwargs)
+    ais.logged_in = True
+    return ais, backend
+
+
+def fleet_list_requests(backend):
+    return sum("/en/search/fleetList" in url for url in backend.requests)
+
+
+class TestFleetRegistry(unittest.TestCase):
+    def test_lookups_and_ttl(self):
+        clock = FakeClock()
+        registry = FleetRegistry(ttl=10, clock=clock)
+        self.assertIsNone(registry.fleets())
+        registry.update([["1", "Tankers"], ["2", "Bulkers"], ["3", "Tankers"]])
+        self.assertEqual(registry.by_id(2), ["2", "Bulkers"])
+        self.assertEqual(registry.by_name("Tankers"), ["1", "Tankers"])
+        self.assertIsNone(registry.by_name("Ferries"))
+        self.assertEqual(len(registry.fleets()), 3)
+        clock.now = 10
+        self.assertIsNone(registry.fleets())
+        registry.update([])
+        registry.invalidate()
+        self.assertIsNone(registry.fleets())
+
+
+class TestFleets(unittest.TestCase):
+    def test_fleet_list_is_cached(self):
+        ais, backend = make_fleet_ais()
+        for i in range(5):
+            rows = ais.get_vessels_by_fleet_name(f"Fleet {i}")
+            self.assertEqual({row["FLEET_ID"] for row in rows}, {str(i)})
+        rows = ais.get_vessels_by_fleet_id("7")
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(fleet_list_requests(backend), 1)
+
+        ais.get_fleets(refresh=True)
+        self.assertEqual(fleet_list_requests(backend), 2)
+
+    def test_unknown_fleet_refreshes_once(self):
+        ais, backend = make_fleet_ais(fleet_count=2)
+        ais.get_fleets()
+        backend.fleets = backend.fleets + [["9", "New Fleet"]]
+        self.assertEqual(ais.find_fleet(fleet_name="New Fleet"), ["9", "New Fleet"])
+        with self.assertRaises(FleetNotFoundError):
+            ais.get_vessels_by_fleet_id("404")
+        self.assertEqual(fleet_list_requests(backend), 3)
+
+    def test_all_fleets_are_chunked_and_complete(self):
+        ais, backend = make_fleet_ais(
+            fleet_count=30, vessels_per_fleet=10, page_size=50, max_workers=4
+        )
+        rows = ais.get_vessels_in_all_fleets(chunk_size=7)
+        self.assertEqual(len(rows), 300)
+        self.assertEqual(len({row["SHIP_ID"] for row in rows}), 300)
+        data_requests = [url for url in backend.requests if "fleet_in=" in url]
+        # 5 chunks of up to 7 fleets, each with 70 or 20 vessels in pages of 50
+        self.assertEqual(len(data_requests), 4 * 2 + 1)
+        self.assertGreater(backend.max_in_flight, 0)
+
+    def test_vessels_in_several_fleets_are_merged(self):
+        ais, backend = make_fleet_ais(fleet_count=2, return_df=True)
+        backend.vessels.append(dict(backend.vessels[0], FLEET_ID="1"))
+        df = ais.get_vessels_in_all_fleets(chunk_size=1)
+        self.assertEqual(len(df), 8)
+
+    def test_requires_login(self):
+        ais, _ = make_fleet_ais()
+        ais.logged_in = False
+        with self.assertRaises(UserNotLoggedInError):
+            ais.get_vessels_in_all_fleets()
+
+
+if __name__ == "__main__":
+    unittest.main()
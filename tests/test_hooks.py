@@ -0,0 +1,148 @@
+import unittest
+
+from aisexplorer.AIS import AIS
+from aisexplorer.Exceptions import CloudflareError
+from aisexplorer.Hooks import Hooks, MetricsCollector, query_label
+from aisexplorer.Retry import RetryPolicy
+from tests.stand_in import FakeSession, StandInBackend, make_client, make_vessels
+from tests.test_retry import FlakySession
+
+
+class RecordingHooks(Hooks):
+    def __init__(self):
+        self.events = []
+
+    def on_request_start(self, request_url):
+        self.events.append(("start",))
+
+    def on_request_end(self, request_url, status_code, seconds, bytes_received, error):
+        self.events.append(("end", status_code, bytes_received > 0, type(error).__name__))
+
+    def on_retry(self, attempt, wait, error):
+        self.events.append(("retry", attempt, wait))
+
+    def on_cloudflare(self, request_url):
+        self.events.append(("cloudflare",))
+
+    def on_decode(self, request_url, seconds, rows):
+        self.events.append(("decode", rows))
+
+
+class BrokenHooks(Hooks):
+    def on_request_start(self, request_url):
+        raise RuntimeError("broken hook")
+
+
+def hooked_client(session_factory, hooks, **options):
+    backend = StandInBackend(make_vessels(30, areas=("EMED",)), page_size=10)
+    return make_client(
+        session=session_factory(backend),
+        base_url="http://stand-in",
+        retry_policy=RetryPolicy(sleep=lambda wait: None, jitter=False),
+        hooks=hooks,
+        **options,
+    )
+
+
+class TestHooks(unittest.TestCase):
+    def test_events_of_a_retried_request(self):
+        hooks = RecordingHooks()
+        ais = hooked_client(lambda backend: FlakySession(backend, [503]), hooks)
+        next(ais.iter_pages(*ais.build_area_urls("EMED")))
+        self.assertEqual(
+            hooks.events,
+            [
+                ("start",),
+                ("end", 503, False, "NoneType"),
+                ("retry", 1, 1),
+                ("start",),
+                ("end", 200, True, "NoneType"),
+                ("decode", 10),
+            ],
+        )
+
+    def test_cloudflare_is_reported(self):
+        hooks = RecordingHooks()
+        ais = hooked_client(lambda backend: FlakySession(backend, [403]), hooks)
+        with self.assertRaises(CloudflareError):
+            ais.get_area_data("EMED")
+        self.assertEqual(
+            hooks.events,
+            [("start",), ("cloudflare",), ("end", 403, True, "CloudflareError")],
+        )
+
+    def test_broken_hooks_are_ignored(self):
+        hooks = RecordingHooks()
+        ais = hooked_client(FakeSession, [BrokenHooks(), hooks])
+        self.assertEqual(len(ais.get_area_data("EMED")), 10)
+        self.assertIn(("decode", 10), hooks.events)
+
+    def test_single_hooks_instance(self):
+        hooks = RecordingHooks()
+        self.assertEqual(AIS(hooks=hooks).hooks, [hooks])
+        self.assertEqual(AIS().hooks, [])
+
+
+class TestMetricsCollector(unittest.TestCase):
+    def test_query_label(self):
+        url = "https://x/en/reports?asset_type=vessels&columns=a,b&lon|x|1&page=3&lat|x|2"
+        self.assertEqual(query_label(url), "data lat lon")
+        self.assertEqual(query_label("https://x/en/reports?asset_type=vessels"), "data")
+
+        ais = AIS(filter_config={"lat": [0, 30]})
+        area_url = ais.build_area_urls(["EMED", "WMED"])[0]
+        self.assertEqual(query_label(area_url), "area=EMED,WMED lat_of_latest_position_between")
+        labels = {
+            query_label(url)
+            for mmsis in ([1], [2, 3], [4, 5, 6])
+            for url in (ais.build_location_urls(mmsis[0])[0], ais.build_locations_urls(mmsis)[0])
+        }
+        self.assertEqual(
+            labels,
+            {"location lat_of_latest_position_between", "locations lat_of_latest_position_between"},
+        )
+
+    def test_counters_and_histograms(self):
+        metrics = MetricsCollector()
+        ais = hooked_client(
+            lambda backend: FlakySession(backend, [503]),
+            [metrics],
+            max_workers=2,
+        )
+        urls = ais.build_area_urls("EMED")
+        self.assertEqual(sum(len(page) for page in ais.iter_pages(*urls)), 30)
+        label = query_label(urls[0])
+        self.assertEqual(metrics.value("requests_total", query=label), 4)
+        self.assertEqual(metrics.value("requests_total", status="503"), 1)
+        self.assertEqual(metrics.value("retries_total"), 1)
+        self.assertEqual(metrics.value("rows_total", query=label), 30)
+        self.assertGreater(metrics.value("bytes_received_total"), 0)
+        histogram = metrics.histograms[("request_duration_seconds", (("query", label),))]
+        self.assertEqual(histogram.count, 4)
+
+    def test_prometheus_text(self):
+        metrics = MetricsCollector(label=lambda url: url.partition("?")[2])
+        metrics.on_request_end('http://x/en/reports?name="a"', 200, 0.3, 10, None)
+        metrics.on_request_end('http://x/en/reports?name="a"', 200, 20, 10, None)
+        metrics.on_proxy_renewed({}, {})
+        text = metrics.to_prometheus()
+        self.assertIn("# TYPE aisexplorer_requests_total counter", text)
+        self.assertIn(
+            'aisexplorer_requests_total{query="name=\\"a\\"",status="200"} 2', text
+        )
+        self.assertIn("aisexplorer_proxy_renewals_total 1", text)
+        self.assertIn("# TYPE aisexplorer_request_duration_seconds histogram", text)
+        self.assertIn(
+            'aisexplorer_request_duration_seconds_bucket{query="name=\\"a\\"",le="0.5"} 1',
+            text,
+        )
+        self.assertIn(
+            'aisexplorer_request_duration_seconds_bucket{query="name=\\"a\\"",le="+Inf"} 2',
+            text,
+        )
+        self.assertIn('aisexplorer_request_duration_seconds_count{query="name=\\"a\\""} 2', text)
+        self.assertNotIn("decode_duration_seconds", text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+
+from aisexplorer.AIS import AIS
+from aisexplorer.Filters import Filters
+from tests.stand_in import StandInBackend, make_client, make_vessels
+
+
+class TestGetLocations(unittest.TestCase):
+    def setUp(self):
+        self.backend = StandInBackend(make_vessels(300))
+        self.ais = make_client(self.backend, max_workers=4)
+
+    def test_list_filter_query(self):
+        self.assertEqual(Filters(mmsis=[1, 2]).to_query(), "&mmsi|in|1,2")
+
+    def test_chunked_lookup(self):
+        mmsis = [200000000 + i for i in range(0, 250)]
+        df = self.ais.get_locations(mmsis, chunk_size=100)
+        self.assertEqual(len(self.backend.requests), 3)
+        self.assertEqual(list(df.index), mmsis)
+        self.assertTrue(df["FOUND"].all())
+        self.assertEqual(df.loc[200000007, "SHIPNAME"], "VESSEL 7")
+
+    def test_missing_mmsis_are_marked(self):
+        df = self.ais.get_locations(["200000001", 999, 200000001, 200000002])
+        self.assertEqual(list(df.index), [200000001, 999, 200000002])
+        self.assertEqual(list(df["FOUND"]), [True, False, True])
+        self.assertEqual(len(self.backend.requests), 1)
+
+    def test_nothing_found(self):
+        df = self.ais.get_locations([1, 2])
+        self.assertEqual(list(df["FOUND"]), [False, False])
+
+    def test_requires_mmsi_column(self):
+        ais = AIS(columns_excluded="mmsi")
+        with self.assertRaises(ValueError):
+            ais.get_locations([1])
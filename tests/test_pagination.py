@@ -0,0 +1,98 @@
+import json
+import unittest
+import urllib.parse
+
+import pandas as pd
+
+from aisexplorer.AIS import AIS
+from aisexplorer.Retry import RetryPolicy
+from tests.stand_in import make_client
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self.status_code = status_code
+        self.text = json.dumps(payload)
+        self.content = self.text.encode()
+        self.headers = {"Content-Type": "application/json"}
+
+
+class PagedSession:
+    """Serves `total` synthetic rows in pages of `page_size` rows."""
+
+    def __init__(self, total, page_size):
+        self.total = total
+        self.page_size = page_size
+        self.proxies = {}
+        self.headers = {}
+        self.requested_pages = []
+
+    def get(self, url, headers=None, **kwargs):
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(url).query)
+        page = int(query.get("page", ["1"])[0])
+        self.requested_pages.append(page)
+        start = (page - 1) * self.page_size
+        stop = min(start + self.page_size, self.total)
+        rows = [{"SHIP_ID": str(i)} for i in range(start, stop)]
+        return FakeResponse({"data": rows, "totalCount": self.total})
+
+
+class FailingPageSession(PagedSession):
+    """Answers the first request of `failing_page` with status code 503."""
+
+    def __init__(self, total, page_size, failing_page):
+        super().__init__(total, page_size)
+        self.failing_page = failing_page
+        self.failed = False
+
+    def get(self, url, headers=None, **kwargs):
+        response = super().get(url, headers=headers, **kwargs)
+        if not self.failed and self.requested_pages[-1] == self.failing_page:
+            self.failed = True
+            return FakeResponse({}, status_code=503)
+        return response
+
+
+class TestPagination(unittest.TestCase):
+    def test_first_page_only_by_default(self):
+        ais = make_client(session=PagedSession(1200, 500))
+        self.assertEqual(len(ais.get_area_data("EMED")), 500)
+        self.assertEqual(ais.session.requested_pages, [1])
+
+    def test_paginate_merges_all_pages(self):
+        ais = make_client(session=PagedSession(1200, 500), paginate=True)
+        data = ais.get_area_data("EMED")
+        self.assertEqual([row["SHIP_ID"] for row in data], [str(i) for i in range(1200)])
+        self.assertEqual(ais.session.requested_pages, [1, 2, 3])
+
+    def test_paginate_concurrently(self):
+        ais = make_client(session=PagedSession(2100, 500), paginate=True, max_workers=4, return_df=True)
+        df = ais.get_data()
+        self.assertIsInstance(df, pd.DataFrame)
+        self.assertEqual(len(df), 2100)
+        self.assertEqual(list(df["SHIP_ID"]), list(range(2100)))
+
+    def test_paginate_with_total_count(self):
+        ais = make_client(session=PagedSession(700, 500), paginate=True, return_total_count=True)
+        data, total_count = ais.get_area_data(["EMED", "UKC"])
+        self.assertEqual(total_count, 700)
+        self.assertEqual(len(data), 700)
+
+    def test_single_page_result(self):
+        ais = make_client(session=PagedSession(20, 500), paginate=True)
+        self.assertEqual(len(ais.get_area_data("UKC")), 20)
+        self.assertEqual(ais.session.requested_pages, [1])
+
+    def test_failed_page_is_retried_on_its_own(self):
+        ais = make_client(
+            session=FailingPageSession(1200, 500, failing_page=3),
+            paginate=True,
+            max_workers=1,
+            retry_policy=RetryPolicy(sleep=lambda wait: None),
+        )
+        self.assertEqual(len(ais.get_area_data("EMED")), 1200)
+        self.assertEqual(ais.session.requested_pages, [1, 2, 3, 3])
+
+    def test_invalid_max_workers(self):
+        with self.assertRaises(ValueError):
+            AIS(max_workers=0)
@@ -0,0 +1,176 @@
+import socket
+import time
+import unittest
+from contextlib import ExitStack
+from unittest import mock
+
+import pandas as pd
+import requests
+
+from aisexplorer.AIS import AIS
+from aisexplorer.Exceptions import ProxyListError
+from aisexplorer.Proxy import FreeProxy, ProxyPool, proxy_key
+from tests.stand_in import StandInBackend, StandInProxy, make_client, make_vessels
+
+
+def closed_address():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        host, port = sock.getsockname()
+    return f"{host}:{port}"
+
+
+def make_freeproxy(addresses, **kwargs):
+    freeproxy = FreeProxy(
+        https=False, rand=False, check_url="http://proxy-check.invalid/", **kwargs
+    )
+    rows = [address.split(":") for address in addresses]
+    freeproxy.proxies = pd.DataFrame(rows, columns=["ip_address", "port"]).set_index(
+        "ip_address"
+    )
+    freeproxy.fetched_at = time.time()
+    return freeproxy
+
+
+class TestProxyPool(unittest.TestCase):
+    def setUp(self):
+        self.stack = ExitStack()
+        self.fast = self.stack.enter_context(StandInProxy())
+        self.slow = self.stack.enter_context(StandInProxy(delay=0.2))
+        self.broken = self.stack.enter_context(StandInProxy(status=503))
+        self.dead = closed_address()
+
+    def tearDown(self):
+        self.stack.close()
+
+    def test_find_working_proxy_skips_dead_proxies(self):
+        freeproxy = make_freeproxy([self.dead, self.broken.address, self.slow.address])
+        self.assertEqual(freeproxy.find_working_proxy(), {"http": self.slow.address})
+
+    def test_find_working_proxy_does_not_wait_for_slow_checks(self):
+        with ExitStack() as stack:
+            slow = [stack.enter_context(StandInProxy(delay=1)) for _ in range(5)]
+            addresses = [proxy.address for proxy in slow] + [self.fast.address]
+            freeproxy = make_freeproxy(addresses, timeout=2)
+            start = time.monotonic()
+            proxy = freeproxy.find_working_proxy()
+            elapsed = time.monotonic() - start
+        self.assertEqual(proxy, {"http": self.fast.address})
+        self.assertLess(elapsed, 0.8)
+
+    def test_checks_run_concurrently(self):
+        with ExitStack() as stack:
+            slow = [stack.enter_context(StandInProxy(delay=0.3)) for _ in range(10)]
+            pool = ProxyPool(make_freeproxy([proxy.address for proxy in slow], timeout=2))
+            start = time.monotonic()
+            live = pool.refresh()
+            elapsed = time.monotonic() - start
+        self.assertEqual(len(live), 10)
+        self.assertLess(elapsed, 1.5)
+
+    def test_best_prefers_fast_proxies(self):
+        addresses = [self.dead, self.slow.address, self.broken.address, self.fast.address]
+        pool = ProxyPool(make_freeproxy(addresses))
+        live = pool.refresh()
+        self.assertEqual(live, [{"http": self.fast.address}, {"http": self.slow.address}])
+        self.assertEqual(pool.best(), {"http": self.fast.address})
+        self.assertEqual(
+            pool.best(exclude={"http": self.fast.address}), {"http": self.slow.address}
+        )
+        self.assertFalse(pool.is_alive({"http": self.dead}))
+
+    def test_failures_lower_the_score(self):
+        pool = ProxyPool(make_freeproxy([self.fast.address]))
+        pool.refresh()
+        proxy = {"http": self.fast.address}
+        pool.report_failure(proxy)
+        self.assertIsNone(pool.best())
+        pool.refresh()
+        stats = pool.stats_of(proxy)
+        self.assertEqual((stats.successes, stats.failures), (2, 1))
+        self.assertEqual(pool.best(), proxy)
+
+    def test_background_recheck(self):
+        pool = ProxyPool(make_freeproxy([self.fast.address]), recheck_interval=0.05)
+        pool.start()
+        try:
+            deadline = time.monotonic() + 5
+            while pool.best() is None and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            pool.stop()
+        self.assertEqual(pool.best(), {"http": self.fast.address})
+
+    def test_dead_proxies_leaving_the_list_are_dropped(self):
+        freeproxy = make_freeproxy([self.dead, self.fast.address])
+        pool = ProxyPool(freeproxy)
+        pool.refresh()
+        self.assertEqual(len(pool.stats), 2)
+
+        freeproxy.proxies = make_freeproxy([self.slow.address]).proxies
+        live = pool.refresh()
+        self.assertEqual(live, [{"http": self.fast.address}, {"http": self.slow.address}])
+        self.assertNotIn(proxy_key({"http": self.dead}), pool.stats)
+        self.assertEqual(len(pool.stats), 2)
+
+    def test_failed_list_fetch_raises(self):
+        freeproxy = FreeProxy()
+        error = requests.exceptions.ConnectionError("offline")
+        with mock.patch("requests.get", side_effect=error):
+            with self.assertRaises(ProxyListError):
+                freeproxy.fetch_proxy_list()
+
+            # The background refresh survives the failure
+            pool = ProxyPool(freeproxy, recheck_interval=0.01)
+            pool.start()
+            time.sleep(0.05)
+            self.assertTrue(pool.thread.is_alive())
+            pool.stop()
+
+    def test_renew_proxy_uses_the_pool(self):
+        pool = ProxyPool(make_freeproxy([self.slow.address, self.fast.address]))
+        pool.refresh()
+        ais = AIS()
+        ais.proxy = True
+        ais.freeproxy = pool.freeproxy
+        ais.proxy_pool = pool
+        ais.session.proxies = {"http": self.fast.address}
+        ais.check_proxy()
+        self.assertEqual(ais.session.proxies, {"http": self.fast.address})
+        pool.report_failure({"http": self.fast.address})
+        ais.check_proxy()
+        self.assertEqual(ais.session.proxies, {"http": self.slow.address})
+
+    def test_fallback_proxy_is_recorded_and_searched_rarely(self):
+        pool = ProxyPool(make_freeproxy([self.dead]))
+        pool.refresh()
+        found = [{"http": self.fast.address}, None]
+        searches = []
+
+        def search():
+            searches.append(1)
+            return found.pop(0)
+
+        ais = make_client(StandInBackend(make_vessels(3)))
+        ais.proxy = True
+        ais.freeproxy = pool.freeproxy
+        ais.freeproxy.get = search
+        ais.proxy_pool = pool
+        ais.session.proxies = {"http": self.dead}
+        ais.get_area_data("WMED")
+        ais.get_area_data("WMED")
+        self.assertEqual(ais.session.proxies, {"http": self.fast.address})
+        self.assertEqual(pool.stats_of({"http": self.fast.address}).successes, 3)
+        self.assertEqual(len(searches), 1)
+
+        # Nothing better is found: the old proxy is kept
+        pool.report_failure({"http": self.fast.address})
+        ais.proxy_searched_at = None
+        ais.check_proxy()
+        ais.check_proxy()
+        self.assertEqual(ais.session.proxies, {"http": self.fast.address})
+        self.assertEqual(len(searches), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import pickle
+import unittest
+
+from aisexplorer.AIS import AIS
+from aisexplorer.Filters import Filters, FleetFilter
+from aisexplorer.Query import CompiledQuery, page_url
+
+
+class TestCompiledQuery(unittest.TestCase):
+    def test_urls_match_builders(self):
+        ais = AIS(filter_config={"flag": ["MT"], "speed": [1, 20]})
+        self.assertEqual(ais.area_query("EMED").urls, ais.build_area_urls("EMED"))
+        self.assertEqual(
+            ais.area_query("EMED").request_url,
+            f"{ais.base_url}/en/reports?asset_type=vessels&columns={ais.columns_url}"
+            "&area_in|in|EMED|area_in=EMED"
+            "&flag_in|in|MT&speed_between|range|speed_between=1,20",
+        )
+        self.assertIn("&mmsi|eq|mmsi=1&flag_in", ais.location_query(1).request_url)
+        self.assertEqual(
+            page_url(ais.area_query("EMED").request_url, 3),
+            ais.area_query("EMED").request_url + "&page=3",
+        )
+
+    def test_fleets_render_request_and_referer(self):
+        fleets = FleetFilter([["7", "My Fleet"]])
+        query = CompiledQuery.build("https://host", "shipname", fleets_filter=fleets)
+        self.assertEqual(
+            query.request_url,
+            "https://host/en/reports?asset_type=vessels&columns=shipname,notes&fleet_in=7",
+        )
+        self.assertEqual(
+            query.referer_url,
+            "https://host/en/data/?asset_type=vessels&columns=shipname,notes"
+            "&fleet_in|in|My+Fleet|fleet_in=7",
+        )
+
+    def test_equal_regardless_of_filter_order(self):
+        def build(**filter_config):
+            return CompiledQuery.build("https://host", "a", filters=Filters(**filter_config))
+
+        first = build(flag=["DE", "NL"], speed=[1, 2])
+        second = build(speed=[1, 2], flag=["NL", "DE"])
+        other = build(flag=["DE"])
+        self.assertEqual(first, second)
+        self.assertEqual(hash(first), hash(second))
+        self.assertEqual(first.digest, second.digest)
+        self.assertNotEqual(first, other)
+        self.assertEqual(len({first, second, other}), 2)
+
+    def test_immutable_and_picklable(self):
+        query = CompiledQuery.build("https://host", "a", filters=Filters(flag=["MT"]))
+        with self.assertRaises(AttributeError):
+            query.request_url = "https://other"
+        restored = pickle.loads(pickle.dumps(query))
+        self.assertEqual(restored, query)
+        self.assertEqual(restored.referer_url, query.referer_url)
+
+    def test_filter_queries_are_reused(self):
+        filters = Filters(flag=["MT"], mmsi=1)
+        self.assertIs(
+            filters.to_query(ignore_filter="mmsi"), filters.to_query(ignore_filter=["mmsi"])
+        )
+        self.assertEqual(filters.to_query(ignore_filter="mmsi"), "&flag_in|in|MT")
+        self.assertEqual(filters.to_query(), "&flag_in|in|MT&mmsi|eq|mmsi=1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from aisexplorer.RateLimit import FileTokenBucket, TokenBucket
+from tests.stand_in import FakeClock, StandInBackend, make_client, make_vessels
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_then_rate(self):
+        clock = FakeClock(1000.0)
+        bucket = TokenBucket(rate=10, burst=3, clock=clock, sleep=clock.sleep)
+        self.assertEqual([bucket.reserve() for _ in range(3)], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(bucket.reserve(), 0.1)
+        self.assertAlmostEqual(bucket.reserve(), 0.2)
+
+    def test_refill_is_capped_at_burst(self):
+        clock = FakeClock(1000.0)
+        bucket = TokenBucket(rate=10, burst=2, clock=clock, sleep=clock.sleep)
+        clock.now += 60
+        self.assertEqual([bucket.reserve() for _ in range(2)], [0.0, 0.0])
+        self.assertAlmostEqual(bucket.reserve(), 0.1)
+
+    def test_threads_share_the_budget(self):
+        clock = FakeClock(1000.0)
+        bucket = TokenBucket(rate=100, burst=1, clock=clock, sleep=clock.sleep)
+        waits = []
+
+        def worker():
+            for _ in range(25):
+                waits.append(bucket.reserve())
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertAlmostEqual(max(waits), 0.99)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0)
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=1, burst=0)
+
+
+class TestFileTokenBucket(unittest.TestCase):
+    def test_buckets_share_state_through_file(self):
+        clock = FakeClock(1000.0)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bucket")
+            first = FileTokenBucket(path, rate=10, burst=2, clock=clock)
+            second = FileTokenBucket(path, rate=10, burst=2, clock=clock)
+            self.assertEqual(first.reserve(), 0.0)
+            self.assertEqual(second.reserve(), 0.0)
+            self.assertAlmostEqual(first.reserve(), 0.1)
+            self.assertAlmostEqual(second.reserve(), 0.2)
+
+
+class TestAisRateLimit(unittest.TestCase):
+    def test_every_request_is_paced(self):
+        clock = FakeClock(1000.0)
+        ais = make_client(StandInBackend(make_vessels(30), page_size=10), rate_limiter=TokenBucket(rate=2, burst=1, clock=clock, sleep=clock.sleep))
+        self.assertEqual(len(list(ais.iter_data())), 30)
+        self.assertEqual(len(clock.slept), 2)
+        self.assertAlmostEqual(clock.now, 1001.0)
@@ -0,0 +1,157 @@
+import json
+import time
+import urllib.parse
+import unittest
+
+from aisexplorer.Cache import MemoryCache
+from aisexplorer.FanOut import AreaFanOut
+from aisexplorer.Reference import join_reference, split_columns
+from tests.stand_in import StandInBackend, make_client, make_vessels
+
+COLUMNS = ["shipname", "flag", "dwt", "mmsi", "lat_of_latest_position", "speed"]
+
+
+class ColumnBackend(StandInBackend):
+    """Answers with the fields of the requested columns only, like the real server."""
+
+    column_of_field = {
+        "SHIPNAME": "shipname",
+        "CODE2": "flag",
+        "DWT": "dwt",
+        "LAT": "lat_of_latest_position",
+        "LON": "lon_of_latest_position",
+        "SPEED": "speed",
+    }
+
+    def route(self, url):
+        status, body = super().route(url)
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(url).query)
+        if "columns" not in query:
+            return status, body
+        columns = set(query["columns"][0].split(","))
+        payload = json.loads(body)
+        payload["data"] = [
+            {
+                field: value
+                for field, value in row.items()
+                if self.column_of_field.get(field, "mmsi") in columns
+                or field not in self.column_of_field
+            }
+            for row in payload["data"]
+        ]
+        return status, json.dumps(payload)
+
+
+def make_backend(count=30):
+    vessels = make_vessels(count, areas=("EMED",))
+    for i, vessel in enumerate(vessels):
+        vessel["CODE2"] = "MT"
+        vessel["DWT"] = str(1000 + i)
+    return ColumnBackend(vessels)
+
+
+def requested_columns(url):
+    return urllib.parse.parse_qs(urllib.parse.urlsplit(url).query)["columns"][0]
+
+
+class TestReference(unittest.TestCase):
+    def test_split_columns(self):
+        static, dynamic = split_columns(["shipname", "speed", "imo", "course"])
+        self.assertEqual(static, ["shipname", "imo"])
+        self.assertEqual(dynamic, ["speed", "course", "mmsi"])
+        self.assertEqual(join_reference({"A": 1}, {"A": 2, "B": 3}), {"A": 1, "B": 3})
+        self.assertEqual(join_reference({"A": 1}, {}), {"A": 1})
+
+    def test_polls_request_dynamic_columns_only(self):
+        backend = make_backend()
+        ais = make_client(backend, columns=COLUMNS, reference_cache=MemoryCache(max_entries=10000))
+        first = ais.get_area_data("EMED")
+        self.assertEqual(
+            requested_columns(backend.requests[0]), "mmsi,lat_of_latest_position,speed"
+        )
+        self.assertEqual(requested_columns(backend.requests[1]), "shipname,flag,dwt,mmsi")
+        self.assertEqual(len(backend.requests), 2)
+        self.assertEqual(first[3]["SHIPNAME"], "VESSEL 3")
+        self.assertEqual(first[3]["DWT"], "1003")
+        self.assertIn("LAT", first[3])
+
+        backend.vessels[3]["LAT"] = "12.5"
+        second = ais.get_area_data("EMED")
+        self.assertEqual(len(backend.requests), 3)
+        self.assertEqual(second[3]["LAT"], "12.5")
+        self.assertEqual(second[3]["SHIPNAME"], "VESSEL 3")
+
+    def test_key_column_is_removed_unless_requested(self):
+        backend = make_backend(count=5)
+        ais = make_client(backend, columns=["shipname", "speed"], reference_cache=MemoryCache())
+        rows = ais.get_area_data("EMED")
+        self.assertEqual(requested_columns(backend.requests[0]), "speed,mmsi")
+        self.assertEqual(rows[0]["SHIPNAME"], "VESSEL 0")
+        self.assertTrue(all("MMSI" not in row for row in rows))
+
+        rows = ais.get_area_data("EMED")
+        self.assertEqual(len(backend.requests), 3)
+        self.assertTrue(all("MMSI" not in row for row in rows))
+
+    def test_new_and_unknown_vessels(self):
+        backend = make_backend(count=10)
+        ais = make_client(backend, columns=COLUMNS, reference_cache=MemoryCache(), return_df=True)
+        ais.get_area_data("EMED")
+        backend.vessels.append(dict(backend.vessels[0], SHIP_ID="999", MMSI="299999999"))
+        backend.vessels.append(dict(backend.vessels[0], SHIP_ID="998", MMSI=None))
+        df = ais.get_area_data("EMED")
+        self.assertEqual(len(backend.requests), 4)
+        self.assertEqual(requested_columns(backend.requests[3]), "shipname,flag,dwt,mmsi")
+        self.assertIn("mmsi|in|299999999", urllib.parse.unquote(backend.requests[3]))
+        self.assertEqual(df.set_index("SHIP_ID").loc[999, "SHIPNAME"], "VESSEL 0")
+        self.assertTrue(df.set_index("SHIP_ID")["SHIPNAME"].isna().loc[998])
+
+        # The vessel without MMSI is cached as unknown instead of being looked up again
+        ais.get_area_data("EMED")
+        self.assertEqual(len(backend.requests), 5)
+
+    def test_streaming_and_fan_out_are_joined(self):
+        backend = make_backend(count=5)
+        ais = make_client(backend, columns=COLUMNS, reference_cache=MemoryCache())
+        rows = list(ais.iter_area_data("EMED"))
+        self.assertTrue(all("SHIPNAME" in row for row in rows))
+        rows = AreaFanOut(ais).fetch(["EMED"])
+        self.assertTrue(all(row["CODE2"] == "MT" for row in rows))
+        self.assertEqual(len(backend.requests), 3)
+
+    def test_full_column_queries_are_not_joined(self):
+        backend = make_backend()
+        ais = make_client(backend, columns=COLUMNS, reference_cache=MemoryCache())
+        row = ais.get_location(200000003)[0]
+        self.assertEqual(row["SHIPNAME"], "VESSEL 3")
+        self.assertEqual(len(backend.requests), 1)
+        self.assertEqual(requested_columns(backend.requests[0]), ",".join(COLUMNS))
+
+    def test_misses_expire_early(self):
+        backend = make_backend(count=3)
+        ais = make_client(backend, columns=COLUMNS, reference_cache=MemoryCache(), reference_miss_ttl=0.01)
+        backend.vessels[0]["MMSI"] = None
+        ais.get_area_data("EMED")
+        self.assertEqual(ais.reference_cache.get("reference/100000"), {})
+        time.sleep(0.02)
+        self.assertIsNone(ais.reference_cache.get("reference/100000"))
+        self.assertIsNotNone(ais.reference_cache.get("reference/100001"))
+
+    def test_without_reference_cache(self):
+        backend = make_backend()
+        ais = make_client(backend, columns=COLUMNS)
+        rows = ais.get_area_data("EMED")
+        self.assertEqual(requested_columns(backend.requests[0]), ",".join(COLUMNS))
+        self.assertEqual(rows[0]["SHIPNAME"], "VESSEL 0")
+
+        backend = make_backend()
+        ais = make_client(backend, columns=COLUMNS, reference_cache=MemoryCache())
+        ais.columns = ["speed", "mmsi"]
+        ais.set_column_url()
+        ais.get_area_data("EMED")
+        self.assertEqual(requested_columns(backend.requests[0]), "speed,mmsi")
+        self.assertEqual(len(backend.requests), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import unittest
+from unittest import mock
+
+from aisexplorer.Query import CompiledQuery
+from aisexplorer.Results import ResultCache
+from tests.stand_in import FakeClock, FakeSession, StandInBackend, make_client, make_vessels
+
+
+def make_backend(count=60, page_size=500):
+    vessels = make_vessels(count, areas=("EMED", "WMED"))
+    for i, vessel in enumerate(vessels):
+        vessel["SHIPTYPE"] = str(7 + i % 2)
+    return StandInBackend(vessels, page_size=page_size)
+
+
+class RacingSession(FakeSession):
+    """Clears the filters of its client while a request is in flight."""
+
+    def get(self, url, headers=None, **kwargs):
+        self.ais.set_filters({})
+        return super().get(url, headers=headers, **kwargs)
+
+
+def ship_ids(rows):
+    return sorted(row["SHIP_ID"] for row in rows)
+
+
+class TestResultCache(unittest.TestCase):
+    def test_narrower_area_queries_are_answered_locally(self):
+        backend = make_backend()
+        ais = make_client(backend, result_cache=ResultCache())
+        ais.get_area_data("EMED")
+        self.assertEqual(len(backend.requests), 1)
+
+        ais.set_filters({"lat": [0, 30], "vessel_type": ["7"]})
+        local = ais.get_area_data("EMED")
+        self.assertEqual(len(backend.requests), 1)
+        self.assertTrue(local)
+        self.assertTrue(all(row["SHIPTYPE"] == "7" for row in local))
+
+        # The server agrees on the filters it supports
+        ais.set_filters({"lat": [0, 30]})
+        remote = make_client(make_backend())
+        remote.set_filters({"lat": [0, 30]})
+        self.assertEqual(ship_ids(ais.get_area_data("EMED")), ship_ids(remote.get_area_data("EMED")))
+        self.assertEqual(len(backend.requests), 1)
+
+    def test_queries_not_subsumed_are_sent(self):
+        backend = make_backend()
+        ais = make_client(backend, result_cache=ResultCache(), return_df=True)
+        ais.set_filters({"lat": [0, 30]})
+        ais.get_area_data("EMED")
+        ais.set_filters({"lat": [-10, 30]})
+        ais.get_area_data("EMED")
+        ais.set_filters({"lat": [0, 30], "nav_status": ["0"]})
+        ais.get_area_data("EMED")
+        ais.get_area_data("WMED")
+        self.assertEqual(len(backend.requests), 4)
+
+        ais.set_filters({"lat": [5, 10], "speed": [1, 10]})
+        df = ais.get_area_data("EMED")
+        self.assertEqual(len(backend.requests), 4)
+        self.assertTrue(df["LAT"].between(5, 10).all())
+        self.assertTrue(df["SPEED"].between(10, 100).all())
+
+    def test_truncated_results_are_not_stored(self):
+        backend = make_backend(page_size=10)
+        ais = make_client(backend, result_cache=ResultCache())
+        ais.get_area_data("EMED")
+        ais.set_filters({"lat": [0, 30]})
+        ais.get_area_data("EMED")
+        self.assertEqual(len(backend.requests), 2)
+
+        backend = make_backend(page_size=10)
+        ais = make_client(backend, paginate=True, result_cache=ResultCache())
+        self.assertEqual(len(ais.get_area_data("EMED")), 30)
+        requests = len(backend.requests)
+        ais.set_filters({"lat": [0, 30]})
+        ais.get_area_data("EMED")
+        self.assertEqual(len(backend.requests), requests)
+
+    def test_get_data_and_expiry(self):
+        clock = FakeClock()
+        cache = ResultCache(ttl=10, clock=clock)
+        backend = make_backend()
+        ais = make_client(backend, result_cache=cache)
+        self.assertEqual(len(ais.get_data()), 60)
+        ais.set_filters({"speed": [0, 5]})
+        rows = ais.get_data(use_Filters=True)
+        self.assertTrue(all(int(row["SPEED"]) <= 50 for row in rows))
+        self.assertEqual(len(backend.requests), 1)
+
+        clock.now = 10
+        ais.get_data(use_Filters=True)
+        self.assertEqual(len(backend.requests), 2)
+        self.assertEqual(cache.hits, 1)
+
+    def test_no_extra_query_without_result_cache(self):
+        ais = make_client(make_backend())
+        with mock.patch.object(CompiledQuery, "build", wraps=CompiledQuery.build) as build:
+            ais.get_area_data("EMED")
+            ais.get_data()
+        self.assertEqual(build.call_count, 2)
+
+    def test_answers_do_not_alias_the_stored_result(self):
+        backend = make_backend()
+        ais = make_client(backend, result_cache=ResultCache())
+        ais.get_area_data("EMED").append({"SHIP_ID": "0"})
+        ais.get_area_data("EMED")[0]["LAT"] = "0"
+        rows = ais.get_area_data("EMED")
+        self.assertEqual(len(rows), 30)
+        self.assertNotEqual(rows[0]["LAT"], "0")
+        self.assertEqual(len(backend.requests), 1)
+
+    def test_result_is_stored_under_the_filters_it_was_fetched_with(self):
+        backend = make_backend()
+        session = RacingSession(backend)
+        ais = make_client(session=session, result_cache=ResultCache())
+        session.ais = ais
+        ais.set_filters({"lat": [0, 30]})
+        self.assertLess(len(ais.get_area_data("EMED")), 30)
+
+        # The filters were cleared during the request, the whole area is fetched
+        self.assertEqual(len(ais.get_area_data("EMED")), 30)
+        self.assertEqual(len(backend.requests), 2)
+
+    def test_eviction(self):
+        cache = ResultCache(max_entries=1)
+        backend = make_backend()
+        ais = make_client(backend, result_cache=cache)
+        ais.get_area_data("EMED")
+        ais.get_area_data("WMED")
+        self.assertEqual(len(cache), 1)
+        ais.get_area_data("EMED")
+        self.assertEqual(len(backend.requests), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import asyncio
+import unittest
+
+from aisexplorer.AIS import AIS
+from aisexplorer.Exceptions import (
+    CloudflareError,
+    NoResultsError,
+    ResponseStatusError,
+    RetryBudgetExhaustedError,
+)
+from aisexplorer.Retry import RetryBudget, RetryPolicy
+from tests.stand_in import (
+    CLOUDFLARE_PAGE,
+    FakeResponse,
+    FakeSession,
+    StandInBackend,
+    make_client,
+    make_vessels,
+)
+
+
+class FlakySession(FakeSession):
+    """Answers the first requests with the given status codes, then like the stand-in."""
+
+    def __init__(self, backend, statuses):
+        super().__init__(backend)
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    def get(self, url, headers=None, **kwargs):
+        self.calls += 1
+        if self.statuses:
+            status = self.statuses.pop(0)
+            return FakeResponse(status, CLOUDFLARE_PAGE if status == 403 else "")
+        return super().get(url, headers=headers, **kwargs)
+
+
+def flaky_client(statuses, **policy_options):
+    waits = []
+    backend = StandInBackend(make_vessels(10, areas=("EMED",)))
+    ais = make_client(
+        session=FlakySession(backend, statuses),
+        base_url="http://stand-in",
+        retry_policy=RetryPolicy(sleep=waits.append, **policy_options),
+    )
+    return ais, waits
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_policies_are_per_instance(self):
+        first = AIS(num_retries=3, seconds_wait=1)
+        second = AIS()
+        self.assertEqual(first.retry_policy.max_attempts, 3)
+        self.assertEqual(second.retry_policy.max_attempts, 10)
+        self.assertEqual(second.retry_policy.max_wait, 15)
+
+    def test_server_errors_are_retried(self):
+        ais, waits = flaky_client([503, 500], jitter=False)
+        pages = list(ais.iter_pages(*ais.build_area_urls("EMED")))
+        self.assertEqual(len(pages[0]), 10)
+        self.assertEqual(ais.session.calls, 3)
+        self.assertEqual(waits, [1, 2])
+
+    def test_server_errors_are_retried_by_get_methods(self):
+        ais, waits = flaky_client([503, 429], jitter=False)
+        self.assertEqual(len(ais.get_area_data("EMED")), 10)
+        self.assertEqual(ais.session.calls, 3)
+        self.assertEqual(waits, [1, 2])
+
+        ais, waits = flaky_client([404])
+        with self.assertRaises(ResponseStatusError) as context:
+            ais.get_location(200000000)
+        self.assertEqual(context.exception.status_code, 404)
+        self.assertEqual(ais.session.calls, 1)
+
+        ais, waits = flaky_client([503] * 3, max_attempts=3)
+        with self.assertRaises(NoResultsError):
+            ais.get_data()
+        self.assertEqual(ais.session.calls, 3)
+
+    def test_jittered_waits_are_capped(self):
+        ais, waits = flaky_client([503] * 5, max_wait=3)
+        list(ais.iter_pages(*ais.build_area_urls("EMED")))
+        self.assertEqual(len(waits), 5)
+        self.assertTrue(all(0 <= wait <= 3 for wait in waits))
+
+    def test_client_errors_are_fatal(self):
+        ais, waits = flaky_client([404])
+        with self.assertRaises(ResponseStatusError) as context:
+            list(ais.iter_pages(*ais.build_area_urls("EMED")))
+        self.assertEqual(context.exception.status_code, 404)
+        self.assertEqual(ais.session.calls, 1)
+        self.assertEqual(waits, [])
+
+    def test_cloudflare_is_fatal(self):
+        ais, waits = flaky_client([403])
+        with self.assertRaises(CloudflareError):
+            ais.get_area_data("EMED")
+        self.assertEqual(ais.session.calls, 1)
+
+    def test_gives_up_after_max_attempts(self):
+        ais, waits = flaky_client([503] * 5, max_attempts=3)
+        with self.assertRaises(NoResultsError) as context:
+            list(ais.iter_pages(*ais.build_area_urls("EMED")))
+        self.assertIsInstance(context.exception.__cause__, ResponseStatusError)
+        self.assertEqual(ais.session.calls, 3)
+
+    def test_budget_is_shared(self):
+        budget = RetryBudget(max_retries=2, per_seconds=3600)
+        ais, _ = flaky_client([503, 503], budget=budget)
+        list(ais.iter_pages(*ais.build_area_urls("EMED")))
+        other, _ = flaky_client([503], budget=budget)
+        with self.assertRaises(RetryBudgetExhaustedError):
+            list(other.iter_pages(*other.build_area_urls("EMED")))
+        self.assertEqual(other.session.calls, 1)
+
+    def test_async_retries_use_the_injected_sleep(self):
+        waits = []
+        statuses = [503, 500]
+
+        async def fetch():
+            if statuses:
+                raise ResponseStatusError(statuses.pop(0), "http://stand-in")
+            return "done"
+
+        policy = RetryPolicy(sleep=waits.append, jitter=False)
+        self.assertEqual(asyncio.run(policy.acall(fetch)), "done")
+        self.assertEqual(waits, [1, 2])
+
+    def test_programming_errors_are_fatal(self):
+        ais, waits = flaky_client([])
+        with self.assertRaises(AttributeError):
+            ais.get_data(fleets_filter=object())
+        self.assertEqual(waits, [])
+
+    def test_budget_refills(self):
+        now = [0.0]
+        budget = RetryBudget(max_retries=1, per_seconds=10, clock=lambda: now[0])
+        self.assertTrue(budget.try_spend())
+        self.assertFalse(budget.try_spend())
+        now[0] = 10.0
+        self.assertTrue(budget.try_spend())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import datetime
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from aisexplorer.Exceptions import SinkWriteError
+from aisexplorer.Sink import SnapshotSink, pa
+from tests.stand_in import StandInBackend, make_client, make_vessels
+
+FETCHED_AT = datetime.datetime(2024, 1, 1, 13, 45)
+
+
+@unittest.skipIf(pa is None, "pyarrow is not installed")
+class TestSnapshotSink(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_partitions(self):
+        sink = SnapshotSink(self.directory)
+        paths = sink.write(make_vessels(10, areas=("WMED", "EMED")), fetched_at=FETCHED_AT)
+        self.assertEqual(len(paths), 2)
+        self.assertTrue(
+            os.path.isdir(os.path.join(self.directory, "area_code=EMED", "fetch_hour=2024-01-01T13"))
+        )
+
+    def test_append_only_and_schema(self):
+        sink = SnapshotSink(self.directory)
+        sink.write(make_vessels(5, areas=("UKC",)), fetched_at=FETCHED_AT)
+        sink.write(make_vessels(5, areas=("UKC",), seed=1), fetched_at=FETCHED_AT)
+        self.assertEqual(len(sink.files_written), 2)
+        df = pd.read_parquet(os.path.join(self.directory, "area_code=UKC"))
+        self.assertEqual(len(df), 10)
+        self.assertEqual(df["LAT"].dtype, "float64")
+        self.assertTrue(pd.api.types.is_integer_dtype(df["MMSI"]))
+
+    def test_arrow_format_and_explicit_area(self):
+        sink = SnapshotSink(self.directory, file_format="arrow")
+        records = [{"SHIP_ID": "1", "LAT": "1.5"}]
+        (path,) = sink.write(records, area_code="BALTIC", fetched_at=FETCHED_AT)
+        self.assertTrue(path.endswith(".arrow"))
+        self.assertIn("area_code=BALTIC", path)
+        self.assertEqual(pa.ipc.open_file(path).read_all().schema.field("SHIP_ID").type, pa.int64())
+
+    def test_ais_writes_every_page(self):
+        sink = SnapshotSink(self.directory)
+        ais = make_client(StandInBackend(make_vessels(120, areas=("EMED",)), page_size=50), sink=sink)
+        rows = list(ais.iter_area_data("EMED"))
+        self.assertEqual(len(sink.files_written), 3)
+        self.assertEqual(len(pd.read_parquet(self.directory)), len(rows))
+
+    def test_failed_write_is_not_retried(self):
+        sink = SnapshotSink(self.directory)
+        sink.to_table = mock.Mock(side_effect=OSError("disk full"))
+        backend = StandInBackend(make_vessels(10, areas=("EMED",)))
+        ais = make_client(backend, sink=sink)
+        with self.assertRaises(SinkWriteError):
+            ais.get_area_data("EMED")
+        self.assertEqual(len(backend.requests), 1)
+
+    def test_invalid_format(self):
+        with self.assertRaises(ValueError):
+            SnapshotSink(self.directory, file_format="csv")
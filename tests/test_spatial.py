@@ -0,0 +1,79 @@
+import random
+import unittest
+
+from aisexplorer.Spatial import SpatialIndex, haversine
+from tests.stand_in import StandInBackend, make_client, make_vessels
+
+
+def keys(rows):
+    return sorted(row["SHIP_ID"] for row in rows)
+
+
+class TestSpatialIndex(unittest.TestCase):
+    def setUp(self):
+        self.vessels = make_vessels(3000, lat_range=(-89, 89), lon_range=(-180, 180))
+        self.index = SpatialIndex.from_result(self.vessels, cell_size=0.5)
+        self.points = [(float(v["LAT"]), float(v["LON"]), v) for v in self.vessels]
+
+    def test_haversine(self):
+        self.assertAlmostEqual(haversine(0, 0, 0, 1), 111.195, places=2)
+        self.assertAlmostEqual(haversine(10, 179.5, 10, -179.5), haversine(10, 0, 10, 1))
+        self.assertAlmostEqual(haversine(90, 0, 90, 120), 0)
+
+    def test_bbox_matches_scan(self):
+        for box in [(30, 40, 10, 20), (-5, 5, 170, -170), (-90, 90, -180, 180), (1, 1.5, 2, 2.5)]:
+            lat_min, lat_max, lon_min, lon_max = box
+            expected = [
+                v
+                for lat, lon, v in self.points
+                if lat_min <= lat <= lat_max
+                and (lon_min <= lon <= lon_max if lon_min <= lon_max else not lon_max < lon < lon_min)
+            ]
+            self.assertEqual(keys(self.index.bbox(*box)), keys(expected), box)
+
+    def test_radius_and_nearest_match_scan(self):
+        rng = random.Random(1)
+        centers = [(0, 179.9), (88, 10), (-60, -20), (35.9, 14.5)]
+        centers += [(rng.uniform(-89, 89), rng.uniform(-180, 180)) for _ in range(10)]
+        for lat, lon in centers:
+            distances = sorted(
+                (haversine(lat, lon, other_lat, other_lon), v["SHIP_ID"])
+                for other_lat, other_lon, v in self.points
+            )
+            for radius in (50, 800, 5000):
+                found = self.index.within(lat, lon, radius)
+                self.assertEqual(
+                    [row["SHIP_ID"] for _, row in found],
+                    [key for distance, key in distances if distance <= radius],
+                )
+            nearest = self.index.nearest(lat, lon, k=7)
+            self.assertEqual([row["SHIP_ID"] for _, row in nearest], [key for _, key in distances[:7]])
+            self.assertAlmostEqual(nearest[0][0], distances[0][0])
+
+    def test_incremental_updates(self):
+        index = SpatialIndex(cell_size=1)
+        self.assertEqual(index.update([{"SHIP_ID": "1", "LAT": "10.5", "LON": "20.5"}]), 1)
+        index.update([{"SHIP_ID": "1", "LAT": "-10.5", "LON": "200"}, {"SHIP_ID": "2", "LAT": "0", "LON": "0"}])
+        self.assertEqual(len(index), 2)
+        self.assertEqual(index.bbox(10, 11, 20, 21), [])
+        self.assertEqual(keys(index.bbox(-11, -10, -161, -159)), ["1"])
+        self.assertEqual(len(index.cells), 2)
+
+        index.update([{"SHIP_ID": "2", "LAT": None, "LON": "0"}, {"LAT": "1", "LON": "1"}])
+        self.assertNotIn("2", index)
+        index.remove(["1"])
+        self.assertEqual((len(index), index.cells), (0, {}))
+        self.assertEqual(index.nearest(0, 0, k=3), [])
+
+    def test_from_area_data(self):
+        backend = StandInBackend(make_vessels(40, areas=("EMED",)))
+        ais = make_client(backend, return_df=True, return_total_count=True)
+        index = SpatialIndex.from_result(ais.get_area_data("EMED"))
+        self.assertEqual(len(index), 40)
+        self.assertIn(100000, index)
+        self.assertEqual(index.get("100000")["SHIP_ID"], 100000)
+        self.assertEqual(len(index.nearest(0, 0, k=40)), 40)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+
+import pandas as pd
+
+from tests.stand_in import StandInBackend, make_client, make_vessels
+
+
+class TestStreaming(unittest.TestCase):
+    def test_iter_area_data_rows(self):
+        vessels = make_vessels(230, areas=("EMED",))
+        ais = make_client(StandInBackend(vessels, page_size=50))
+        rows = list(ais.iter_area_data("EMED"))
+        self.assertEqual([row["SHIP_ID"] for row in rows], [v["SHIP_ID"] for v in vessels])
+
+    def test_pages_are_fetched_lazily(self):
+        ais = make_client(StandInBackend(make_vessels(230), page_size=50))
+        pages = ais.iter_data(chunks=True)
+        first = next(pages)
+        self.assertEqual(len(first), 50)
+        self.assertEqual(len(ais.session.backend.requests), 1)
+        self.assertEqual([len(page) for page in pages], [50, 50, 50, 30])
+
+    def test_concurrent_pages_keep_order(self):
+        vessels = make_vessels(1000)
+        ais = make_client(StandInBackend(vessels, page_size=100), max_workers=4, return_df=True)
+        chunks = list(ais.iter_data(chunks=True))
+        self.assertEqual(len(chunks), 10)
+        self.assertTrue(all(isinstance(chunk, pd.DataFrame) for chunk in chunks))
+        ship_ids = pd.concat(chunks)["SHIP_ID"].tolist()
+        self.assertEqual(ship_ids, [int(v["SHIP_ID"]) for v in vessels])
+
+    def test_empty_result(self):
+        ais = make_client(StandInBackend([], page_size=50))
+        self.assertEqual(list(ais.iter_area_data("WMED")), [])
@@ -0,0 +1,52 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from aisexplorer.AIS import AIS
+from aisexplorer.Exceptions import NoResultsError
+from aisexplorer.Retry import RetryPolicy
+from tests.stand_in import StandInBackend, StandInServer, make_vessels
+
+
+class TestThreadSafety(unittest.TestCase):
+    def test_shared_between_threads(self):
+        backend = StandInBackend(make_vessels(64), delay=0.005)
+        with StandInServer(backend) as server:
+            ais = AIS(base_url=server.url, pool_maxsize=32)
+            mmsis = [200000000 + i % 64 for i in range(320)]
+            with ThreadPoolExecutor(max_workers=32) as executor:
+                results = list(executor.map(ais.get_location, mmsis))
+        self.assertEqual(len(backend.requests), 320)
+        for mmsi, rows in zip(mmsis, results):
+            self.assertEqual(rows[0]["SHIPNAME"], f"VESSEL {mmsi - 200000000}")
+        self.assertLessEqual(server.connections, 32)
+
+    def test_pool_size(self):
+        adapter = AIS(pool_maxsize=32).session.get_adapter("https://example.com")
+        self.assertEqual(adapter._pool_maxsize, 32)
+        adapter = AIS(max_workers=16).session.get_adapter("https://example.com")
+        self.assertEqual(adapter._pool_maxsize, 16)
+        with self.assertRaises(ValueError):
+            AIS(pool_maxsize=0)
+
+    def test_timeout(self):
+        backend = StandInBackend(make_vessels(1), delay=0.5)
+        with StandInServer(backend) as server:
+            ais = AIS(
+                base_url=server.url,
+                timeout=(1, 0.05),
+                retry_policy=RetryPolicy(max_attempts=1),
+            )
+            with self.assertRaises(NoResultsError) as context:
+                ais.get_location(200000000)
+        self.assertIsInstance(context.exception.__cause__, requests.Timeout)
+
+    def test_urls_use_one_filter_snapshot(self):
+        ais = AIS(filter_config={"flag": ["MT"]})
+        request_url, referer_url = ais.build_location_urls(1)
+        self.assertEqual(request_url.split("columns=")[1], referer_url.split("columns=")[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
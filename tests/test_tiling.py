@@ -0,0 +1,52 @@
+import unittest
+
+import pandas as pd
+
+from aisexplorer.AIS import AIS
+from aisexplorer.Tiling import AdaptiveTiler, Tile
+from tests.stand_in import StandInBackend, make_client, make_vessels
+
+
+class TestTiling(unittest.TestCase):
+    def test_split_covers_tile(self):
+        quadrants = Tile(0, 10, 20, 40).split()
+        self.assertEqual(len(quadrants), 4)
+        self.assertEqual(min(t.lat_min for t in quadrants), 0)
+        self.assertEqual(max(t.lon_max for t in quadrants), 40)
+        self.assertTrue(all(t.depth == 1 for t in quadrants))
+
+    def test_sparse_box_needs_one_request(self):
+        ais = make_client(StandInBackend(make_vessels(50)))
+        tiler = AdaptiveTiler(ais)
+        self.assertEqual(len(tiler.fetch()), 50)
+        self.assertEqual(tiler.requests_made, 1)
+
+    def test_dense_box_is_split(self):
+        vessels = make_vessels(900)
+        ais = make_client(StandInBackend(vessels, page_size=100))
+        tiler = AdaptiveTiler(ais, max_rows=100)
+        rows = tiler.fetch()
+        self.assertEqual(
+            sorted(row["SHIP_ID"] for row in rows),
+            sorted(vessel["SHIP_ID"] for vessel in vessels),
+        )
+        self.assertGreater(len(tiler.leaves), 4)
+
+    def test_boundary_vessels_are_deduplicated(self):
+        vessels = make_vessels(300, lat_range=(-1, 1), lon_range=(-1, 1))
+        vessels[0]["LAT"], vessels[0]["LON"] = "0", "0"
+        ais = make_client(StandInBackend(vessels, page_size=100), return_df=True)
+        df = AdaptiveTiler(ais, max_rows=100).fetch(-1, 1, -1, 1)
+        self.assertIsInstance(df, pd.DataFrame)
+        self.assertEqual(len(df), 300)
+        self.assertTrue(df["SHIP_ID"].is_unique)
+
+    def test_max_depth_falls_back_to_pagination(self):
+        vessels = make_vessels(250, lat_range=(10, 10.001), lon_range=(10, 10.001))
+        ais = make_client(StandInBackend(vessels, page_size=100))
+        tiler = AdaptiveTiler(ais, max_rows=100, max_depth=2)
+        self.assertEqual(len(tiler.fetch(0, 20, 0, 20)), 250)
+
+    def test_lat_lon_in_filter_config(self):
+        with self.assertRaises(ValueError):
+            AdaptiveTiler(AIS(), filter_config={"lat": [0, 1]})
@@ -0,0 +1,91 @@
+import unittest
+
+import pandas as pd
+
+from aisexplorer.Utils.Utility import build_typed_df, set_types_df
+from tests.stand_in import StandInBackend, make_client, make_vessels
+
+RECORDS = [
+    {
+        "SHIP_ID": "1",
+        "MMSI": "211281610",
+        "LAT": "54.1",
+        "SPEED": "12",
+        "ETA": "masked",
+        "LAST_POS": "1700000000",
+        "SHIPNAME": "FIRST",
+        "CTA_ROUTE_FORECAST": True,
+    },
+    {
+        "SHIP_ID": "2",
+        "MMSI": None,
+        "LAT": "-3.25",
+        "SPEED": "",
+        "ETA": "1700003600",
+        "LAST_POS": None,
+        "SHIPNAME": None,
+    },
+]
+
+
+class TestBuildTypedDf(unittest.TestCase):
+    def test_dtypes(self):
+        df = build_typed_df(RECORDS)
+        self.assertEqual(str(df["SHIP_ID"].dtype), "Int64")
+        self.assertEqual(df["LAT"].dtype, "float64")
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(df["LAST_POS"]))
+        self.assertEqual(df["SHIPNAME"].dtype, "string")
+        self.assertEqual(df["CTA_ROUTE_FORECAST"].dtype, bool)
+
+    def test_missing_and_masked_values(self):
+        df = build_typed_df(RECORDS)
+        self.assertTrue(pd.isna(df.loc[0, "ETA"]))
+        self.assertEqual(df.loc[1, "ETA"], pd.Timestamp("2023-11-14 23:13:20"))
+        self.assertTrue(pd.isna(df.loc[1, "MMSI"]))
+        self.assertTrue(pd.isna(df.loc[1, "SPEED"]))
+        self.assertTrue(pd.isna(df.loc[1, "SHIPNAME"]))
+        self.assertFalse(df.loc[1, "CTA_ROUTE_FORECAST"])
+
+    def test_out_of_range_timestamps_become_nat(self):
+        df = build_typed_df([{"ETA": "1e20"}, {"ETA": "1700000000"}])
+        self.assertTrue(pd.isna(df.loc[0, "ETA"]))
+        self.assertEqual(df.loc[1, "ETA"], pd.Timestamp("2023-11-14 22:13:20"))
+
+    def test_columns_not_in_response(self):
+        df = build_typed_df([{"SHIP_ID": "7", "UNKNOWN": "x"}])
+        self.assertEqual(list(df.columns), ["SHIP_ID", "UNKNOWN"])
+        self.assertEqual(build_typed_df([]).shape, (0, 0))
+
+    def test_set_types_df_matches_builder(self):
+        df = pd.DataFrame(RECORDS)
+        typed = set_types_df(df)
+        pd.testing.assert_frame_equal(typed, build_typed_df(RECORDS))
+        self.assertFalse(pd.api.types.is_integer_dtype(df["SHIP_ID"]))
+
+    def test_return_df_is_typed(self):
+        ais = make_client(StandInBackend(make_vessels(5)), return_df=True)
+        df = ais.get_area_data("WMED")
+        self.assertEqual(str(df["MMSI"].dtype), "Int64")
+        self.assertEqual(df["LAT"].dtype, "float64")
+
+
+class TestCompactDtypes(unittest.TestCase):
+    def test_compact_dtypes(self):
+        records = [dict(record, AREA_CODE="WMED", COUNTRY="Malta") for record in RECORDS]
+        df = build_typed_df(records, compact=True)
+        self.assertEqual(df["AREA_CODE"].dtype, "category")
+        self.assertEqual(df["COUNTRY"].dtype, "category")
+        self.assertEqual(df["LAT"].dtype, "float32")
+        self.assertEqual(str(df["SHIP_ID"].dtype), "UInt8")
+        self.assertEqual(str(df["MMSI"].dtype), "UInt32")
+        pd.testing.assert_frame_equal(set_types_df(pd.DataFrame(records), compact=True), df)
+
+    def test_compact_uses_less_memory(self):
+        records = make_vessels(5000, areas=("WMED", "EMED", "UKC"))
+        regular = build_typed_df(records).memory_usage(deep=True).sum()
+        compact = build_typed_df(records, compact=True).memory_usage(deep=True).sum()
+        self.assertLess(compact, regular)
+
+    def test_compact_return_df(self):
+        ais = make_client(StandInBackend(make_vessels(5)), return_df=True, compact=True)
+        self.assertEqual(ais.get_area_data("WMED")["AREA_CODE"].dtype, "category")
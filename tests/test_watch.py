@@ -0,0 +1,99 @@
+import unittest
+
+from aisexplorer.Watch import Watcher, diff_snapshots
+from tests.stand_in import FakeClock, StandInBackend, make_client, make_vessels
+
+
+def kinds(changes):
+    return sorted((change.kind, change.key) for change in changes)
+
+
+class TestDiffSnapshots(unittest.TestCase):
+    def test_diff(self):
+        previous = {
+            "1": {"SHIP_ID": "1", "LAT": "1.0", "LON": "2.0", "STATUS": "0"},
+            "2": {"SHIP_ID": "2", "LAT": "1.0", "LON": "2.0", "DESTINATION": "VALLETTA"},
+            "3": {"SHIP_ID": "3", "LAT": "1.0", "LON": "2.0"},
+        }
+        current = {
+            "1": {"SHIP_ID": "1", "LAT": "1.5", "LON": "2.0", "STATUS": "0"},
+            "2": {"SHIP_ID": "2", "LAT": "1.0", "LON": "2.0", "DESTINATION": "PIRAEUS"},
+            "4": {"SHIP_ID": "4", "LAT": "1.0", "LON": "2.0"},
+        }
+        changes = diff_snapshots("EMED", previous, current)
+        self.assertEqual(
+            kinds(changes),
+            [("changed", "2"), ("entered", "4"), ("left", "3"), ("moved", "1")],
+        )
+        changed = [change for change in changes if change.kind == "changed"][0]
+        self.assertEqual(changed.fields, ["DESTINATION"])
+
+    def test_position_tolerance(self):
+        previous = {"1": {"LAT": "1.0", "LON": "2.0"}}
+        current = {"1": {"LAT": "1.00001", "LON": "2.0"}}
+        self.assertEqual(diff_snapshots("t", previous, current, position_tolerance=0.001), [])
+
+
+class TestWatcher(unittest.TestCase):
+    def setUp(self):
+        self.vessels = make_vessels(20, areas=("EMED", "WMED"))
+        self.backend = StandInBackend(self.vessels, page_size=5)
+        self.ais = make_client(self.backend)
+
+    def test_poll_emits_only_changes(self):
+        watcher = Watcher(self.ais)
+        watcher.watch_area("EMED")
+        self.assertEqual(len(watcher.poll("EMED")), 10)
+        self.assertEqual(watcher.poll("EMED"), [])
+
+        self.vessels[0]["LAT"] = "0.5"
+        self.vessels[2]["AREA_CODE"] = "WMED"
+        self.vessels[4]["STATUS"] = "moored"
+        self.assertEqual(
+            kinds(watcher.poll("EMED")),
+            [("changed", "100004"), ("left", "100002"), ("moved", "100000")],
+        )
+
+    def test_emit_initial_disabled(self):
+        watcher = Watcher(self.ais, emit_initial=False)
+        watcher.watch_filters({"lat": [-90, 90]}, name="all")
+        self.assertEqual(watcher.poll("all"), [])
+        self.assertEqual(len(watcher.targets["all"].snapshot), 20)
+
+    def test_run_respects_intervals(self):
+        clock = FakeClock()
+        watcher = Watcher(self.ais, clock=clock, sleep=clock.sleep)
+        watcher.watch_area("EMED", interval=60)
+        watcher.watch_area("WMED", interval=25)
+        polled = [(name, clock.now) for name, _ in watcher.run(max_polls=6)]
+        self.assertEqual(
+            polled,
+            [
+                ("EMED", 0.0),
+                ("WMED", 0.0),
+                ("WMED", 25.0),
+                ("WMED", 50.0),
+                ("EMED", 60.0),
+                ("WMED", 75.0),
+            ],
+        )
+
+    def test_slow_polls_do_not_catch_up(self):
+        clock = FakeClock()
+        watcher = Watcher(self.ais, clock=clock, sleep=clock.sleep)
+        watcher.watch_area("EMED", interval=10)
+        poll = watcher.poll
+
+        def slow_poll(target):
+            clock.now += 35
+            return poll(target)
+
+        watcher.poll = slow_poll
+        polled = [clock.now for _ in watcher.run(max_polls=3)]
+        self.assertEqual(polled, [35.0, 80.0, 125.0])
+
+    def test_duplicate_target(self):
+        watcher = Watcher(self.ais)
+        watcher.watch_area("EMED")
+        with self.assertRaises(ValueError):
+            watcher.watch_area("EMED")